@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile
+from .models import CenterContribution, DailyRollup, RecyclingActivity, UserProfile
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -7,3 +7,26 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ('user_type', 'created_at')
     search_fields = ('user__username', 'user__email', 'phone_number')
     readonly_fields = ('created_at', 'updated_at')
+
+@admin.register(RecyclingActivity)
+class RecyclingActivityAdmin(admin.ModelAdmin):
+    list_display = ('profile', 'material_type', 'items', 'weight', 'co2_saved', 'recycling_center', 'created_at')
+    list_filter = ('material_type', 'created_at')
+    search_fields = ('profile__user__username',)
+    list_select_related = ('profile__user', 'recycling_center')
+    raw_id_fields = ('profile', 'recycling_center')
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'recycling_center', 'material_type', 'activities', 'weight', 'co2_saved', 'active_users')
+    list_filter = ('material_type', 'date')
+    list_select_related = ('recycling_center',)
+    raw_id_fields = ('recycling_center',)
+    date_hierarchy = 'date'
+
+@admin.register(CenterContribution)
+class CenterContributionAdmin(admin.ModelAdmin):
+    list_display = ('profile', 'recycling_center', 'items', 'weight', 'co2_saved', 'updated_at')
+    search_fields = ('profile__user__username', 'recycling_center__name')
+    list_select_related = ('profile__user', 'recycling_center')
+    raw_id_fields = ('profile', 'recycling_center')
@@ -0,0 +1,39 @@
+"""
+Password hashers for ``settings.PASSWORD_HASHERS``.
+
+Django's Argon2 defaults (100 MiB, 8 lanes) make each login cost about
+0.3s of CPU and a large allocation, which a burst of logins multiplies.
+``TunedArgon2PasswordHasher`` uses OWASP's minimum recommended argon2id
+parameters instead. Django upgrades a stored hash on the next successful
+login whenever its algorithm or parameters differ from the first configured
+hasher, so switching profiles needs no migration.
+"""
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    # Same algorithm name, so existing argon2 hashes keep verifying and are
+    # rehashed with these parameters on login
+    time_cost = 2
+    memory_cost = 19456  # KiB
+    parallelism = 1
+
+
+# The first hasher of a profile hashes new passwords; the others only verify
+# hashes created before a switch.
+HASHER_PROFILES = {
+    'argon2': [
+        'accounts.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+    'pbkdf2': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'accounts.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+}
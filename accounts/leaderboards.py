@@ -0,0 +1,507 @@
+"""
+Community leaderboards of public profiles: global, per city and per center.
+
+The database keeps the scores: the profile totals maintained by
+``impact.py``, and a ``CenterContribution`` row per user and center that
+``record_contribution`` bumps with ``F()`` updates as activities are
+recorded. Partial indexes on the descending totals of public profiles serve
+the initial load.
+
+Each process ranks those scores in memory. ``Leaderboard`` keeps its members
+in an indexable skip list, so updating a score, the top N and a member's rank
+take ``O(log n)``. Boards are built lazily from the in-memory copy of the
+scores, and a committed activity or profile change updates the boards built
+in the same process. Changes made by other processes are picked up every
+``LEADERBOARD_SYNC_INTERVAL`` seconds by re-reading the rows whose
+``updated_at`` moved, through its index. Deleted profiles leave a
+``ProfileRemoval`` row behind, read the same way; they are kept for
+``REMOVAL_RETENTION``, and a store that last synced before that reloads
+everything instead.
+
+``manage.py rebuild_leaderboards --snapshot-only``, run periodically, writes
+the scores to ``LEADERBOARD_SNAPSHOT_PATH``. A restarted process loads the
+snapshot and catches up from its timestamp rather than reading every profile
+again. Without ``--snapshot-only`` the command rebuilds everything from the
+database.
+"""
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CenterContribution, ProfileRemoval, RecyclingActivity, UserProfile
+
+# Ranking metric: index of the score in the in-memory profile and
+# contribution tuples
+METRICS = {
+    'weight': 0,
+    'co2': 1,
+}
+SCOPES = ('global', 'city', 'center')
+SNAPSHOT_FORMAT = 1
+# Rows are stamped before their transaction commits; a sync re-reads rows
+# stamped this long before the previous one started
+SYNC_OVERLAP = timedelta(seconds=5)
+# How long deletions are remembered for the syncs of other processes;
+# ``manage.py rebuild_leaderboards`` prunes older ones
+REMOVAL_RETENTION = timedelta(days=1)
+
+
+class _Node:
+    __slots__ = ('value', 'next', 'width')
+
+    def __init__(self, value, levels):
+        self.value = value
+        self.next = [None] * levels
+        # Bottom-level steps to the next node on each level
+        self.width = [1] * levels
+
+
+class IndexableSkipList:
+    """Sorted values with ``O(log n)`` insert, remove, rank and positional access"""
+    MAX_LEVELS = 24
+
+    def __init__(self):
+        self.head = _Node(None, self.MAX_LEVELS)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_levels(self):
+        return min(self.MAX_LEVELS, 1 - int(math.log(1 - random.random(), 2.0)))
+
+    def insert(self, value):
+        chain = [None] * self.MAX_LEVELS
+        steps_at_level = [0] * self.MAX_LEVELS
+        node = self.head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value <= value:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = self._random_levels()
+        new = _Node(value, levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, value):
+        chain = [None] * self.MAX_LEVELS
+        node = self.head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.value != value:
+            raise KeyError(value)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def index(self, value):
+        """Position of ``value``, counted from 0"""
+        node = self.head
+        position = 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                position += node.width[level]
+                node = node.next[level]
+        following = node.next[0]
+        if following is None or following.value != value:
+            raise ValueError(f'{value!r} is not in the list')
+        return position
+
+    def slice(self, start, stop):
+        """Values at positions ``start``..``stop - 1``"""
+        start, stop = max(0, start), min(stop, self.size)
+        if start >= stop:
+            return []
+        node = self.head
+        remaining = start + 1
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        values = []
+        while node is not None and len(values) < stop - start:
+            values.append(node.value)
+            node = node.next[0]
+        return values
+
+
+class Leaderboard:
+    """Members ranked by descending score, ties going to the lower member id"""
+
+    def __init__(self, scores=()):
+        self._scores = {}
+        self._ranking = IndexableSkipList()
+        for member, score in scores:
+            self.set(member, score)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def set(self, member, score):
+        """Add or move ``member``; members without a positive, finite score are dropped"""
+        if not score or not math.isfinite(score) or score <= 0:
+            self.discard(member)
+            return
+        previous = self._scores.get(member)
+        if previous == score:
+            return
+        if previous is not None:
+            self._ranking.remove((-previous, member))
+        self._scores[member] = score
+        self._ranking.insert((-score, member))
+
+    def discard(self, member):
+        previous = self._scores.pop(member, None)
+        if previous is not None:
+            self._ranking.remove((-previous, member))
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def rank(self, member):
+        """1-based rank of ``member``, or None when it is not ranked"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return self._ranking.index((-score, member)) + 1
+
+    def top(self, count, offset=0):
+        """``(rank, member, score)`` of ``count`` members from rank ``offset + 1``"""
+        return [
+            (offset + position + 1, member, -negated)
+            for position, (negated, member) in enumerate(self._ranking.slice(offset, offset + count))
+        ]
+
+
+def city_key(city):
+    return ' '.join(city.split()).casefold()
+
+
+def record_contribution(activity):
+    """Add a newly saved ``RecyclingActivity`` to its user's total at its center"""
+    if activity.recycling_center_id is None:
+        return
+    rows = CenterContribution.objects.filter(
+        recycling_center_id=activity.recycling_center_id, profile_id=activity.profile_id,
+    )
+    increments = {
+        'items': F('items') + activity.items,
+        'weight': F('weight') + activity.weight,
+        'co2_saved': F('co2_saved') + activity.co2_saved,
+        'updated_at': timezone.now(),
+    }
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            CenterContribution.objects.create(
+                recycling_center_id=activity.recycling_center_id, profile_id=activity.profile_id,
+                items=activity.items, weight=activity.weight, co2_saved=activity.co2_saved,
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**increments)
+
+
+def rebuild_contributions(batch_size=1000):
+    """Recompute every ``CenterContribution`` from the activity history, returning the row count"""
+    totals = (
+        RecyclingActivity.objects.filter(recycling_center__isnull=False)
+        .values('recycling_center', 'profile')
+        .annotate(total_items=Sum('items'), total_weight=Sum('weight'), total_co2=Sum('co2_saved'))
+        .order_by()
+    )
+    rows = [
+        CenterContribution(
+            recycling_center_id=row['recycling_center'], profile_id=row['profile'],
+            items=row['total_items'] or 0, weight=row['total_weight'] or 0.0, co2_saved=row['total_co2'] or 0.0,
+        )
+        for row in totals
+    ]
+    with transaction.atomic():
+        CenterContribution.objects.all().delete()
+        CenterContribution.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+class LeaderboardStore:
+    """In-memory scores of public profiles and the boards ranking them"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.profiles = {}  # profile id: (city key, weight, co2) of public profiles
+        self.cities = defaultdict(set)  # city key: profile ids
+        self.contributions = defaultdict(dict)  # center id: {profile id: (weight, co2)}
+        self.synced_at = None  # rows updated before this are reflected
+        self._boards = {}  # (scope, key, metric): Leaderboard
+        self._checked = time.monotonic()
+
+    # Loading
+
+    def load_from_database(self):
+        with self._lock:
+            started = timezone.now()
+            self._reset()
+            public = UserProfile.objects.filter(public_profile=True).values_list(
+                'id', 'city', 'total_weight_recycled', 'co2_saved',
+            )
+            for profile_id, city, weight, co2_saved in public:
+                self._set_profile(profile_id, city_key(city), weight, co2_saved)
+            contributions = CenterContribution.objects.values_list(
+                'recycling_center_id', 'profile_id', 'weight', 'co2_saved',
+            )
+            for center_id, profile_id, weight, co2_saved in contributions:
+                self.contributions[center_id][profile_id] = (weight, co2_saved)
+            self.synced_at = started
+
+    def load_snapshot(self, path):
+        """Load the scores saved by ``save_snapshot``; False when there is no usable snapshot"""
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != SNAPSHOT_FORMAT:
+            return False
+        with self._lock:
+            self._reset()
+            for profile_id, key, weight, co2_saved in data['profiles']:
+                self._set_profile(profile_id, key, weight, co2_saved)
+            for center_id, profile_id, weight, co2_saved in data['contributions']:
+                self.contributions[center_id][profile_id] = (weight, co2_saved)
+            self.synced_at = datetime.fromisoformat(data['synced_at'])
+        return True
+
+    def save_snapshot(self, path):
+        with self._lock:
+            data = {
+                'format': SNAPSHOT_FORMAT,
+                'synced_at': self.synced_at.isoformat(),
+                'profiles': [[profile_id, *scores] for profile_id, scores in self.profiles.items()],
+                'contributions': [
+                    [center_id, profile_id, *scores]
+                    for center_id, members in self.contributions.items()
+                    for profile_id, scores in members.items()
+                ],
+            }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written beside the snapshot and renamed over it, so a reader never
+        # sees half a file
+        with tempfile.NamedTemporaryFile('w', dir=path.parent, prefix=path.name, delete=False) as handle:
+            json.dump(data, handle, separators=(',', ':'))
+        os.replace(handle.name, path)
+
+    def sync(self, force=False):
+        """Apply the scores changed since the last sync, e.g. by other processes"""
+        interval = getattr(settings, 'LEADERBOARD_SYNC_INTERVAL', 30)
+        if not force and time.monotonic() - self._checked < interval:
+            return
+        with self._lock:
+            if not force and time.monotonic() - self._checked < interval:
+                return
+            started = timezone.now()
+            if self.synced_at < started - REMOVAL_RETENTION:
+                # Removals this old may be pruned already
+                self.load_from_database()
+                self._checked = time.monotonic()
+                return
+            since = self.synced_at - SYNC_OVERLAP
+            changed = UserProfile.objects.filter(updated_at__gte=since).values_list(
+                'id', 'public_profile', 'city', 'total_weight_recycled', 'co2_saved',
+            )
+            for row in changed:
+                self.apply_profile(*row)
+            contributions = CenterContribution.objects.filter(updated_at__gte=since).values_list(
+                'recycling_center_id', 'profile_id', 'weight', 'co2_saved',
+            )
+            for row in contributions:
+                self.apply_contribution(*row)
+            removed = ProfileRemoval.objects.filter(removed_at__gte=since).values_list('profile_id', flat=True)
+            for profile_id in removed:
+                self.remove_profile(profile_id)
+            self.synced_at = started
+            self._checked = time.monotonic()
+
+    def _reset(self):
+        self.profiles.clear()
+        self.cities.clear()
+        self.contributions.clear()
+        self._boards.clear()
+
+    # Updates
+
+    def _set_profile(self, profile_id, key, weight, co2_saved):
+        self.profiles[profile_id] = (key, weight, co2_saved)
+        self.cities[key].add(profile_id)
+
+    def apply_profile(self, profile_id, public, city, weight, co2_saved):
+        """Bring a profile's place on every built board up to date"""
+        with self._lock:
+            previous = self.profiles.get(profile_id)
+            current = (city_key(city), weight, co2_saved) if public else None
+            if previous == current:
+                return
+            if previous is not None:
+                self.profiles.pop(profile_id)
+                self.cities[previous[0]].discard(profile_id)
+            if current is not None:
+                self._set_profile(profile_id, *current)
+
+            for (scope, key, metric), board in self._boards.items():
+                index = METRICS[metric]
+                if current is None or (scope == 'city' and current[0] != key):
+                    board.discard(profile_id)
+                elif scope == 'center':
+                    # Only whether the profile is listed can have changed
+                    board.set(profile_id, self.contributions.get(key, {}).get(profile_id, (0, 0))[index])
+                else:
+                    board.set(profile_id, current[index + 1])
+
+    def apply_contribution(self, center_id, profile_id, weight, co2_saved):
+        with self._lock:
+            self.contributions[center_id][profile_id] = (weight, co2_saved)
+            if profile_id not in self.profiles:
+                return
+            for metric, index in METRICS.items():
+                board = self._boards.get(('center', center_id, metric))
+                if board is not None:
+                    board.set(profile_id, (weight, co2_saved)[index])
+
+    def remove_profile(self, profile_id):
+        with self._lock:
+            self.apply_profile(profile_id, False, '', 0, 0)
+            for members in self.contributions.values():
+                members.pop(profile_id, None)
+
+    # Reading
+
+    def board(self, scope, metric, key=None):
+        """The ``Leaderboard`` of ``scope`` (with its city name or center id ``key``), built on first use"""
+        if scope not in SCOPES or metric not in METRICS:
+            raise ValueError(f'Unknown leaderboard {scope!r}/{metric!r}')
+        if scope == 'city':
+            key = city_key(key or '')
+        elif scope == 'center':
+            key = int(key)
+        else:
+            key = None
+        self.sync()
+        with self._lock:
+            board = self._boards.get((scope, key, metric))
+            if board is None:
+                index = METRICS[metric]
+                if scope == 'global':
+                    scores = ((member, scores[index + 1]) for member, scores in self.profiles.items())
+                elif scope == 'city':
+                    scores = ((member, self.profiles[member][index + 1]) for member in self.cities.get(key, ()))
+                else:
+                    scores = (
+                        (member, scores[index])
+                        for member, scores in self.contributions.get(key, {}).items()
+                        if member in self.profiles
+                    )
+                board = self._boards[(scope, key, metric)] = Leaderboard(scores)
+            return board
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_leaderboards():
+    """
+    The process's ``LeaderboardStore``, loaded from the snapshot or the
+    database on first use. The snapshot is only written by
+    ``manage.py rebuild_leaderboards``, never while serving a request.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = LeaderboardStore()
+                path = getattr(settings, 'LEADERBOARD_SNAPSHOT_PATH', None)
+                if path and store.load_snapshot(path):
+                    store.sync(force=True)
+                else:
+                    store.load_from_database()
+                _store = store
+    return _store
+
+
+def reset_leaderboards():
+    """Drop the in-memory store and the snapshot, so the next use reads the database"""
+    global _store
+    with _store_lock:
+        _store = None
+        path = getattr(settings, 'LEADERBOARD_SNAPSHOT_PATH', None)
+        if path:
+            Path(path).unlink(missing_ok=True)
+
+
+def activity_recorded(profile_id, center_id):
+    """Re-read the scores an activity changed, once it is committed"""
+    store = _store
+    if store is None:
+        return
+    row = UserProfile.objects.filter(pk=profile_id).values_list(
+        'public_profile', 'city', 'total_weight_recycled', 'co2_saved',
+    ).first()
+    if row is not None:
+        store.apply_profile(profile_id, *row)
+    if center_id is not None:
+        contribution = CenterContribution.objects.filter(
+            recycling_center_id=center_id, profile_id=profile_id,
+        ).values_list('weight', 'co2_saved').first()
+        if contribution is not None:
+            store.apply_contribution(center_id, profile_id, *contribution)
+
+
+def profile_saved(profile):
+    store = _store
+    if store is not None:
+        store.apply_profile(
+            profile.pk, profile.public_profile, profile.city, profile.total_weight_recycled, profile.co2_saved,
+        )
+
+
+def prune_removals():
+    """Forget the profile removals no sync needs any more, returning how many"""
+    deleted, _ = ProfileRemoval.objects.filter(removed_at__lt=timezone.now() - REMOVAL_RETENTION).delete()
+    return deleted
+
+
+def profile_deleted(profile_id):
+    store = _store
+    if store is not None:
+        store.remove_profile(profile_id)
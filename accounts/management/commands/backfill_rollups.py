@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from accounts.models import RecyclingActivity
+from accounts.rollups import rebuild_rollups
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'{value!r} is not a YYYY-MM-DD date')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily dashboard rollups from the recycling activity history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=_date, help='First day to rebuild (default: first activity)')
+        parser.add_argument('--until', type=_date, help='Last day to rebuild (default: last activity)')
+        parser.add_argument('--days-per-batch', type=int, default=31, help='Days aggregated per transaction')
+
+    def handle(self, *args, **options):
+        bounds = RecyclingActivity.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None and not (options['since'] and options['until']):
+            self.stdout.write('No recycling activity to roll up')
+            return
+        first_day = options['since'] or timezone.localdate(bounds['first'])
+        last_day = options['until'] or timezone.localdate(bounds['last'])
+        if first_day > last_day:
+            raise CommandError('--since must not be after --until')
+
+        step = timedelta(days=max(1, options['days_per_batch']))
+        rows = 0
+        start = first_day
+        while start <= last_day:
+            end = min(start + step - timedelta(days=1), last_day)
+            rows += rebuild_rollups(start, end)
+            start = end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows for {first_day} to {last_day}'))
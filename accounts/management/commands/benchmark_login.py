@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from accounts.hashers import HASHER_PROFILES
+from accounts.models import UserProfile
+from recycling_tracker.middleware import QueryTracker
+
+USER_PREFIX = 'bench_login_'
+PASSWORD = 'benchmark-password'
+
+# Django's defaults against this project's auth profile
+CONFIGS = {
+    'stock': {
+        'PASSWORD_HASHERS': HASHER_PROFILES['pbkdf2'],
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    },
+    'tuned': {
+        'PASSWORD_HASHERS': HASHER_PROFILES['argon2'],
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure login throughput with concurrent clients, and the queries of the next '
+        'authenticated request, under the stock and tuned auth settings'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--logins', type=int, default=10, help='Logins per client')
+        parser.add_argument('--configs', nargs='+', choices=sorted(CONFIGS), default=list(CONFIGS))
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'config':<7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7} {'queries/page':>13}"
+        )
+        for name in options['configs']:
+            with override_settings(**CONFIGS[name]):
+                users = self._create_users(options['clients'])
+                result = {}
+                try:
+                    result = self._run(users, options)
+                finally:
+                    Session.objects.filter(session_key__in=result.get('sessions', [])).delete()
+                    User.objects.filter(username__startswith=USER_PREFIX).delete()
+            self.stdout.write(
+                f"{name:<7} {result['throughput']:>9.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                f"{result['failed']:>7} {result['queries']:>13.1f}"
+            )
+
+    def _create_users(self, count):
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        # One hash for everyone; it is made with the first configured hasher
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            [User(username=f'{USER_PREFIX}{number}', password=password) for number in range(count)]
+        )
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+        return users
+
+    def _run(self, users, options):
+        login_url = reverse('login')
+        page_url = reverse('notification_unread_count')
+        lock = threading.Lock()
+        timings, queries, sessions = [], [], []
+        failed = 0
+
+        def worker(user):
+            nonlocal failed
+            local_timings, local_queries, local_sessions, local_failed = [], [], [], 0
+            for _ in range(options['logins']):
+                client = Client(HTTP_HOST=options['host'])
+                started = time.perf_counter()
+                response = client.post(login_url, {'username': user.username, 'password': PASSWORD})
+                local_timings.append(time.perf_counter() - started)
+                if response.status_code != 302:
+                    local_failed += 1
+                    continue
+                # The request after logging in shows what the session backend costs
+                tracker = QueryTracker()
+                with tracker.track():
+                    client.get(page_url)
+                local_queries.append(tracker.count)
+                local_sessions.append(client.session.session_key)
+            with lock:
+                timings.extend(local_timings)
+                queries.extend(local_queries)
+                sessions.extend(local_sessions)
+                failed += local_failed
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        ordered = sorted(timings)
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50': statistics.median(ordered) * 1000,
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            'failed': failed,
+            'queries': statistics.mean(queries) if queries else 0.0,
+            'sessions': sessions,
+        }
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.leaderboards import get_leaderboards, prune_removals, rebuild_contributions, reset_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the per-center leaderboard totals from the recycling activity history '
+        'and write a fresh leaderboard snapshot from the database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--snapshot-only', action='store_true',
+                            help='Keep the per-center totals and bring the existing snapshot up to date; '
+                                 'run this periodically')
+
+    def handle(self, *args, **options):
+        path = getattr(settings, 'LEADERBOARD_SNAPSHOT_PATH', None)
+        if options['snapshot_only'] and not path:
+            raise CommandError('LEADERBOARD_SNAPSHOT_PATH is unset')
+        if not options['snapshot_only']:
+            rows = rebuild_contributions()
+            self.stdout.write(f'Rebuilt {rows} center contribution rows')
+            reset_leaderboards()
+        # Loads the snapshot and catches up with the database, or reads the
+        # database when there is no snapshot
+        store = get_leaderboards()
+        if path:
+            store.save_snapshot(path)
+        pruned = prune_removals()
+        if pruned:
+            self.stdout.write(f'Pruned {pruned} old profile removals')
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {len(store.profiles)} public profiles'
+            + (f', snapshot written to {path}' if path else ' (LEADERBOARD_SNAPSHOT_PATH is unset)')
+        ))
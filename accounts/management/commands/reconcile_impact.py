@@ -0,0 +1,72 @@
+import math
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.impact import IMPACT_FIELDS, level_for
+from accounts.models import RecyclingActivity, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Recompute profile impact totals from the recycling activity history and fix drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Profiles reconciled per query batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = fixed = 0
+        profiles = UserProfile.objects.only('id', *IMPACT_FIELDS).order_by('id')
+
+        last_id = 0
+        while True:
+            batch = list(profiles.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            totals = {
+                row['profile']: row for row in RecyclingActivity.objects.filter(
+                    profile__in=[profile.id for profile in batch]
+                ).values('profile').annotate(
+                    items=Sum('items'), weight=Sum('weight'), co2=Sum('co2_saved'),
+                    trees=Sum('trees_saved'),
+                )
+            }
+
+            now = timezone.now()
+            drifted = []
+            for profile in batch:
+                row = totals.get(profile.id, {})
+                weight = row.get('weight') or 0.0
+                level, progress = level_for(weight)
+                expected = {
+                    'total_items_recycled': row.get('items') or 0,
+                    'total_weight_recycled': weight,
+                    'co2_saved': row.get('co2') or 0.0,
+                    'trees_saved': row.get('trees') or 0.0,
+                    'recycling_level': level,
+                    'recycling_level_progress': progress,
+                }
+                if any(not self._same(getattr(profile, field), value) for field, value in expected.items()):
+                    for field, value in expected.items():
+                        setattr(profile, field, value)
+                    # bulk_update skips auto_now; the leaderboard sync reads updated_at
+                    profile.updated_at = now
+                    drifted.append(profile)
+
+            checked += len(batch)
+            fixed += len(drifted)
+            if drifted and not options['dry_run']:
+                with transaction.atomic():
+                    UserProfile.objects.bulk_update(drifted, [*IMPACT_FIELDS, 'updated_at'])
+
+        verb = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} profiles, {verb} {fixed}'))
+
+    @staticmethod
+    def _same(current, expected):
+        return math.isclose(current, expected, rel_tol=1e-9, abs_tol=1e-6)
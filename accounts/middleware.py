@@ -0,0 +1,43 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .models import UserProfile
+
+
+def get_profile(request):
+    """
+    The signed-in user's ``UserProfile``, or None, loaded at most once per
+    request. It is also cached on ``request.user`` so ``user.userprofile``
+    does not query again.
+    """
+    if not hasattr(request, '_cached_profile'):
+        user = request.user
+        profile = None
+        if user.is_authenticated:
+            profile = UserProfile.objects.filter(user_id=user.pk).first()
+            if profile is not None:
+                user.userprofile = profile
+        request._cached_profile = profile
+    return request._cached_profile
+
+
+class UserProfileMiddleware:
+    """
+    Sets ``request.profile`` after AuthenticationMiddleware. It is loaded on
+    first use and is falsy for anonymous users and users without a profile.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(partial(get_profile, request))
+        # Under ASGI this returns the coroutine of the next handler
+        return self.get_response(request)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_type', models.CharField(choices=[('normal', 'Normal User'), ('admin', 'Admin'), ('staff', 'Recycling Center Staff')], default='normal', max_length=10)),
+                ('phone_number', models.CharField(blank=True, max_length=15)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('postal_code', models.CharField(blank=True, max_length=10)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('profile_picture', models.ImageField(blank=True, upload_to='profiles/')),
+                ('total_items_recycled', models.IntegerField(default=0)),
+                ('total_weight_recycled', models.FloatField(default=0.0)),
+                ('recycling_level', models.IntegerField(default=1)),
+                ('recycling_level_progress', models.IntegerField(default=0)),
+                ('co2_saved', models.FloatField(default=0.0)),
+                ('trees_saved', models.FloatField(default=0.0)),
+                ('email_notifications', models.BooleanField(default=True)),
+                ('sms_notifications', models.BooleanField(default=False)),
+                ('newsletter', models.BooleanField(default=True)),
+                ('public_profile', models.BooleanField(default=False)),
+                ('location_sharing', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
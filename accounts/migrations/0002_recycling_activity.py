@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('recycling_centers', '0004_center_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecyclingActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('material_type', models.CharField(max_length=20)),
+                ('items', models.PositiveIntegerField(default=1)),
+                ('weight', models.FloatField(help_text='Weight in kg')),
+                ('co2_saved', models.FloatField(default=0.0, help_text='kg of CO2 saved')),
+                ('trees_saved', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='accounts.userprofile')),
+                ('recycling_center', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activities', to='recycling_centers.recyclingcenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', 'created_at'], name='activity_profile_created_idx')],
+            },
+        ),
+    ]
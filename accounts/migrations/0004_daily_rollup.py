@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_profile_picture_renditions'),
+        ('recycling_centers', '0005_center_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('material_type', models.CharField(blank=True, max_length=20)),
+                ('activities', models.PositiveIntegerField(default=0)),
+                ('items', models.PositiveIntegerField(default=0)),
+                ('weight', models.FloatField(default=0.0, help_text='Weight in kg')),
+                ('co2_saved', models.FloatField(default=0.0, help_text='kg of CO2 saved')),
+                ('trees_saved', models.FloatField(default=0.0)),
+                ('active_users', models.PositiveIntegerField(default=0)),
+                ('recycling_center', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='recycling_centers.recyclingcenter')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('recycling_center__isnull', False)), fields=('date', 'recycling_center', 'material_type'), name='rollup_center_day_unique'), models.UniqueConstraint(condition=models.Q(('recycling_center__isnull', True)), fields=('date', 'material_type'), name='rollup_day_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_daily_rollup'),
+        ('recycling_centers', '0006_center_admin_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CenterContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('items', models.PositiveIntegerField(default=0)),
+                ('weight', models.FloatField(default=0.0, help_text='Weight in kg')),
+                ('co2_saved', models.FloatField(default=0.0, help_text='kg of CO2 saved')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('public_profile', True)), fields=['-total_weight_recycled', 'id'], name='profile_weight_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('public_profile', True)), fields=['-co2_saved', 'id'], name='profile_co2_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('public_profile', True)), fields=['city', '-total_weight_recycled'], name='profile_city_weight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('public_profile', True)), fields=['city', '-co2_saved'], name='profile_city_co2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['updated_at'], name='profile_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='centercontribution',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='center_contributions', to='accounts.userprofile'),
+        ),
+        migrations.AddField(
+            model_name='centercontribution',
+            name='recycling_center',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributions', to='recycling_centers.recyclingcenter'),
+        ),
+        migrations.AddIndex(
+            model_name='centercontribution',
+            index=models.Index(fields=['recycling_center', '-weight'], name='contribution_weight_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='centercontribution',
+            index=models.Index(fields=['recycling_center', '-co2_saved'], name='contribution_co2_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='centercontribution',
+            index=models.Index(fields=['updated_at'], name='contribution_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='centercontribution',
+            constraint=models.UniqueConstraint(fields=('recycling_center', 'profile'), name='contribution_center_profile_unique'),
+        ),
+    ]
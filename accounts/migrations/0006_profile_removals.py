@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRemoval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_id', models.BigIntegerField()),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['removed_at'], name='profile_removal_at_idx')],
+            },
+        ),
+    ]
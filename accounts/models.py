@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class UserProfile(models.Model):
     USER_TYPES = (
@@ -17,6 +18,7 @@ class UserProfile(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True)
+    profile_picture_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     total_items_recycled = models.IntegerField(default=0)
     total_weight_recycled = models.FloatField(default=0.0)
@@ -35,7 +37,113 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Leaderboards (see accounts/leaderboards.py) rank public profiles by
+        # their totals and re-read the profiles updated since their last sync
+        indexes = [
+            models.Index(fields=['-total_weight_recycled', 'id'], condition=models.Q(public_profile=True),
+                         name='profile_weight_rank_idx'),
+            models.Index(fields=['-co2_saved', 'id'], condition=models.Q(public_profile=True),
+                         name='profile_co2_rank_idx'),
+            models.Index(fields=['city', '-total_weight_recycled'], condition=models.Q(public_profile=True),
+                         name='profile_city_weight_idx'),
+            models.Index(fields=['city', '-co2_saved'], condition=models.Q(public_profile=True),
+                         name='profile_city_co2_idx'),
+            models.Index(fields=['updated_at'], name='profile_updated_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.user_type}"
 
 
+class RecyclingActivity(models.Model):
+    """A recorded drop-off or pickup, the source of truth for profile impact totals"""
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='activities')
+    recycling_center = models.ForeignKey('recycling_centers.RecyclingCenter', on_delete=models.SET_NULL,
+                                         null=True, blank=True, related_name='activities')
+    material_type = models.CharField(max_length=20)
+    items = models.PositiveIntegerField(default=1)
+    weight = models.FloatField(help_text="Weight in kg")
+    co2_saved = models.FloatField(default=0.0, help_text="kg of CO2 saved")
+    trees_saved = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['profile', 'created_at'], name='activity_profile_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile.user.username} - {self.weight}kg {self.material_type}"
+
+
+class DailyRollup(models.Model):
+    """
+    Activity totals for one day, maintained by ``accounts/rollups.py``. Rows
+    are kept per center and material; a blank material totals a center's day
+    and the row with neither center nor material totals the whole day, so
+    ``active_users`` never double counts a user.
+    """
+    date = models.DateField()
+    recycling_center = models.ForeignKey('recycling_centers.RecyclingCenter', on_delete=models.CASCADE,
+                                         null=True, blank=True, related_name='daily_rollups')
+    material_type = models.CharField(max_length=20, blank=True)
+    activities = models.PositiveIntegerField(default=0)
+    items = models.PositiveIntegerField(default=0)
+    weight = models.FloatField(default=0.0, help_text="Weight in kg")
+    co2_saved = models.FloatField(default=0.0, help_text="kg of CO2 saved")
+    trees_saved = models.FloatField(default=0.0)
+    active_users = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # NULLs never conflict in a unique index, so rows without a center
+            # get their own partial index
+            models.UniqueConstraint(fields=['date', 'recycling_center', 'material_type'],
+                                    condition=models.Q(recycling_center__isnull=False),
+                                    name='rollup_center_day_unique'),
+            models.UniqueConstraint(fields=['date', 'material_type'],
+                                    condition=models.Q(recycling_center__isnull=True),
+                                    name='rollup_day_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.recycling_center_id or '-'} {self.material_type or 'total'}"
+
+
+class CenterContribution(models.Model):
+    """A user's recycling totals at one center, maintained by ``accounts/leaderboards.py``"""
+    recycling_center = models.ForeignKey('recycling_centers.RecyclingCenter', on_delete=models.CASCADE,
+                                         related_name='contributions')
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='center_contributions')
+    items = models.PositiveIntegerField(default=0)
+    weight = models.FloatField(default=0.0, help_text="Weight in kg")
+    co2_saved = models.FloatField(default=0.0, help_text="kg of CO2 saved")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recycling_center', 'profile'], name='contribution_center_profile_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['recycling_center', '-weight'], name='contribution_weight_rank_idx'),
+            models.Index(fields=['recycling_center', '-co2_saved'], name='contribution_co2_rank_idx'),
+            models.Index(fields=['updated_at'], name='contribution_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} @ {self.recycling_center_id}: {self.weight}kg"
+
+
+class ProfileRemoval(models.Model):
+    """A deleted profile, kept for a while so every process drops it from its leaderboards"""
+    profile_id = models.BigIntegerField()
+    removed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['removed_at'], name='profile_removal_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} removed {self.removed_at}"
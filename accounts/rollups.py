@@ -0,0 +1,153 @@
+"""
+Daily activity rollups behind the dashboards.
+
+``record_rollup`` adds each new activity to three ``DailyRollup`` rows: its
+center and material, its center's day total and the whole day's total.
+Counters are bumped with ``F()`` updates, and a row is created the first time
+its bucket is used that day. A user counts once per bucket and day, found
+from their other activities that day through the profile/date index. Charts
+over a year then read a few hundred rows. ``rebuild_rollups`` recomputes a
+date range from the raw activity, which is what ``manage.py
+backfill_rollups`` runs.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyRollup, RecyclingActivity
+
+# material_type of the rows totalling a center's day, or the whole day
+TOTAL = ''
+SUM_FIELDS = ('activities', 'items', 'weight', 'co2_saved', 'trees_saved')
+
+
+def day_bounds(day):
+    """Aware ``[start, end)`` datetimes of a local calendar day"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _buckets(center_id, material_type):
+    """``(center_id, material_type)`` keys an activity is counted in, with a matcher for earlier ones"""
+    buckets = [((center_id, material_type), lambda other: other == (center_id, material_type))]
+    if center_id is not None:
+        buckets.append(((center_id, TOTAL), lambda other: other[0] == center_id))
+    buckets.append(((None, TOTAL), lambda other: True))
+    return buckets
+
+
+def _add(day, center_id, material_type, values):
+    rows = DailyRollup.objects.filter(date=day, recycling_center_id=center_id, material_type=material_type)
+    increments = {field: F(field) + value for field, value in values.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(
+                date=day, recycling_center_id=center_id, material_type=material_type, **values
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**increments)
+
+
+def record_rollup(activity):
+    """Add a newly saved ``RecyclingActivity`` to the day's rollups"""
+    day = timezone.localdate(activity.created_at)
+    start, end = day_bounds(day)
+    others = set(
+        RecyclingActivity.objects.filter(
+            profile_id=activity.profile_id, created_at__gte=start, created_at__lt=end,
+        ).exclude(pk=activity.pk).values_list('recycling_center_id', 'material_type')
+    )
+    values = {
+        'activities': 1,
+        'items': activity.items,
+        'weight': activity.weight,
+        'co2_saved': activity.co2_saved,
+        'trees_saved': activity.trees_saved,
+    }
+    with transaction.atomic():
+        for (center_id, material_type), seen in _buckets(activity.recycling_center_id, activity.material_type):
+            active = not any(seen(other) for other in others)
+            _add(day, center_id, material_type, {**values, 'active_users': int(active)})
+
+
+def _aggregate(activities, *group_by):
+    return activities.values('day', *group_by).annotate(
+        activities=Count('id'),
+        items=Sum('items'),
+        weight=Sum('weight'),
+        co2_saved=Sum('co2_saved'),
+        trees_saved=Sum('trees_saved'),
+        active_users=Count('profile', distinct=True),
+    ).order_by()
+
+
+def rebuild_rollups(first_day, last_day, batch_size=1000):
+    """Recompute the rollups of ``first_day``..``last_day`` (inclusive), returning the row count"""
+    start, _ = day_bounds(first_day)
+    _, end = day_bounds(last_day)
+    activities = RecyclingActivity.objects.filter(
+        created_at__gte=start, created_at__lt=end,
+    ).annotate(day=TruncDate('created_at'))
+
+    rows = []
+    for grouping in (('recycling_center', 'material_type'), ('recycling_center',), ()):
+        queryset = _aggregate(activities, *grouping)
+        if grouping == ('recycling_center',):
+            queryset = queryset.filter(recycling_center__isnull=False)
+        for row in queryset:
+            rows.append(DailyRollup(
+                date=row['day'],
+                recycling_center_id=row.get('recycling_center'),
+                material_type=row.get('material_type', TOTAL),
+                active_users=row['active_users'],
+                **{field: row[field] or 0 for field in SUM_FIELDS},
+            ))
+
+    with transaction.atomic():
+        DailyRollup.objects.filter(date__gte=first_day, date__lte=last_day).delete()
+        DailyRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def daily_totals(first_day, last_day):
+    """One dict per day of the range, zero-filled, from the whole-day rows"""
+    rows = {
+        row['date']: row for row in DailyRollup.objects.filter(
+            recycling_center__isnull=True, material_type=TOTAL,
+            date__gte=first_day, date__lte=last_day,
+        ).values('date', 'active_users', *SUM_FIELDS)
+    }
+    empty = dict.fromkeys(('active_users',) + SUM_FIELDS, 0)
+    return [
+        rows.get(day, {**empty, 'date': day})
+        for day in (first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1))
+    ]
+
+
+def material_totals(first_day, last_day):
+    """Totals per material over the range, heaviest first"""
+    return list(
+        DailyRollup.objects.filter(date__gte=first_day, date__lte=last_day).exclude(material_type=TOTAL)
+        .values('material_type')
+        .annotate(activities=Sum('activities'), weight=Sum('weight'), co2_saved=Sum('co2_saved'))
+        .order_by('-weight')
+    )
+
+
+def center_totals(first_day, last_day, limit=10):
+    """The centers that took the most weight over the range"""
+    return list(
+        DailyRollup.objects.filter(
+            date__gte=first_day, date__lte=last_day,
+            recycling_center__isnull=False, material_type=TOTAL,
+        )
+        .values('recycling_center', 'recycling_center__name')
+        .annotate(activities=Sum('activities'), weight=Sum('weight'), co2_saved=Sum('co2_saved'))
+        .order_by('-weight')[:limit]
+    )
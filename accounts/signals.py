@@ -0,0 +1,32 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recycling_tracker.thumbnails import schedule_renditions
+
+from .leaderboards import profile_deleted, profile_saved
+from .models import ProfileRemoval, UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+def render_profile_picture(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'profile_picture' in update_fields):
+        schedule_renditions(instance, 'profile_picture', 'profile_picture_renditions')
+
+
+LEADERBOARD_FIELDS = {'public_profile', 'city', 'total_weight_recycled', 'co2_saved'}
+
+
+@receiver(post_save, sender=UserProfile)
+def update_leaderboards(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or LEADERBOARD_FIELDS.intersection(update_fields)):
+        transaction.on_commit(partial(profile_saved, instance))
+
+
+@receiver(post_delete, sender=UserProfile)
+def remove_from_leaderboards(sender, instance, **kwargs):
+    # Other processes' stores only learn about deletions from this row
+    ProfileRemoval.objects.create(profile_id=instance.pk)
+    transaction.on_commit(partial(profile_deleted, instance.pk))
@@ -0,0 +1,126 @@
+import bisect
+import random
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .leaderboards import (
+    REMOVAL_RETENTION, IndexableSkipList, Leaderboard, LeaderboardStore, get_leaderboards, prune_removals,
+    reset_leaderboards,
+)
+from .models import ProfileRemoval, UserProfile
+
+
+class IndexableSkipListTests(SimpleTestCase):
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(1)
+        skip_list, reference = IndexableSkipList(), []
+        for step in range(5000):
+            if reference and rng.random() < 0.4:
+                value = rng.choice(reference)
+                reference.remove(value)
+                skip_list.remove(value)
+            else:
+                value = (rng.random(), step)
+                bisect.insort(reference, value)
+                skip_list.insert(value)
+            if step % 97 == 0:
+                self.assertEqual(len(skip_list), len(reference))
+                self.assertEqual(skip_list.slice(0, len(skip_list)), reference)
+                for value in rng.sample(reference, min(10, len(reference))):
+                    self.assertEqual(skip_list.index(value), reference.index(value))
+                start = rng.randint(0, len(reference))
+                self.assertEqual(skip_list.slice(start, start + 7), reference[start:start + 7])
+
+
+class LeaderboardTests(SimpleTestCase):
+    def test_ranks_match_sorted_scores(self):
+        rng = random.Random(2)
+        board, scores = Leaderboard(), {}
+        for _ in range(3000):
+            member = rng.randint(1, 500)
+            score = rng.choice([0, rng.uniform(0, 100), round(rng.uniform(0, 5))])
+            board.set(member, score)
+            if score > 0:
+                scores[member] = score
+            else:
+                scores.pop(member, None)
+        order = sorted(scores, key=lambda member: (-scores[member], member))
+        self.assertEqual([member for _, member, _ in board.top(len(order))], order)
+        self.assertEqual([board.rank(member) for member in order], list(range(1, len(order) + 1)))
+        self.assertEqual(board.top(5, 10), [(11 + i, member, scores[member]) for i, member in enumerate(order[10:15])])
+
+    def test_non_finite_scores_are_dropped(self):
+        board = Leaderboard([(1, 5.0), (2, 3.0)])
+        board.set(1, float('nan'))
+        board.set(2, float('inf'))
+        self.assertEqual(len(board), 0)
+
+
+class LeaderboardStoreTests(TestCase):
+    def setUp(self):
+        self.profiles = [
+            UserProfile.objects.create(
+                user=User.objects.create_user(f'user{i}'), public_profile=True, city='Springfield',
+                total_weight_recycled=10.0 * (i + 1), co2_saved=i + 1.0,
+            )
+            for i in range(3)
+        ]
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        self.snapshot = Path(snapshot_dir.name) / 'leaderboards.json'
+
+    def ranking(self, store):
+        return [member for _, member, _ in store.board('global', 'weight').top(10)]
+
+    def test_sync_drops_profiles_deleted_by_another_process(self):
+        store = LeaderboardStore()
+        store.load_from_database()
+        self.assertEqual(self.ranking(store), [p.pk for p in reversed(self.profiles)])
+        # The signal handlers only update the process's own store
+        self.profiles[2].user.delete()
+        store.sync(force=True)
+        self.assertEqual(self.ranking(store), [self.profiles[1].pk, self.profiles[0].pk])
+
+    def test_snapshot_restore_drops_profiles_deleted_since(self):
+        store = LeaderboardStore()
+        store.load_from_database()
+        store.save_snapshot(self.snapshot)
+        self.profiles[0].user.delete()
+
+        restored = LeaderboardStore()
+        self.assertTrue(restored.load_snapshot(self.snapshot))
+        restored.sync(force=True)
+        self.assertEqual(self.ranking(restored), [self.profiles[2].pk, self.profiles[1].pk])
+
+    def test_stale_store_reloads_once_removals_are_pruned(self):
+        store = LeaderboardStore()
+        store.load_from_database()
+        store.synced_at -= REMOVAL_RETENTION * 2
+        self.profiles[2].user.delete()
+        ProfileRemoval.objects.update(removed_at=store.synced_at)
+        self.assertEqual(prune_removals(), 1)
+        store.sync(force=True)
+        self.assertEqual(self.ranking(store), [self.profiles[1].pk, self.profiles[0].pk])
+
+    def test_sync_sees_totals_fixed_by_reconcile_impact(self):
+        store = LeaderboardStore()
+        store.load_from_database()
+        # No activity history backs these totals, so reconciling clears them;
+        # the sync must not take the old updated_at for "unchanged"
+        UserProfile.objects.filter(pk=self.profiles[0].pk).update(updated_at=store.synced_at - timedelta(days=1))
+        call_command('reconcile_impact', stdout=StringIO())
+        store.sync(force=True)
+        self.assertEqual(self.ranking(store), [])
+
+    def test_requests_never_write_the_snapshot(self):
+        with override_settings(LEADERBOARD_SNAPSHOT_PATH=self.snapshot):
+            reset_leaderboards()
+            self.addCleanup(reset_leaderboards)
+            get_leaderboards().board('global', 'weight')
+            self.assertFalse(self.snapshot.exists())
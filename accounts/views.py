@@ -1,10 +1,25 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
-from .models import UserProfile
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .leaderboards import METRICS, get_leaderboards
+from .middleware import get_profile
+from .models import RecyclingActivity, UserProfile
+from .rollups import center_totals, daily_totals, material_totals
+from recycling_centers.models import RecyclingCenter
+from recycling_tracker.thumbnails import rendition_urls
 from django.contrib.auth import logout
 
+DASHBOARD_RANGES = (30, 90, 365)
+LEADERBOARD_SIZE = 25
+
 
 def login_view(request):
     """Handle user login"""
@@ -40,4 +55,123 @@ def register(request):
 def logout_view(request):
     logout(request)
     messages.success(request, "You have been logged out.")
-    return redirect("login")
\ No newline at end of file
+    return redirect("login")
+
+def _is_admin(user):
+    if user.is_superuser or user.is_staff:
+        return True
+    profile = getattr(user, "userprofile", None)
+    return profile is not None and profile.user_type == "admin"
+
+def _dashboard_days(request, default=90):
+    try:
+        days = int(request.GET.get("days", default))
+    except (TypeError, ValueError):
+        days = default
+    return days if days in DASHBOARD_RANGES else default
+
+@login_required
+def dashboard(request):
+    """A user's impact totals and their last year of activity"""
+    profile = get_profile(request)
+    if profile is None:
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    since = timezone.now() - timedelta(days=365)
+    # A single user's year of activity is a short range scan of the
+    # (profile, created_at) index, so it is aggregated on the fly
+    activities = RecyclingActivity.objects.filter(profile=profile, created_at__gte=since)
+    monthly = list(
+        activities.annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(weight=Sum("weight"), co2_saved=Sum("co2_saved"), activities=Count("id"))
+        .order_by("month")
+    )
+    materials = list(
+        activities.values("material_type")
+        .annotate(weight=Sum("weight"), activities=Count("id"))
+        .order_by("-weight")
+    )
+
+    return render(request, "accounts/dashboard.html", {
+        "profile": profile,
+        "picture": rendition_urls(profile.profile_picture, profile.profile_picture_renditions, "small"),
+        "materials": materials,
+        "recent_activities": profile.activities.select_related("recycling_center").order_by("-created_at")[:10],
+        "chart": {
+            "labels": [row["month"].strftime("%b %Y") for row in monthly],
+            "weight": [round(row["weight"], 2) for row in monthly],
+            "co2_saved": [round(row["co2_saved"], 2) for row in monthly],
+        },
+        "is_admin": _is_admin(request.user),
+        "leaderboard_rank": get_leaderboards().board("global", "weight").rank(profile.pk),
+    })
+
+@login_required
+def admin_dashboard(request):
+    """Platform-wide volume, weight, CO2 and active users read from the daily rollups"""
+    if not _is_admin(request.user):
+        raise PermissionDenied
+
+    days = _dashboard_days(request)
+    last_day = timezone.localdate()
+    first_day = last_day - timedelta(days=days - 1)
+    daily = daily_totals(first_day, last_day)
+
+    return render(request, "accounts/admin_dashboard.html", {
+        "days": days,
+        "ranges": DASHBOARD_RANGES,
+        "totals": {
+            "activities": sum(row["activities"] for row in daily),
+            "weight": sum(row["weight"] for row in daily),
+            "co2_saved": sum(row["co2_saved"] for row in daily),
+            "peak_active_users": max((row["active_users"] for row in daily), default=0),
+        },
+        "materials": material_totals(first_day, last_day),
+        "centers": center_totals(first_day, last_day),
+        "chart": {
+            "labels": [row["date"].isoformat() for row in daily],
+            "weight": [round(row["weight"], 2) for row in daily],
+            "co2_saved": [round(row["co2_saved"], 2) for row in daily],
+            "active_users": [row["active_users"] for row in daily],
+        },
+    })
+
+def leaderboard(request):
+    """Top public profiles by weight or CO2, globally, in a city or at a center, with the user's rank"""
+    profile = get_profile(request) if request.user.is_authenticated else None
+    metric = request.GET.get("metric") if request.GET.get("metric") in METRICS else "weight"
+    scope = request.GET.get("scope", "global")
+    city = center = None
+    if scope == "city":
+        city = request.GET.get("city") or (profile.city if profile else "")
+        if not city.strip():
+            scope = "global"
+    elif scope == "center":
+        try:
+            center = RecyclingCenter.objects.only("id", "name").get(pk=request.GET.get("center"))
+        except (RecyclingCenter.DoesNotExist, ValueError, TypeError):
+            scope = "global"
+    else:
+        scope = "global"
+
+    key = {"city": city, "center": center and center.pk}.get(scope)
+    board = get_leaderboards().board(scope, metric, key)
+    entries = board.top(LEADERBOARD_SIZE)
+    usernames = dict(
+        UserProfile.objects.filter(pk__in=[member for _, member, _ in entries]).values_list("id", "user__username")
+    )
+
+    return render(request, "accounts/leaderboard.html", {
+        "scope": scope,
+        "metric": metric,
+        "city": city,
+        "center": center,
+        "entries": [
+            {"rank": rank, "username": usernames[member], "score": score, "is_me": profile is not None and member == profile.pk}
+            for rank, member, score in entries if member in usernames
+        ],
+        "total": len(board),
+        "profile": profile,
+        "my_rank": board.rank(profile.pk) if profile else None,
+        "my_score": board.score(profile.pk) if profile else None,
+    })
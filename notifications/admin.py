@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Notification, OutboxMessage
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'title', 'notification_type', 'is_read', 'created_at')
+    list_filter = ('notification_type', 'is_read', 'created_at')
+    search_fields = ('recipient__username', 'title', 'message')
+    list_select_related = ('recipient',)
+    raw_id_fields = ('recipient',)
+    readonly_fields = ('read_at',)
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('channel', 'address', 'subject', 'status', 'attempts', 'available_at', 'sent_at')
+    list_filter = ('channel', 'status')
+    search_fields = ('address', 'subject')
+    raw_id_fields = ('recipient',)
+    readonly_fields = ('claimed_by', 'claimed_at', 'last_error', 'sent_at')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected messages now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', available_at=timezone.now(), attempts=0)
+        self.message_user(request, f'{updated} messages queued for retry.')
@@ -0,0 +1,74 @@
+"""
+Per-user unread notification counters kept in the cache.
+
+The badge in every open tab asks for the unread count, so it is answered from
+a cached integer instead of a ``COUNT(*)``. Creating, reading and deleting
+notifications through ``services.py`` (and the signal handlers for single
+saves and deletes) adjust the counter in place with ``incr``/``decr``. A
+missing counter is recounted from the database on the next read, so evictions
+and cache flushes only cost one indexed query.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+# Recount at least this often so a counter can never drift for long
+COUNTER_TIMEOUT = 60 * 60 * 24
+
+
+def get_cache():
+    return caches[getattr(settings, 'NOTIFICATIONS_CACHE_ALIAS', 'default')]
+
+
+def counter_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def count_unread(user_id):
+    from .models import Notification
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    """Unread notifications of a user, recounted only when not cached"""
+    cache = get_cache()
+    count = cache.get(counter_key(user_id))
+    if count is None:
+        count = count_unread(user_id)
+        # add() rather than set(): a concurrent incr() may already have
+        # recreated the counter and must not be overwritten
+        cache.add(counter_key(user_id), count, timeout=COUNTER_TIMEOUT)
+        count = cache.get(counter_key(user_id), count)
+    return count
+
+
+async def aget_unread_count(user_id):
+    """Async ``get_unread_count``; only touches the database on a cache miss"""
+    count = await get_cache().aget(counter_key(user_id))
+    if count is None:
+        from asgiref.sync import sync_to_async
+        count = await sync_to_async(get_unread_count)(user_id)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """Add ``delta`` to a cached counter; uncached counters are left to be recounted"""
+    if not delta:
+        return
+    cache = get_cache()
+    key = counter_key(user_id)
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        return
+    if count < 0:
+        # Drifted below zero (e.g. a race with a recount), start over
+        cache.delete(key)
+
+
+def set_unread_count(user_id, count):
+    get_cache().set(counter_key(user_id), count, timeout=COUNTER_TIMEOUT)
+
+
+def reset_unread_count(user_id):
+    """Forget a counter so the next read recounts it"""
+    get_cache().delete(counter_key(user_id))
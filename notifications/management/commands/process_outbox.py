@@ -0,0 +1,63 @@
+import logging
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.models import OutboxMessage
+from notifications.outbox import claim_batch, claim_limit, deliver_batch, rate_limiters
+
+CHANNELS = [channel for channel, _ in OutboxMessage.CHANNELS]
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued email and SMS notifications from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed per batch')
+        parser.add_argument('--channel', choices=CHANNELS, action='append',
+                            help='Only deliver this channel (repeatable); defaults to all')
+        parser.add_argument('--once', action='store_true', help='Exit once the outbox has nothing due')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='Seconds to sleep when nothing is due')
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}-{os.getpid()}'
+        channels = options['channel'] or CHANNELS
+        limiters = rate_limiters()
+        limits = {channel: claim_limit(limiters[channel], options['batch_size']) for channel in channels}
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        try:
+            while True:
+                processed = 0
+                for channel in channels:
+                    try:
+                        batch = claim_batch(channel, limits[channel], worker_id)
+                        if not batch:
+                            continue
+                        sent, retried, failed = deliver_batch(channel, batch, limiters[channel])
+                    except Exception:
+                        # e.g. the database went away; a claimed batch is
+                        # picked up again once its lease runs out
+                        logger.exception('Could not deliver a batch of %s messages', channel)
+                        continue
+                    processed += len(batch)
+                    totals['sent'] += sent
+                    totals['retried'] += retried
+                    totals['failed'] += failed
+                    self.stdout.write(f'{channel}: {sent} sent, {retried} to retry, {failed} failed')
+                if not processed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            # Messages claimed by an interrupted batch are reclaimed after the lease
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, {totals['retried']} scheduled for retry, {totals['failed']} failed"
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('info', 'Information'), ('request', 'Recycling Request'), ('achievement', 'Achievement'), ('center', 'Recycling Center'), ('system', 'System')], default='info', max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField(blank=True)),
+                ('link', models.CharField(blank=True, max_length=500)),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['recipient', 'is_read'], name='notification_unread_idx'), models.Index(fields=['recipient', '-created_at'], name='notification_recent_idx')],
+            },
+        ),
+    ]
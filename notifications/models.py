@@ -0,0 +1,69 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+class Notification(models.Model):
+    NOTIFICATION_TYPES = (
+        ('info', 'Information'),
+        ('request', 'Recycling Request'),
+        ('achievement', 'Achievement'),
+        ('center', 'Recycling Center'),
+        ('system', 'System'),
+    )
+
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES, default='info')
+    title = models.CharField(max_length=200)
+    message = models.TextField(blank=True)
+    link = models.CharField(max_length=500, blank=True)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read'], name='notification_unread_idx'),
+            models.Index(fields=['recipient', '-created_at'], name='notification_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient.username}: {self.title}"
+
+class OutboxMessage(models.Model):
+    """
+    An email or SMS waiting to be delivered by ``manage.py process_outbox``,
+    written in the same transaction as the change that caused it.
+    """
+    CHANNELS = (
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    )
+    STATUSES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    channel = models.CharField(max_length=10, choices=CHANNELS)
+    recipient = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_messages')
+    address = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'channel', 'available_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.address} ({self.status})"
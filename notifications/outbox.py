@@ -0,0 +1,242 @@
+"""
+Durable, database-backed outbox for email and SMS notifications.
+
+Request handlers only write rows: ``send_notification`` and ``broadcast``
+create the in-app notifications and one ``OutboxMessage`` per external
+channel the recipient opted into, in the same transaction. ``manage.py
+process_outbox`` claims due messages in batches, sends each email batch over
+a single SMTP connection, throttles every channel to its configured rate and
+reschedules failures with exponential backoff until ``MAX_ATTEMPTS``. When the
+connection itself cannot be opened, every message of the batch counts as a
+failed attempt.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+from .services import notify, notify_many
+from .sms import SMSMessage, get_sms_backend
+
+MAX_ATTEMPTS = 5
+# Seconds before the first retry; doubles with every further attempt
+RETRY_BACKOFF = 30
+# Claimed messages not finished within this many seconds are claimed again
+CLAIM_LEASE = 300
+# Share of the lease a throttled batch may spend waiting on its rate limit,
+# leaving the rest for slow sends
+LEASE_THROTTLE_SHARE = 0.5
+
+
+def _contacts(users):
+    """``(user_id, email, wants_email, wants_sms, phone)`` rows for a User queryset"""
+    return users.values_list(
+        'id', 'email',
+        'userprofile__email_notifications', 'userprofile__sms_notifications',
+        'userprofile__phone_number',
+    )
+
+
+def _outbox_messages(contacts, subject, body):
+    messages = []
+    for user_id, email, wants_email, wants_sms, phone in contacts:
+        if wants_email and email:
+            messages.append(OutboxMessage(
+                channel='email', recipient_id=user_id, address=email, subject=subject, body=body,
+            ))
+        if wants_sms and phone:
+            messages.append(OutboxMessage(
+                channel='sms', recipient_id=user_id, address=phone, subject=subject, body=body,
+            ))
+    return messages
+
+
+def send_notification(user, title, message='', notification_type='info', link=''):
+    """
+    Notify one user in-app and queue the emails/SMS their profile asks for.
+    Returns the in-app ``Notification``.
+    """
+    with transaction.atomic():
+        notification = notify(user, title, message, notification_type, link)
+        OutboxMessage.objects.bulk_create(
+            _outbox_messages(_contacts(User.objects.filter(pk=user.pk)), title, message)
+        )
+    return notification
+
+
+def broadcast(users, title, message='', notification_type='info', link='', batch_size=1000):
+    """
+    Notify every user of a ``User`` queryset, writing in-app notifications
+    and outbox messages with ``bulk_create`` one chunk of users at a time.
+    Returns the number of users notified.
+    """
+    contacts = _contacts(users.order_by('pk'))
+    notified = 0
+    last_id = 0
+    while True:
+        chunk = list(contacts.filter(pk__gt=last_id)[:batch_size])
+        if not chunk:
+            return notified
+        last_id = chunk[-1][0]
+        with transaction.atomic():
+            notify_many([row[0] for row in chunk], title, message, notification_type, link, batch_size)
+            OutboxMessage.objects.bulk_create(_outbox_messages(chunk, title, message), batch_size=batch_size)
+        notified += len(chunk)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` sends per second; ``None`` never waits"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            time.sleep((1 - self.tokens) / self.rate)
+            self.tokens = 1
+            self.updated = time.monotonic()
+        self.tokens -= 1
+
+
+def claim_limit(limiter, batch_size):
+    """
+    Messages to claim at once for a channel throttled by ``limiter``: a batch
+    that outlived its lease would be claimed and sent again by another worker
+    """
+    if not limiter.rate:
+        return batch_size
+    return max(1, min(batch_size, int(limiter.rate * CLAIM_LEASE * LEASE_THROTTLE_SHARE)))
+
+
+def rate_limiters():
+    """One limiter per channel from the ``NOTIFICATIONS_RATE_LIMITS`` setting"""
+    limits = getattr(settings, 'NOTIFICATIONS_RATE_LIMITS', {})
+    return {channel: RateLimiter(limits.get(channel)) for channel, _ in OutboxMessage.CHANNELS}
+
+
+def claim_batch(channel, limit, worker_id):
+    """
+    Claim up to ``limit`` due messages of a channel for ``worker_id``.
+
+    The claiming UPDATE re-checks that each row is still due, so concurrent
+    workers never claim the same message; ``SKIP LOCKED`` is used where the
+    database supports it to keep them from waiting on each other.
+    """
+    now = timezone.now()
+    due = Q(status='pending', available_at__lte=now) | Q(
+        status='sending', claimed_at__lt=now - timedelta(seconds=CLAIM_LEASE)
+    )
+    with transaction.atomic():
+        candidates = OutboxMessage.objects.filter(due, channel=channel).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        OutboxMessage.objects.filter(due, id__in=ids).update(
+            status='sending', claimed_by=worker_id, claimed_at=now,
+        )
+    return list(OutboxMessage.objects.filter(
+        id__in=ids, status='sending', claimed_by=worker_id, claimed_at=now,
+    ).order_by('id'))
+
+
+def _unsent(messages, error):
+    # The gateway could not be reached, so the whole batch is retried
+    for message in messages:
+        yield message, error
+
+
+def _send_emails(messages, limiter):
+    email_connection = get_connection()
+    try:
+        email_connection.open()
+    except Exception as exc:
+        yield from _unsent(messages, exc)
+        return
+    try:
+        for message in messages:
+            limiter.wait()
+            try:
+                email = EmailMessage(message.subject, message.body, to=[message.address], connection=email_connection)
+                if not email_connection.send_messages([email]):
+                    raise RuntimeError('email backend did not send the message')
+            except Exception as exc:
+                yield message, exc
+            else:
+                yield message, None
+    finally:
+        email_connection.close()
+
+
+def _send_sms(messages, limiter):
+    backend = get_sms_backend()
+    try:
+        backend.open()
+    except Exception as exc:
+        yield from _unsent(messages, exc)
+        return
+    try:
+        for message in messages:
+            limiter.wait()
+            try:
+                if not backend.send_messages([SMSMessage(message.address, message.body)]):
+                    raise RuntimeError('SMS backend did not send the message')
+            except Exception as exc:
+                yield message, exc
+            else:
+                yield message, None
+    finally:
+        backend.close()
+
+
+SENDERS = {
+    'email': _send_emails,
+    'sms': _send_sms,
+}
+
+
+def deliver_batch(channel, messages, limiter):
+    """Send claimed messages of one channel, returning ``(sent, retried, failed)``"""
+    now = timezone.now()
+    sent_ids, retried, failed = [], [], []
+    for message, error in SENDERS[channel](messages, limiter):
+        message.attempts += 1
+        if error is None:
+            sent_ids.append(message.id)
+            continue
+        message.last_error = f'{type(error).__name__}: {error}'
+        message.claimed_by = ''
+        if message.attempts >= MAX_ATTEMPTS:
+            message.status = 'failed'
+            failed.append(message)
+        else:
+            delay = RETRY_BACKOFF * 2 ** (message.attempts - 1)
+            message.status = 'pending'
+            message.available_at = now + timedelta(seconds=random.uniform(delay / 2, delay))
+            retried.append(message)
+
+    with transaction.atomic():
+        if sent_ids:
+            OutboxMessage.objects.filter(id__in=sent_ids).update(
+                status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='',
+            )
+        OutboxMessage.objects.bulk_update(
+            retried + failed, ['status', 'attempts', 'available_at', 'claimed_by', 'last_error'],
+        )
+    return len(sent_ids), len(retried), len(failed)
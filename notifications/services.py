@@ -0,0 +1,75 @@
+"""
+Creating and updating notifications while keeping the unread counters in
+``counters.py`` in step. Queryset updates and ``bulk_create`` bypass the
+model signals, so the functions using them adjust the counters themselves.
+Counters only change once the transaction commits: a rolled back write must
+not move them, and a recount before the commit would miss it.
+"""
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import adjust_unread_count, set_unread_count
+from .models import Notification
+
+
+def notify(recipient, title, message='', notification_type='info', link=''):
+    """Create one notification; the post_save handler counts it"""
+    return Notification.objects.create(
+        recipient=recipient,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        link=link,
+    )
+
+
+def notify_many(recipients, title, message='', notification_type='info', link='', batch_size=1000):
+    """Send the same notification to many users (instances or ids) with bulk inserts"""
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                recipient_id=getattr(recipient, 'pk', recipient),
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                link=link,
+            )
+            for recipient in recipients
+        ],
+        batch_size=batch_size,
+    )
+    for user_id, created in Counter(n.recipient_id for n in notifications).items():
+        transaction.on_commit(partial(adjust_unread_count, user_id, created))
+    return notifications
+
+
+def mark_read(user, notification_id):
+    """
+    Mark one of ``user``'s notifications as read. Returns False when it does
+    not exist; marking an already read notification is a no-op.
+    """
+    updated = Notification.objects.filter(
+        pk=notification_id, recipient=user, is_read=False,
+    ).update(is_read=True, read_at=timezone.now())
+    if updated:
+        transaction.on_commit(partial(adjust_unread_count, user.pk, -1))
+        return True
+    return Notification.objects.filter(pk=notification_id, recipient=user).exists()
+
+
+def mark_all_read(user):
+    """Mark every unread notification of ``user`` as read, returning how many"""
+    updated = Notification.objects.filter(recipient=user, is_read=False).update(
+        is_read=True, read_at=timezone.now(),
+    )
+    transaction.on_commit(partial(set_unread_count, user.pk, 0))
+    return updated
+
+
+def delete_notification(user, notification_id):
+    """Delete one of ``user``'s notifications; the post_delete handler uncounts it"""
+    deleted, _ = Notification.objects.filter(pk=notification_id, recipient=user).delete()
+    return bool(deleted)
@@ -0,0 +1,23 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import adjust_unread_count, reset_unread_count
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not instance.is_read:
+        transaction.on_commit(partial(adjust_unread_count, instance.recipient_id, 1))
+    elif not created:
+        # The previous read state is unknown here, so recount lazily
+        transaction.on_commit(partial(reset_unread_count, instance.recipient_id))
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        transaction.on_commit(partial(adjust_unread_count, instance.recipient_id, -1))
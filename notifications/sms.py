@@ -0,0 +1,76 @@
+"""
+Pluggable SMS backends, modelled on Django's email backends.
+
+``SMS_BACKEND`` names the backend class. ``ConsoleSMSBackend`` prints
+messages and ``LocmemSMSBackend`` keeps them in ``notifications.sms.outbox``
+for local development and tests; a real gateway implements ``send_messages``
+the same way.
+"""
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages sent through LocmemSMSBackend
+outbox = []
+
+
+class SMSMessage:
+    def __init__(self, to, body):
+        self.to = to
+        self.body = body
+
+    def __repr__(self):
+        return f'SMSMessage(to={self.to!r})'
+
+
+class BaseSMSBackend:
+    """Interface every SMS backend implements"""
+
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        """Open a connection to the gateway, if it uses one"""
+
+    def close(self):
+        """Close the connection opened by ``open``"""
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send_messages(self, messages):
+        """Send ``SMSMessage`` objects, returning how many were sent"""
+        raise NotImplementedError
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    _lock = threading.Lock()
+
+    def __init__(self, *args, stream=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream or sys.stdout
+
+    def send_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                self.stream.write(f'SMS to {message.to}: {message.body}\n')
+            self.stream.flush()
+        return len(messages)
+
+
+class LocmemSMSBackend(BaseSMSBackend):
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+def get_sms_backend(backend=None, **kwargs):
+    """Instantiate the configured SMS backend"""
+    path = backend or getattr(settings, 'SMS_BACKEND', 'notifications.sms.ConsoleSMSBackend')
+    return import_string(path)(**kwargs)
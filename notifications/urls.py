@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.notification_list, name='notification_list'),
+    path('unread-count/', views.unread_count, name='notification_unread_count'),
+    path('stream/', views.notification_stream, name='notification_stream'),
+    path('mark-all-read/', views.notification_mark_all_read, name='notification_mark_all_read'),
+    path('<int:notification_id>/mark-read/', views.notification_mark_read, name='notification_mark_read'),
+    path('<int:notification_id>/delete/', views.notification_delete, name='notification_delete'),
+]
@@ -0,0 +1,120 @@
+from django.shortcuts import render
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from .counters import aget_unread_count, get_unread_count
+from .services import delete_notification, mark_all_read, mark_read
+import asyncio
+import json
+
+NOTIFICATIONS_PER_PAGE = 20
+
+# Server-Sent Events stream tuning, in seconds. The stream re-reads the
+# cached counter (no database query) every poll interval and closes after
+# STREAM_MAX_AGE so that EventSource reconnects through a fresh request.
+STREAM_POLL_INTERVAL = 2
+STREAM_HEARTBEAT = 15
+STREAM_MAX_AGE = 300
+STREAM_RETRY_MS = 5000
+
+
+@login_required
+def notification_list(request):
+    """Paginated list of the user's notifications"""
+    notifications = request.user.notifications.all()
+    page = Paginator(notifications, NOTIFICATIONS_PER_PAGE).get_page(request.GET.get('page'))
+    
+    context = {
+        'page_obj': page,
+        'notifications': page.object_list,
+        'unread_count': get_unread_count(request.user.pk),
+    }
+    
+    return render(request, 'notifications/list.html', context)
+
+
+def _unread_count(request):
+    if not request.user.is_authenticated:
+        return 0
+    return get_unread_count(request.user.pk)
+
+
+def unread_count_etag(request):
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    return f'{user_id}-{_unread_count(request)}'
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=unread_count_etag)
+def unread_count(request):
+    """
+    Unread badge count for the polling fallback. The count comes from the
+    cached counter, and an unchanged count is answered with 304 Not Modified.
+    """
+    return JsonResponse({'count': _unread_count(request)})
+
+
+@login_required
+@require_POST
+def notification_mark_read(request, notification_id):
+    if not mark_read(request.user, notification_id):
+        return JsonResponse({'success': False, 'error': 'Notification not found'}, status=404)
+    return JsonResponse({'success': True, 'unread_count': get_unread_count(request.user.pk)})
+
+
+@login_required
+@require_POST
+def notification_mark_all_read(request):
+    updated = mark_all_read(request.user)
+    return JsonResponse({'success': True, 'updated': updated, 'unread_count': 0})
+
+
+@login_required
+@require_POST
+def notification_delete(request, notification_id):
+    if not delete_notification(request.user, notification_id):
+        return JsonResponse({'success': False, 'error': 'Notification not found'}, status=404)
+    return JsonResponse({'success': True, 'unread_count': get_unread_count(request.user.pk)})
+
+
+def _event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
+
+async def _unread_events(user_id):
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    last_count = None
+    yield f'retry: {STREAM_RETRY_MS}\n\n'
+    while loop.time() - started < STREAM_MAX_AGE:
+        count = await aget_unread_count(user_id)
+        if count != last_count:
+            yield _event('unread', {'count': count})
+            last_count, last_sent = count, loop.time()
+        elif loop.time() - last_sent >= STREAM_HEARTBEAT:
+            # Comment lines keep proxies from closing an idle connection
+            yield ': keep-alive\n\n'
+            last_sent = loop.time()
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+
+async def notification_stream(request):
+    """
+    Push unread counts to the badge as Server-Sent Events.
+
+    Only served under ASGI (``recycling_tracker/asgi.py``), where an open
+    stream costs a coroutine rather than a worker thread. Under WSGI, and for
+    anonymous users, it answers 204 No Content, which tells EventSource not to
+    reconnect so that the page falls back to polling ``unread_count``.
+    """
+    user = await request.auser()
+    if not isinstance(request, ASGIRequest) or not user.is_authenticated:
+        return HttpResponse(status=204)
+    
+    response = StreamingHttpResponse(_unread_events(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,5 +1,33 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.template.response import TemplateResponse
+from accounts.models import UserProfile
+from recycling_tracker.pagination import EstimatedCountPaginator
+from .cache import bump_centers_version, bump_load_version
 from .models import RecyclingCenter, AcceptedMaterial
+from .queries import availability_expression
+from .search import get_search_backend
+
+
+# Admin searches list the best matches only
+SEARCH_RESULT_LIMIT = 1000
+
+
+def _search_ids(search_term):
+    """Ids of the best centers matching ``search_term`` in the search index"""
+    # Resolved up front so the search runs once, rather than embedded as a
+    # (possibly correlated) subquery of the changelist query
+    matches = get_search_backend().search(RecyclingCenter.objects.all(), search_term)
+    return list(matches.values_list('pk', flat=True)[:SEARCH_RESULT_LIMIT])
+
+
+class AssignStaffForm(forms.Form):
+    staff = forms.ModelMultipleChoiceField(
+        queryset=UserProfile.objects.filter(user_type='staff').select_related('user').order_by('user__username'),
+        widget=forms.CheckboxSelectMultiple,
+    )
 
 class AcceptedMaterialInline(admin.TabularInline):
     model = AcceptedMaterial
@@ -9,16 +37,117 @@ class AcceptedMaterialInline(admin.TabularInline):
 class RecyclingCenterAdmin(admin.ModelAdmin):
     list_display = ('name', 'address', 'phone_number', 'capacity', 'current_load', 'availability_percentage', 'is_active')
     list_filter = ('is_active', 'created_at')
+    # Searched through the search index, see get_search_results()
     search_fields = ('name', 'address', 'phone_number', 'email')
     readonly_fields = ('created_at', 'updated_at', 'availability_percentage')
     inlines = [AcceptedMaterialInline]
-    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['activate', 'deactivate', 'reset_load', 'assign_staff']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(availability=availability_expression())
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(pk__in=_search_ids(search_term)) |
+            Q(phone_number=search_term) |
+            Q(email=search_term)
+        ), False
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if db_field.name == 'staff_members':
+            # Option labels show the username
+            kwargs['queryset'] = UserProfile.objects.filter(user_type='staff').select_related('user')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    @admin.display(description='Availability', ordering='availability')
     def availability_percentage(self, obj):
-        return f"{obj.availability_percentage:.1f}%"
-    availability_percentage.short_description = 'Availability'
+        availability = getattr(obj, 'availability', None)
+        if availability is None:
+            availability = obj.availability_percentage
+        return f"{availability:.1f}%"
+
+    # Actions run as single UPDATEs, which skip model signals, so each one
+    # refreshes cached center payloads itself.
+
+    @admin.action(description='Activate selected centers')
+    def activate(self, request, queryset):
+        updated = queryset.filter(is_active=False).update(is_active=True, updated_at=Now())
+        if updated:
+            bump_centers_version()
+        self.message_user(request, f'{updated} centers activated.')
+
+    @admin.action(description='Deactivate selected centers and reassign their open requests')
+    def deactivate(self, request, queryset):
+        from recycling_requests.models import RecyclingRequest
+        from recycling_requests.services import reassign_requests
+
+        ids = list(queryset.filter(is_active=True).values_list('pk', flat=True))
+        updated = RecyclingCenter.objects.filter(pk__in=ids).update(is_active=False, updated_at=Now())
+        if not updated:
+            self.message_user(request, '0 centers deactivated.')
+            return
+        bump_centers_version()
+        moved, unassigned = reassign_requests(RecyclingRequest.objects.filter(center_id__in=ids))
+        self.message_user(request, f'{updated} centers deactivated, {moved} open requests reassigned.')
+        if unassigned:
+            self.message_user(request, f'{unassigned} requests found no other center.', messages.WARNING)
+
+    @admin.action(description="Reset today's load of selected centers")
+    def reset_load(self, request, queryset):
+        updated = queryset.filter(current_load__gt=0).update(current_load=0, updated_at=Now())
+        if updated:
+            bump_load_version()
+        self.message_user(request, f'Load reset for {updated} centers.')
+
+    @admin.action(description='Assign staff to selected centers')
+    def assign_staff(self, request, queryset):
+        form = AssignStaffForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            through = RecyclingCenter.staff_members.through
+            center_ids = list(queryset.values_list('pk', flat=True))
+            # One multi-row INSERT; existing assignments are left alone
+            through.objects.bulk_create(
+                [
+                    through(recyclingcenter_id=center_id, userprofile_id=profile.pk)
+                    for center_id in center_ids
+                    for profile in form.cleaned_data['staff']
+                ],
+                ignore_conflicts=True,
+            )
+            bump_centers_version()
+            self.message_user(
+                request, f"Assigned {len(form.cleaned_data['staff'])} staff to {len(center_ids)} centers."
+            )
+            return None
+        return TemplateResponse(request, 'admin/recycling_centers/assign_staff.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Assign staff',
+            'opts': self.model._meta,
+            'form': form,
+            'centers': queryset,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+        })
 
 @admin.register(AcceptedMaterial)
 class AcceptedMaterialAdmin(admin.ModelAdmin):
     list_display = ('recycling_center', 'material_type', 'description')
     list_filter = ('material_type',)
-    search_fields = ('recycling_center__name', 'material_type')
\ No newline at end of file
+    search_fields = ('recycling_center__name', 'material_type')
+    list_select_related = ('recycling_center',)
+    raw_id_fields = ('recycling_center',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(recycling_center__in=_search_ids(search_term)) |
+            Q(material_type=search_term.lower())
+        ), False
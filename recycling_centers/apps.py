@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class RecyclingCentersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'recycling_centers'
\ No newline at end of file
+    name = 'recycling_centers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,272 @@
+"""
+Automatic assignment of recycling requests to the best center.
+
+A center is a candidate for a material when it is active, accepts the
+material and has free capacity left today for the request's weight. Approved
+requests hold their weight in ``current_load`` (``capacity.py``); pending ones
+are counted on top of it, so requests assigned one after another spill over
+to the next best center once the first one is booked up. Candidates are
+ranked by
+
+    score = distance_km + LOAD_PENALTY_KM * (1 - availability_percentage / 100)
+
+so a nearly full center only wins when it is clearly closer. The centers
+are held in column arrays (``AssignmentIndex``) tagged with the centers
+version from ``cache.py``: any change to a center or its materials bumps the
+version and the next assignment rebuilds the index. A load change, or a
+pending request being created, reviewed or moved, only bumps the load
+version, after which the free capacity alone is re-read.
+
+``assign_many`` scores a whole batch of requests against all candidates in
+one vectorized pass per round (a matrix product of precomputed unit
+vectors rather than trigonometry per pair), and balances load: a center takes
+requests up to its free capacity, best scores first, and the rest move on to
+their next best center in the following round.
+"""
+import copy
+import threading
+from collections import defaultdict
+
+from django.db.models import Sum, Value
+from django.db.models.functions import Ceil, Greatest
+
+from .cache import get_centers_version, get_load_version
+from .geo import batch_distances, np, unit_vectors, vector_distance_matrix
+from .models import AcceptedMaterial, RecyclingCenter
+
+# Extra kilometres a full center costs compared to an empty one
+LOAD_PENALTY_KM = 5.0
+# Requests scored together; bounds the size of the distance matrix
+ASSIGNMENT_CHUNK = 512
+
+
+class AssignmentIndex:
+    """Coordinates, free capacity and accepted materials of the active centers"""
+
+    def __init__(self, centers, materials, loads):
+        self.ids = [row[0] for row in centers]
+        self.position_of = {center_id: position for position, center_id in enumerate(self.ids)}
+        self.latitudes = [row[1] for row in centers]
+        self.longitudes = [row[2] for row in centers]
+        self.set_loads(loads)
+        positions = defaultdict(list)
+        for position, center_id in enumerate(self.ids):
+            for material_type in materials.get(center_id, ()):
+                positions[material_type].append(position)
+        self.positions = dict(positions)
+        if np is not None:
+            self.vectors = unit_vectors(self.latitudes, self.longitudes)
+            self.latitudes = np.asarray(self.latitudes, dtype=float)
+            self.longitudes = np.asarray(self.longitudes, dtype=float)
+            self.positions = {key: np.asarray(value, dtype=np.int64) for key, value in self.positions.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set_loads(self, loads):
+        """Free capacity and load penalties from ``(center id, capacity, load)`` rows"""
+        free = [0] * len(self.ids)
+        penalties = [LOAD_PENALTY_KM] * len(self.ids)
+        for center_id, capacity, load in loads:
+            position = self.position_of.get(center_id)
+            if position is None:
+                continue
+            free[position] = max(0, capacity - load)
+            penalties[position] = LOAD_PENALTY_KM * (1 - free[position] / capacity if capacity else 1)
+        if np is not None:
+            free = np.asarray(free, dtype=np.int64)
+            penalties = np.asarray(penalties, dtype=float)
+        self.free, self.penalties = free, penalties
+
+    def candidates(self, material_type=None):
+        """Positions of the centers accepting ``material_type`` (any center if None)"""
+        if material_type is None:
+            return np.arange(len(self.ids)) if np is not None else list(range(len(self.ids)))
+        return self.positions.get(material_type, np.zeros(0, dtype=np.int64) if np is not None else [])
+
+
+def build_assignment_index():
+    materials = defaultdict(set)
+    accepted = AcceptedMaterial.objects.filter(
+        recycling_center__is_active=True
+    ).values_list('recycling_center_id', 'material_type')
+    for center_id, material_type in accepted:
+        materials[center_id].add(material_type)
+
+    centers = RecyclingCenter.objects.filter(is_active=True).order_by('id').values_list('id', 'latitude', 'longitude')
+    return AssignmentIndex(list(centers), materials, center_loads())
+
+
+def center_loads():
+    """``(center id, capacity, load)`` of the active centers, their pending requests counted as load"""
+    # recycling_requests imports this module
+    from recycling_requests.models import RecyclingRequest
+
+    # Booked as capacity.load_for_weight() books them on approval
+    pending = dict(
+        RecyclingRequest.objects.filter(status='pending', center__is_active=True)
+        .values('center').order_by()
+        .annotate(load=Sum(Greatest(Ceil('estimated_weight'), Value(1.0))))
+        .values_list('center', 'load')
+    )
+    return [
+        (center_id, capacity, current_load + int(pending.get(center_id, 0)))
+        for center_id, capacity, current_load in RecyclingCenter.objects.filter(is_active=True).values_list(
+            'id', 'capacity', 'current_load',
+        )
+    ]
+
+
+_index = None  # (centers version, load version, AssignmentIndex)
+_index_lock = threading.Lock()
+
+
+def get_assignment_index():
+    """
+    Return the shared index, rebuilding it when the centers version moved and
+    re-reading the loads only when the load version did
+    """
+    global _index
+    versions = (get_centers_version(), get_load_version())
+    entry = _index
+    if entry is None or entry[:2] != versions:
+        with _index_lock:
+            if _index is None or _index[0] != versions[0]:
+                _index = (*versions, build_assignment_index())
+            elif _index[1] != versions[1]:
+                # A copy, so threads still using the current index are not
+                # switched to new loads halfway through an assignment
+                index = copy.copy(_index[2])
+                index.set_loads(center_loads())
+                _index = (*versions, index)
+            entry = _index
+    return entry[2]
+
+
+def _best_position(index, free, latitude, longitude, material_type, amount=1):
+    positions = [position for position in index.candidates(material_type) if free[position] >= amount]
+    if not positions:
+        return None
+    distances = batch_distances(
+        latitude, longitude,
+        [index.latitudes[position] for position in positions],
+        [index.longitudes[position] for position in positions],
+    )
+    _, distance, position = min(
+        (float(distance) + index.penalties[position], float(distance), position)
+        for distance, position in zip(distances, positions)
+    )
+    return position, distance
+
+
+def assign_center(latitude, longitude, material_type=None, amount=1, index=None):
+    """
+    Best center for one request booking ``amount`` of capacity, as
+    ``(center_id, distance_km)``, or None when no active center with that
+    much free capacity accepts the material.
+    """
+    index = index or get_assignment_index()
+    best = _best_position(index, index.free, latitude, longitude, material_type, amount)
+    if best is None:
+        return None
+    position, distance = best
+    return index.ids[position], distance
+
+
+def _assign_round(index, free, positions, vectors, amounts):
+    """
+    Best candidate (position into ``positions``) with room for its amount, and
+    its score, for each request; the score is infinite when none has room
+    """
+    best = np.empty(len(vectors), dtype=np.int64)
+    scores = np.empty(len(vectors), dtype=float)
+    center_vectors = index.vectors[positions]
+    penalties = index.penalties[positions]
+    room = free[positions]
+    for start in range(0, len(vectors), ASSIGNMENT_CHUNK):
+        stop = start + ASSIGNMENT_CHUNK
+        matrix = vector_distance_matrix(vectors[start:stop], center_vectors)
+        matrix += penalties
+        matrix[room < amounts[start:stop, None]] = np.inf
+        best[start:stop] = matrix.argmin(axis=1)
+        scores[start:stop] = matrix[np.arange(len(matrix)), best[start:stop]]
+    return best, scores
+
+
+def _assign_group(index, free, material_type, vectors, amounts):
+    """Load-balanced center positions for requests of one material, -1 when unassigned"""
+    assigned = np.full(len(vectors), -1, dtype=np.int64)
+    pending = np.arange(len(vectors))
+    candidates = index.candidates(material_type)
+    while len(pending):
+        candidates = candidates[free[candidates] >= amounts[pending].min()]
+        if not len(candidates):
+            break
+        best, scores = _assign_round(index, free, candidates, vectors[pending], amounts[pending])
+        # Requests no candidate has room for stay unassigned
+        possible = np.isfinite(scores)
+        pending, best, scores = pending[possible], best[possible], scores[possible]
+        centers = candidates[best]
+
+        # Rank the requests choosing each center by score; a center accepts
+        # them while their amounts fit its free capacity, the rest try again
+        # next round. The best ranked always fits, so every round makes progress.
+        order = np.lexsort((scores, centers))
+        sorted_centers = centers[order]
+        booked = np.cumsum(amounts[pending[order]])
+        group_starts = np.flatnonzero(np.r_[True, sorted_centers[1:] != sorted_centers[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(order)])
+        booked -= np.repeat(booked[group_starts] - amounts[pending[order[group_starts]]], group_sizes)
+        accepted = order[booked <= free[sorted_centers]]
+
+        assigned[pending[accepted]] = centers[accepted]
+        np.subtract.at(free, centers[accepted], amounts[pending[accepted]])
+        rejected = np.ones(len(pending), dtype=bool)
+        rejected[accepted] = False
+        pending = pending[rejected]
+    return assigned
+
+
+def assign_many(latitudes, longitudes, material_types, amounts=None, exclude=(), index=None):
+    """
+    Load-balanced best centers for many requests at once, each booking its
+    entry of ``amounts`` (one unit by default), never choosing a center id in
+    ``exclude``. Returns a list of center ids aligned with the inputs, None
+    where no center can take one.
+    """
+    index = index or get_assignment_index()
+    if amounts is None:
+        amounts = [1] * len(material_types)
+    excluded = [index.position_of[center_id] for center_id in exclude if center_id in index.position_of]
+    if np is None:
+        # Without NumPy, assign one request at a time against a running copy
+        # of the free capacity
+        free = list(index.free)
+        for position in excluded:
+            free[position] = 0
+        results = []
+        for latitude, longitude, material_type, amount in zip(latitudes, longitudes, material_types, amounts):
+            best = _best_position(index, free, latitude, longitude, material_type, amount)
+            if best is None:
+                results.append(None)
+            else:
+                free[best[0]] -= amount
+                results.append(index.ids[best[0]])
+        return results
+
+    vectors = unit_vectors(latitudes, longitudes)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    free = index.free.copy()
+    free[excluded] = 0
+    groups = defaultdict(list)
+    for request_position, material_type in enumerate(material_types):
+        groups[material_type].append(request_position)
+
+    results = [None] * len(vectors)
+    for material_type, request_positions in groups.items():
+        request_positions = np.asarray(request_positions)
+        assigned = _assign_group(index, free, material_type, vectors[request_positions], amounts[request_positions])
+        for request_position, position in zip(request_positions.tolist(), assigned.tolist()):
+            if position >= 0:
+                results[request_position] = index.ids[position]
+    return results
@@ -0,0 +1,163 @@
+"""
+Versioned cache for the center payloads served to the map and API.
+
+Every cached payload key embeds a global "centers version" counter. The signal
+handlers in ``signals.py`` bump the counter whenever a center, one of its
+materials or its staff changes, which orphans every previously cached payload
+at once without having to know their keys. The counter lives in the cache
+itself, so processes sharing a file-based cache also share invalidations.
+
+Changes of a center's ``current_load`` only move its availability, so they
+bump a separate "load version" instead. Payloads that carry availability
+embed both versions, while the spatial index, cluster pyramid and assignment
+geometry follow the centers version alone and survive drop-offs.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'centers:version'
+LOAD_VERSION_KEY = 'centers:load-version'
+MODIFIED_KEY = 'centers:modified'
+HITS_KEY = 'centers:cache:hits'
+MISSES_KEY = 'centers:cache:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CENTERS_CACHE_ALIAS', 'default')]
+
+
+def _increment(cache, key):
+    """Increment a counter that never expires, creating it if needed"""
+    if cache.add(key, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        # Seeding from the clock keeps a flushed cache from reusing version
+        # numbers that clients may still hold in their ETags.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        cache.add(MODIFIED_KEY, time.time(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    cache = get_cache()
+    _get_version(key)
+    version = _increment(cache, key)
+    cache.set(MODIFIED_KEY, time.time(), timeout=None)
+    return version
+
+
+def get_centers_version():
+    """Current centers version, seeded from the clock after a cache flush"""
+    return _get_version(VERSION_KEY)
+
+
+def get_load_version():
+    """Current load version, moved by every change of a center's load"""
+    return _get_version(LOAD_VERSION_KEY)
+
+
+def bump_centers_version():
+    """Invalidate every cached center payload and the indexes built from centers"""
+    _bump(VERSION_KEY)
+
+
+def bump_load_version():
+    """Invalidate cached availability after a load change, returning the new load version"""
+    return _bump(LOAD_VERSION_KEY)
+
+
+def centers_last_modified():
+    """Time of the last center change as a timestamp"""
+    cache = get_cache()
+    modified = cache.get(MODIFIED_KEY)
+    if modified is None:
+        get_centers_version()
+        modified = cache.get(MODIFIED_KEY, time.time())
+    return modified
+
+
+def _payload_key(name, material_type, load):
+    version = f'{get_centers_version()}.{get_load_version()}' if load else get_centers_version()
+    return f"centers:{name}:{version}:{material_type or 'all'}"
+
+
+def _cache_timeout():
+    return getattr(settings, 'CENTERS_CACHE_TIMEOUT', 60 * 15)
+
+
+def cached_payload(name, material_type, build, load=False):
+    """
+    Return the payload ``name`` for ``material_type`` from the cache, calling
+    ``build()`` to compute and store it on a miss. Payloads built from the
+    centers' loads pass ``load=True`` to follow the load version too.
+
+    Returns a ``(payload, hit)`` tuple.
+    """
+    cache = get_cache()
+    key = _payload_key(name, material_type, load)
+    payload = cache.get(key)
+    if payload is not None:
+        _increment(cache, HITS_KEY)
+        return payload, True
+
+    _increment(cache, MISSES_KEY)
+    payload = build()
+    cache.set(key, payload, _cache_timeout())
+    return payload, False
+
+
+async def acached_payload(name, material_type, build, load=False):
+    """
+    ``cached_payload`` for async views, where ``build`` is a coroutine
+    function. The cache itself is used synchronously, as the ETag functions
+    of the views already are; only building the payload is awaited.
+    """
+    cache = get_cache()
+    key = _payload_key(name, material_type, load)
+    payload = cache.get(key)
+    if payload is not None:
+        _increment(cache, HITS_KEY)
+        return payload, True
+
+    _increment(cache, MISSES_KEY)
+    payload = await build()
+    cache.set(key, payload, _cache_timeout())
+    return payload, False
+
+
+def cache_stats():
+    """Hit and miss counters for the center payload cache"""
+    cache = get_cache()
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+        'version': get_centers_version(),
+        'load_version': get_load_version(),
+    }
+
+
+def centers_etag(request, *args, **kwargs):
+    """ETag covering the centers and load versions and the full query string"""
+    key = f'{get_centers_version()}.{get_load_version()}?{request.GET.urlencode()}'
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def centers_last_modified_date(request, *args, **kwargs):
+    """Last-Modified value for ``django.views.decorators.http.condition``"""
+    return datetime.fromtimestamp(int(centers_last_modified()), tz=timezone.utc)
@@ -0,0 +1,116 @@
+"""
+Contention-safe capacity reservations for recycling centers.
+
+``current_load`` is only ever changed by single conditional UPDATE statements
+(``current_load + n <= capacity``), so concurrent drop-offs can never lose an
+increment or overbook a center: the database applies them one at a time and
+the condition is re-checked against the committed value. Writes that fail
+because the database is busy (SQLite's "database is locked") are retried with
+exponential backoff. Queryset updates bypass model signals, so every change
+bumps the load version once the surrounding transaction commits, which
+refreshes cached availability but leaves the indexes built from the centers'
+locations alone.
+
+Recycling requests book ``load_for_weight(estimated_weight)`` when they are
+approved and give it back once they are completed, rejected or moved.
+
+Retries only help in autocommit mode; inside ``transaction.atomic()`` a
+failed statement aborts the surrounding transaction instead.
+"""
+import math
+import random
+import time
+
+from django.db import OperationalError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Now
+
+from .cache import bump_load_version
+from .models import RecyclingCenter
+
+
+class CapacityExceeded(Exception):
+    """The center does not have enough free capacity left today"""
+
+
+def load_for_weight(weight):
+    """Capacity units booked for ``weight`` kg of materials, at least one"""
+    return max(1, math.ceil(weight))
+
+
+def _center_id(center):
+    return center.pk if isinstance(center, RecyclingCenter) else center
+
+
+def _with_retry(operation, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except OperationalError:
+            if attempt == retries:
+                raise
+            # Full jitter keeps retrying writers from colliding again
+            time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+
+
+def reserve_capacity(center, amount=1, retries=5, backoff=0.01):
+    """
+    Atomically add ``amount`` to a center's load if it fits its capacity.
+
+    ``center`` is a ``RecyclingCenter`` or its id; an instance has its
+    ``current_load`` refreshed. Raises ``CapacityExceeded`` when the center
+    is full (or inactive).
+    """
+    if amount <= 0:
+        raise ValueError('amount must be positive')
+    center_id = _center_id(center)
+
+    updated = _with_retry(
+        lambda: RecyclingCenter.objects.filter(
+            pk=center_id,
+            is_active=True,
+            current_load__lte=F('capacity') - amount,
+        ).update(current_load=F('current_load') + amount, updated_at=Now()),
+        retries, backoff,
+    )
+    if not updated:
+        raise CapacityExceeded(f'Center {center_id} cannot take {amount} more')
+
+    transaction.on_commit(bump_load_version)
+    if isinstance(center, RecyclingCenter):
+        center.refresh_from_db(fields=['current_load'])
+
+
+def release_capacity(center, amount=1, retries=5, backoff=0.01):
+    """Atomically give back ``amount`` of a center's load, never going below zero"""
+    if amount <= 0:
+        raise ValueError('amount must be positive')
+    center_id = _center_id(center)
+
+    _with_retry(
+        lambda: RecyclingCenter.objects.filter(pk=center_id).update(
+            current_load=Greatest(F('current_load') - amount, 0),
+            updated_at=Now(),
+        ),
+        retries, backoff,
+    )
+    transaction.on_commit(bump_load_version)
+    if isinstance(center, RecyclingCenter):
+        center.refresh_from_db(fields=['current_load'])
+
+
+def reset_daily_load():
+    """Start a new day: clear the load of every center, returning how many changed"""
+    reset = RecyclingCenter.objects.filter(current_load__gt=0).update(current_load=0, updated_at=Now())
+    if reset:
+        transaction.on_commit(bump_load_version)
+    return reset
+
+
+def current_availability(center):
+    """Availability percentage read from the database rather than a loaded instance"""
+    center_id = _center_id(center)
+    capacity, current_load = RecyclingCenter.objects.values_list('capacity', 'current_load').get(pk=center_id)
+    if capacity == 0:
+        return 0
+    return ((capacity - current_load) / capacity) * 100
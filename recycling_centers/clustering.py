@@ -0,0 +1,182 @@
+"""
+Server-side marker clustering for the map viewport.
+
+Markers are grouped into the cells of a Web Mercator grid with
+``CELLS_PER_TILE`` x ``CELLS_PER_TILE`` cells per map tile, so a cluster covers
+roughly the same number of screen pixels at every zoom level. Levels up to
+``PYRAMID_MAX_ZOOM`` are precomputed once per centers version: the deepest
+level is built from the spatial index and every shallower level by merging
+four child cells. Deeper zoom levels only ever show a small area, so their
+clusters are computed on demand from a bounding-box query backed by the
+latitude/longitude indexes on ``RecyclingCenter``.
+"""
+import math
+import threading
+from collections import Counter
+
+from django.db.models import Q
+
+from .cache import get_centers_version
+from .models import AcceptedMaterial
+from .queries import active_centers
+from .spatial_index import get_spatial_index
+
+CELLS_PER_TILE = 4  # 64px cells on 256px tiles
+PYRAMID_MAX_ZOOM = 10
+MAX_ZOOM = 21
+MAX_LATITUDE = 85.05112878  # Web Mercator cut-off
+
+
+class Cluster:
+    __slots__ = ('count', 'lat_sum', 'lon_sum', 'materials', 'center_id')
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        self.materials = Counter()
+        self.center_id = None
+
+    def add(self, center_id, lat, lon, materials):
+        self.count += 1
+        self.lat_sum += lat
+        self.lon_sum += lon
+        self.materials.update(materials)
+        self.center_id = center_id if self.count == 1 else None
+
+    def merge(self, other):
+        self.center_id = other.center_id if not self.count and other.count == 1 else None
+        self.count += other.count
+        self.lat_sum += other.lat_sum
+        self.lon_sum += other.lon_sum
+        self.materials.update(other.materials)
+
+    @property
+    def latitude(self):
+        return self.lat_sum / self.count
+
+    @property
+    def longitude(self):
+        return self.lon_sum / self.count
+
+
+def project(lat, lon, zoom):
+    """Grid cell ``(x, y)`` containing a coordinate at ``zoom``"""
+    scale = (1 << zoom) * CELLS_PER_TILE
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    sin_lat = math.sin(math.radians(lat))
+    x = (lon + 180) / 360 * scale
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return min(int(x), scale - 1), min(int(y), scale - 1)
+
+
+def _cluster_points(points, zoom):
+    """Group ``(id, lat, lon, materials)`` tuples into cells at ``zoom``"""
+    cells = {}
+    for center_id, lat, lon, materials in points:
+        cell = project(lat, lon, zoom)
+        cluster = cells.get(cell)
+        if cluster is None:
+            cluster = cells[cell] = Cluster()
+        cluster.add(center_id, lat, lon, materials)
+    return cells
+
+
+def build_pyramid(points):
+    """Precompute the cluster cells of every level up to ``PYRAMID_MAX_ZOOM``"""
+    levels = [None] * (PYRAMID_MAX_ZOOM + 1)
+    levels[PYRAMID_MAX_ZOOM] = _cluster_points(points, PYRAMID_MAX_ZOOM)
+    for zoom in range(PYRAMID_MAX_ZOOM - 1, -1, -1):
+        cells = {}
+        for (x, y), child in levels[zoom + 1].items():
+            parent = cells.get((x >> 1, y >> 1))
+            if parent is None:
+                parent = cells[(x >> 1, y >> 1)] = Cluster()
+            parent.merge(child)
+        levels[zoom] = cells
+    return levels
+
+
+_pyramids = {}  # material type -> (centers version, levels)
+_pyramids_lock = threading.Lock()
+
+
+def get_pyramid(material_type=None):
+    """Return the shared pyramid for a material filter, rebuilding it after changes"""
+    version = get_centers_version()
+    key = material_type or None
+    entry = _pyramids.get(key)
+    if entry is None or entry[0] != version:
+        with _pyramids_lock:
+            entry = _pyramids.get(key)
+            if entry is None or entry[0] != version:
+                points = (
+                    (point.id, point.latitude, point.longitude, point.materials)
+                    for point in get_spatial_index().points()
+                    if not material_type or material_type in point.materials
+                )
+                entry = _pyramids[key] = (version, build_pyramid(points))
+    return entry[1]
+
+
+def _x_ranges(west, east, zoom):
+    """Cell column ranges covered by a longitude span, split at the antimeridian"""
+    scale = (1 << zoom) * CELLS_PER_TILE
+    if west <= east:
+        return [(project(0, west, zoom)[0], project(0, east, zoom)[0])]
+    return [(project(0, west, zoom)[0], scale - 1), (0, project(0, east, zoom)[0])]
+
+
+def _cells_in_bbox(cells, bbox, zoom):
+    south, west, north, east = bbox
+    x_ranges = _x_ranges(west, east, zoom)
+    y_min = project(north, 0, zoom)[1]
+    y_max = project(south, 0, zoom)[1]
+    span = (y_max - y_min + 1) * sum(x1 - x0 + 1 for x0, x1 in x_ranges)
+    if span > len(cells):
+        # Cheaper to walk the occupied cells than the covered ones
+        return [
+            cluster for (x, y), cluster in cells.items()
+            if y_min <= y <= y_max and any(x0 <= x <= x1 for x0, x1 in x_ranges)
+        ]
+    return [
+        cells[(x, y)]
+        for x0, x1 in x_ranges
+        for x in range(x0, x1 + 1)
+        for y in range(y_min, y_max + 1)
+        if (x, y) in cells
+    ]
+
+
+def _points_in_bbox(bbox, material_type=None):
+    south, west, north, east = bbox
+    centers = active_centers(material_type).filter(latitude__range=(south, north))
+    if west <= east:
+        centers = centers.filter(longitude__range=(west, east))
+    else:
+        centers = centers.filter(Q(longitude__gte=west) | Q(longitude__lte=east))
+
+    materials = {}
+    accepted = AcceptedMaterial.objects.filter(
+        recycling_center__in=centers.values('id')
+    ).values_list('recycling_center_id', 'material_type')
+    for center_id, accepted_type in accepted:
+        materials.setdefault(center_id, []).append(accepted_type)
+
+    return [
+        (center_id, lat, lon, materials.get(center_id, ()))
+        for center_id, lat, lon in centers.values_list('id', 'latitude', 'longitude')
+    ]
+
+
+def viewport_clusters(bbox, zoom, material_type=None):
+    """
+    Clusters for the ``(south, west, north, east)`` bounding box at ``zoom``.
+
+    ``west`` greater than ``east`` denotes a box crossing the antimeridian.
+    """
+    zoom = max(0, min(zoom, MAX_ZOOM))
+    if zoom <= PYRAMID_MAX_ZOOM:
+        return _cells_in_bbox(get_pyramid(material_type)[zoom], bbox, zoom)
+    cells = _cluster_points(_points_in_bbox(bbox, material_type), zoom)
+    return list(cells.values())
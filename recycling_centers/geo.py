@@ -0,0 +1,98 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to the math module
+    np = None
+
+
+EARTH_RADIUS_KM = 6371  # Earth's radius in kilometers
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Calculate distance between two coordinates using Haversine formula"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat/2) * math.sin(dlat/2) +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlon/2) * math.sin(dlon/2))
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    distance = EARTH_RADIUS_KM * c
+
+    return distance
+
+
+def _batch_distances_numpy(lat, lon, latitudes, longitudes):
+    lat1 = np.radians(lat)
+    lats = np.radians(np.asarray(latitudes, dtype=float))
+    dlat = lats - lat1
+    dlon = np.radians(np.asarray(longitudes, dtype=float)) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lats) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _batch_distances_python(lat, lon, latitudes, longitudes):
+    sin, cos, atan2, sqrt, radians = math.sin, math.cos, math.atan2, math.sqrt, math.radians
+    lat1 = radians(lat)
+    lon1 = radians(lon)
+    cos_lat1 = cos(lat1)
+    distances = []
+    for lat2, lon2 in zip(latitudes, longitudes):
+        lat2 = radians(lat2)
+        sin_dlat = sin((lat2 - lat1) / 2)
+        sin_dlon = sin((radians(lon2) - lon1) / 2)
+        a = sin_dlat * sin_dlat + cos_lat1 * cos(lat2) * sin_dlon * sin_dlon
+        distances.append(EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1 - a)))
+    return distances
+
+
+def batch_distances(lat, lon, latitudes, longitudes):
+    """
+    Distances in km from one origin to every ``(latitudes[i], longitudes[i])``.
+
+    Computed in a single vectorized pass when NumPy is installed (returning an
+    ndarray), otherwise with a pure-Python loop (returning a list).
+    """
+    if np is not None:
+        return _batch_distances_numpy(lat, lon, latitudes, longitudes)
+    return _batch_distances_python(lat, lon, latitudes, longitudes)
+
+
+def distance_matrix(origin_lats, origin_lons, latitudes, longitudes):
+    """
+    Distances in km from many origins to many points, one row per origin.
+
+    Returns a 2-D ndarray when NumPy is installed, otherwise a list of lists.
+    """
+    if np is None:
+        return [
+            _batch_distances_python(lat, lon, latitudes, longitudes)
+            for lat, lon in zip(origin_lats, origin_lons)
+        ]
+    origin_lats = np.asarray(origin_lats, dtype=float)[:, None]
+    origin_lons = np.asarray(origin_lons, dtype=float)[:, None]
+    return _batch_distances_numpy(origin_lats, origin_lons, latitudes, longitudes)
+
+
+def unit_vectors(latitudes, longitudes):
+    """
+    Points as rows of 3-D unit vectors (NumPy only). Precompute these for a
+    fixed set of points queried many times with ``vector_distance_matrix``.
+    """
+    lats = np.radians(np.asarray(latitudes, dtype=float))
+    lons = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lats = np.cos(lats)
+    return np.column_stack((cos_lats * np.cos(lons), cos_lats * np.sin(lons), np.sin(lats)))
+
+
+def vector_distance_matrix(origin_vectors, vectors):
+    """
+    Great-circle distances in km between two sets of ``unit_vectors``, one
+    row per origin. Equal to the Haversine distance (sin^2 of half the angle
+    is a quarter of the squared chord), but computed with a single matrix
+    product instead of trigonometry per pair.
+    """
+    dot = origin_vectors @ vectors.T
+    half_chord = np.sqrt(np.clip((1 - dot) / 2, 0, 1))
+    return EARTH_RADIUS_KM * 2 * np.arcsin(half_chord)
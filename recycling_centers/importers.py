@@ -0,0 +1,177 @@
+"""
+Readers and row validation for ``manage.py import_centers``.
+
+Readers stream ``(line_number, record)`` pairs out of CSV, NDJSON and GeoJSON
+files. ``clean_chunk`` turns a list of such pairs into validated rows and is
+run in worker processes, so this module must stay importable without the
+Django app registry (no model imports).
+"""
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_email
+
+FIELD_LIMITS = {
+    'external_id': 100,
+    'name': 200,
+    'phone_number': 15,
+}
+REQUIRED_FIELDS = ('external_id', 'name', 'address', 'latitude', 'longitude')
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        reader = csv.DictReader(handle)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def read_ndjson(path):
+    with open(path, encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if line.strip():
+                yield line_number, line
+
+
+def read_geojson(path):
+    """
+    Features of a FeatureCollection, or of a GeoJSON text sequence with one
+    feature per line. Only the sequence form is streamed; a FeatureCollection
+    has to be parsed as a whole.
+    """
+    with open(path, encoding='utf-8') as handle:
+        first = handle.readline()
+        handle.seek(0)
+        try:
+            document = json.loads(first)
+        except json.JSONDecodeError:
+            document = None
+        # The first line may hold any JSON value, e.g. a lone number
+        if isinstance(document, dict) and document.get('type') == 'Feature':
+            yield from read_ndjson(path)
+            return
+        collection = json.load(handle)
+    if not isinstance(collection, dict):
+        raise ValueError(f'{path} is not a GeoJSON object')
+    for number, feature in enumerate(collection.get('features', []), start=1):
+        yield number, feature
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+    'jsonl': read_ndjson,
+    'geojson': read_geojson,
+}
+
+
+def _from_feature(feature):
+    properties = dict(feature.get('properties') or {})
+    geometry = feature.get('geometry') or {}
+    if geometry.get('type') == 'Point':
+        longitude, latitude = geometry['coordinates'][:2]
+        properties.setdefault('latitude', latitude)
+        properties.setdefault('longitude', longitude)
+    if 'external_id' not in properties and feature.get('id') is not None:
+        properties['external_id'] = feature['id']
+    return properties
+
+
+def _materials(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = value.replace(',', ';').split(';')
+    materials = []
+    for item in value:
+        if isinstance(item, dict):
+            materials.append((str(item.get('type', '')).strip().lower(), str(item.get('description', ''))))
+        elif str(item).strip():
+            materials.append((str(item).strip().lower(), ''))
+    return materials
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('0', 'false', 'no', 'n', '')
+
+
+def clean_record(record, material_types):
+    """Validate one record, returning a ``(row, error)`` tuple"""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as exc:
+            return None, f'invalid JSON: {exc.msg}'
+    if not isinstance(record, dict):
+        return None, 'record is not an object'
+    if record.get('type') == 'Feature':
+        record = _from_feature(record)
+
+    row = {key: (value.strip() if isinstance(value, str) else value) for key, value in record.items()}
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, '')]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    row['external_id'] = str(row['external_id'])
+
+    for field, limit in FIELD_LIMITS.items():
+        if len(str(row.get(field) or '')) > limit:
+            return None, f'{field} longer than {limit} characters'
+
+    try:
+        row['latitude'] = float(row['latitude'])
+        row['longitude'] = float(row['longitude'])
+    except (TypeError, ValueError):
+        return None, 'latitude and longitude must be numbers'
+    if not (-90 <= row['latitude'] <= 90 and -180 <= row['longitude'] <= 180):
+        return None, 'coordinates out of range'
+
+    try:
+        row['capacity'] = int(row.get('capacity') or 100)
+    except (TypeError, ValueError):
+        return None, 'capacity must be an integer'
+    if row['capacity'] < 0:
+        return None, 'capacity must not be negative'
+
+    try:
+        if row.get('email'):
+            validate_email(row['email'])
+        if row.get('website'):
+            URLValidator()(row['website'])
+    except ValidationError as exc:
+        return None, exc.messages[0]
+
+    materials = _materials(row.get('materials') or row.get('accepted_materials'))
+    unknown = sorted({material for material, _ in materials if material not in material_types})
+    if unknown:
+        return None, f"unknown material types: {', '.join(unknown)}"
+
+    return {
+        'external_id': row['external_id'],
+        'name': str(row['name']),
+        'description': str(row.get('description') or ''),
+        'address': str(row['address']),
+        'latitude': row['latitude'],
+        'longitude': row['longitude'],
+        'phone_number': str(row.get('phone_number') or ''),
+        'email': str(row.get('email') or ''),
+        'website': str(row.get('website') or ''),
+        'opening_hours': str(row.get('opening_hours') or ''),
+        'capacity': row['capacity'],
+        'is_active': _boolean(row.get('is_active', True)),
+        'materials': dict(materials),
+    }, None
+
+
+def clean_chunk(chunk, material_types):
+    """Validate ``(line_number, record)`` pairs; returns ``(rows, errors)``"""
+    rows, errors = [], []
+    for line_number, record in chunk:
+        row, error = clean_record(record, material_types)
+        if error:
+            errors.append((line_number, error))
+        else:
+            rows.append(row)
+    return rows, errors
@@ -0,0 +1,151 @@
+import asyncio
+import importlib
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from recycling_centers.models import RecyclingCenter
+
+
+def _scenarios(center):
+    """``{name: (path, params)}`` of the views that have async versions"""
+    nearby = {'lat': center.latitude, 'lon': center.longitude, 'limit': 20}
+    return {
+        'api': (reverse('centers_api'), {}),
+        'api_nearby': (reverse('centers_api'), nearby),
+        'map': (reverse('recycling_centers_map'), {}),
+        'detail': (reverse('recycling_center_detail', args=[center.pk]), {}),
+    }
+
+
+@contextmanager
+def server_profile(name):
+    """Route the centers views as the ``name`` server profile does"""
+    # URL patterns pick their views on import, so both URLconfs are reloaded
+    def reload_urls():
+        importlib.reload(importlib.import_module('recycling_centers.urls'))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=name == 'asgi'):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+def _summary(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    quantile = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    return {
+        'throughput': len(ordered) / elapsed,
+        'p50': statistics.median(ordered) * 1000,
+        'p95': quantile(0.95),
+        'p99': quantile(0.99),
+        'errors': errors,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/s and tail latency of the centers API, map and detail views served '
+        'by the WSGI app from threads and by the ASGI app with native async views, at high concurrency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario')
+        parser.add_argument('--profiles', nargs='+', choices=('wsgi', 'asgi'), default=['wsgi', 'asgi'])
+        parser.add_argument('--scenarios', nargs='+', help='Subset of api, api_nearby, map and detail')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        center = RecyclingCenter.objects.filter(is_active=True).order_by('pk').first()
+        if center is None:
+            raise CommandError('No active centers; run manage.py seed_benchmark first')
+
+        self.stdout.write(
+            f"{'profile':<8} {'scenario':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for profile in options['profiles']:
+            with server_profile(profile):
+                scenarios = _scenarios(center)
+                for name in options['scenarios'] or scenarios:
+                    if name not in scenarios:
+                        raise CommandError(f'Unknown scenario {name!r}')
+                    path, params = scenarios[name]
+                    run = self._run_wsgi if profile == 'wsgi' else self._run_asgi
+                    result = run(path, params, options)
+                    self.stdout.write(
+                        f"{profile:<8} {name:<11} {result['throughput']:>8.1f} {result['p50']:>8.1f} "
+                        f"{result['p95']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}"
+                    )
+
+    def _run_wsgi(self, path, params, options):
+        """Requests from ``concurrency`` threads, like a threaded WSGI server"""
+        for _ in range(options['warmup']):
+            Client(HTTP_HOST=options['host']).get(path, params)
+        lock = threading.Lock()
+        remaining = options['requests']
+        latencies, errors = [], 0
+
+        def worker():
+            nonlocal remaining, errors
+            client = Client(raise_request_exception=False, HTTP_HOST=options['host'])
+            local_latencies, local_errors = [], 0
+            try:
+                while True:
+                    with lock:
+                        if remaining <= 0:
+                            break
+                        remaining -= 1
+                    started = time.perf_counter()
+                    response = client.get(path, params)
+                    local_latencies.append(time.perf_counter() - started)
+                    local_errors += response.status_code >= 400
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                errors += local_errors
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, options['concurrency']))]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return _summary(latencies, errors, time.perf_counter() - started)
+
+    def _run_asgi(self, path, params, options):
+        """Requests from ``concurrency`` tasks on one event loop, like an ASGI worker"""
+        async def run():
+            for _ in range(options['warmup']):
+                await AsyncClient(headers={'host': options['host']}).get(path, params)
+            remaining = options['requests']
+            latencies, errors = [], 0
+
+            async def worker():
+                nonlocal remaining, errors
+                client = AsyncClient(raise_request_exception=False, headers={'host': options['host']})
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    response = await client.get(path, params)
+                    latencies.append(time.perf_counter() - started)
+                    errors += response.status_code >= 400
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(max(1, options['concurrency']))))
+            return _summary(latencies, errors, time.perf_counter() - started)
+
+        return asyncio.run(run())
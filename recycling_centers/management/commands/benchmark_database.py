@@ -0,0 +1,157 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import F
+from django.test import override_settings
+
+from recycling_centers.models import RecyclingCenter
+from recycling_tracker.database import DEFAULT_SQLITE_PRAGMAS
+
+# Django's stock SQLite setup: rollback journal, a new connection per request
+# and deferred transactions, against this project's tuned profile.
+PROFILES = {
+    'stock': {
+        'pragmas': {'journal_mode': 'DELETE'},
+        'conn_max_age': 0,
+        'options': {},
+    },
+    'tuned': {
+        'pragmas': DEFAULT_SQLITE_PRAGMAS,
+        'conn_max_age': 600,
+        'options': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare read/write throughput of concurrent threads on scratch SQLite databases '
+        'set up with the stock and tuned connection profiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='Writer threads')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds to run each profile')
+        parser.add_argument('--centers', type=int, default=2000, help='Centers in each scratch database')
+        parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=list(PROFILES))
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<8} {'reads/s':>9} {'writes/s':>9} {'read p95 ms':>12} {'write p95 ms':>13} {'errors':>7}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name in options['profiles']:
+                alias = f'benchmark_{name}'
+                profile = PROFILES[name]
+                self._add_database(alias, Path(directory) / f'{name}.sqlite3', profile)
+                try:
+                    with override_settings(SQLITE_PRAGMAS=profile['pragmas']):
+                        self._seed(alias, options['centers'])
+                        result = self._run(alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+                self.stdout.write(
+                    f"{name:<8} {result['reads'] / options['duration']:>9,.0f} "
+                    f"{result['writes'] / options['duration']:>9,.0f} {result['read_p95']:>12.2f} "
+                    f"{result['write_p95']:>13.2f} {result['errors']:>7}"
+                )
+
+    def _add_database(self, alias, path, profile):
+        settings_dict = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(path),
+            'CONN_MAX_AGE': profile['conn_max_age'],
+            'OPTIONS': dict(profile['options']),
+        }
+        configured = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            alias: settings_dict,
+        })
+        connections.settings[alias] = configured[alias]
+
+    def _seed(self, alias, count):
+        call_command('migrate', database=alias, verbosity=0)
+        # bulk_create bypasses the signals that index centers in the default database
+        RecyclingCenter.objects.using(alias).bulk_create(
+            [
+                RecyclingCenter(
+                    name=f'Center {number}',
+                    address=f'{number} Benchmark Road',
+                    latitude=random.uniform(-60, 60),
+                    longitude=random.uniform(-180, 180),
+                    capacity=1_000_000,
+                    external_id=f'db-bench-{number}',
+                )
+                for number in range(count)
+            ],
+            batch_size=500,
+        )
+        connections[alias].close()
+
+    def _run(self, alias, options):
+        ids = list(RecyclingCenter.objects.using(alias).values_list('id', flat=True))
+        connections[alias].close()
+        deadline = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        result = {'reads': 0, 'writes': 0, 'errors': 0, 'read_times': [], 'write_times': []}
+
+        def read():
+            center_id = random.choice(ids)
+            list(
+                RecyclingCenter.objects.using(alias)
+                .filter(is_active=True, id__gte=center_id)
+                .order_by('id')
+                .values('id', 'name', 'capacity', 'current_load')[:50]
+            )
+
+        def write():
+            # Read then write in one transaction, like the review and
+            # completion workflows; deferred transactions can fail to upgrade
+            # their read lock here.
+            center_id = random.choice(ids)
+            with transaction.atomic(using=alias):
+                RecyclingCenter.objects.using(alias).filter(pk=center_id, is_active=True).exists()
+                RecyclingCenter.objects.using(alias).filter(pk=center_id).update(current_load=F('current_load') + 1)
+
+        def worker(operation, kind):
+            connection = connections[alias]
+            count = errors = 0
+            timings = []
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        operation()
+                        count += 1
+                        timings.append(time.perf_counter() - started)
+                    except OperationalError:
+                        errors += 1
+                    # What request_finished does at the end of every request
+                    connection.close_if_unusable_or_obsolete()
+            finally:
+                connection.close()
+            with lock:
+                result[kind] += count
+                result['errors'] += errors
+                result[kind[:-1] + '_times'] += timings
+
+        threads = [threading.Thread(target=worker, args=(read, 'reads')) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write, 'writes')) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for kind in ('read', 'write'):
+            timings = result.pop(f'{kind}_times')
+            result[f'{kind}_p95'] = statistics.quantiles(timings, n=20)[-1] * 1000 if len(timings) > 1 else 0.0
+        return result
@@ -0,0 +1,51 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from recycling_centers import geo
+
+
+class Command(BaseCommand):
+    help = 'Compare the scalar Haversine function with the batch distance engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Numbers of synthetic centers to measure',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, best is reported')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        origin = (rng.uniform(-60, 60), rng.uniform(-180, 180))
+
+        engines = [('scalar', self._scalar), ('batch-python', geo._batch_distances_python)]
+        if geo.np is not None:
+            engines.append(('batch-numpy', geo._batch_distances_numpy))
+        else:
+            self.stdout.write(self.style.WARNING('NumPy is not installed, skipping the vectorized engine'))
+
+        self.stdout.write(f"{'centers':>10}  " + '  '.join(f'{name:>14}' for name, _ in engines))
+        for size in options['sizes']:
+            lats = [rng.uniform(-90, 90) for _ in range(size)]
+            lons = [rng.uniform(-180, 180) for _ in range(size)]
+            timings = [
+                self._best_of(options['repeat'], engine, origin, lats, lons)
+                for _, engine in engines
+            ]
+            self.stdout.write(f'{size:>10}  ' + '  '.join(f'{t * 1000:>11.2f} ms' for t in timings))
+
+    @staticmethod
+    def _scalar(lat, lon, lats, lons):
+        return [geo.calculate_distance(lat, lon, lat2, lon2) for lat2, lon2 in zip(lats, lons)]
+
+    @staticmethod
+    def _best_of(repeat, engine, origin, lats, lons):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine(origin[0], origin[1], lats, lons)
+            best = min(best, time.perf_counter() - start)
+        return best
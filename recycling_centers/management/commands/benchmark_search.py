@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recycling_centers.models import RecyclingCenter
+from recycling_centers.queries import center_summaries
+from recycling_centers.search import SimpleSearchBackend, SQLiteFTSSearchBackend
+
+WORDS = (
+    'green eco city metro river park valley north south east west central '
+    'harbor hill lake forest depot plant recycling waste collection drop point '
+    'community municipal industrial station yard market bridge garden'
+).split()
+STREETS = 'Main Oak Pine Maple Cedar Elm King Queen Church Mill Station High'.split()
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains search with the FTS5 index on synthetic centers (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centers', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query, best is reported')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--queries', nargs='+', default=['green', 'recy', 'harbor depot', 'maple', 'zzz'])
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite' or not SQLiteFTSSearchBackend.is_available():
+            raise CommandError('The FTS5 benchmark needs SQLite with the search index migration applied')
+
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self._seed(rng, options['centers'])
+            start = time.perf_counter()
+            SQLiteFTSSearchBackend().rebuild()
+            self.stdout.write(f"Indexed {options['centers']} centers in {time.perf_counter() - start:.2f}s")
+
+            backends = [('icontains', SimpleSearchBackend()), ('fts5', SQLiteFTSSearchBackend())]
+            self.stdout.write(f"{'query':>14}  " + '  '.join(f'{name:>20}' for name, _ in backends))
+            for query in options['queries']:
+                cells = []
+                for _, backend in backends:
+                    best, count = self._best_of(options['repeat'], backend, query)
+                    cells.append(f'{best * 1000:>9.2f} ms {count:>7}')
+                self.stdout.write(f'{query:>14}  ' + '  '.join(cells))
+
+            transaction.set_rollback(True)
+
+    def _seed(self, rng, count):
+        batch = []
+        for i in range(count):
+            batch.append(RecyclingCenter(
+                name=' '.join(rng.sample(WORDS, 3)).title(),
+                description=' '.join(rng.choices(WORDS, k=20)),
+                address=f'{rng.randint(1, 9999)} {rng.choice(STREETS)} Street',
+                latitude=rng.uniform(-60, 60),
+                longitude=rng.uniform(-180, 180),
+                phone_number='555-0100',
+                email=f'center{i}@example.com',
+                opening_hours='Mon-Fri 9-5',
+            ))
+            if len(batch) == 5000:
+                RecyclingCenter.objects.bulk_create(batch)
+                batch = []
+        RecyclingCenter.objects.bulk_create(batch)
+
+    @staticmethod
+    def _best_of(repeat, backend, query):
+        best = float('inf')
+        count = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = list(backend.search(center_summaries(), query).values_list('id', flat=True))
+            count = len(results)
+            best = min(best, time.perf_counter() - start)
+        return best, count
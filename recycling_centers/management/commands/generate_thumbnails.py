@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.models import UserProfile
+from recycling_centers.cache import bump_centers_version
+from recycling_centers.models import RecyclingCenter
+from recycling_tracker.thumbnails import generate_renditions, renditions_outdated
+
+TARGETS = {
+    'centers': (RecyclingCenter, 'image', 'image_renditions'),
+    'profiles': (UserProfile, 'profile_picture', 'profile_picture_renditions'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate missing or stale image renditions for center images and profile pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(TARGETS), help='Limit to centers or profiles')
+        parser.add_argument('--workers', type=int, default=4, help='Threads resizing images')
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions that are up to date')
+
+    def handle(self, *args, **options):
+        targets = [options['only']] if options['only'] else list(TARGETS)
+        for target in targets:
+            model, field_name, renditions_field = TARGETS[target]
+            instances = [
+                instance
+                for instance in model.objects.exclude(**{field_name: ''}).only(field_name, renditions_field)
+                if options['force'] or renditions_outdated(getattr(instance, field_name), getattr(instance, renditions_field))
+            ]
+
+            def render(instance):
+                try:
+                    renditions = generate_renditions(getattr(instance, field_name))
+                    return model.objects.filter(
+                        pk=instance.pk, **{field_name: getattr(instance, field_name).name}
+                    ).update(**{renditions_field: renditions})
+                except Exception as exc:
+                    self.stderr.write(f'{model._meta.label} {instance.pk}: {exc}')
+                    return 0
+                finally:
+                    close_old_connections()
+
+            with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+                rendered = sum(executor.map(render, instances))
+            if target == 'centers' and rendered:
+                bump_centers_version()
+            self.stdout.write(self.style.SUCCESS(
+                f'Rendered {rendered} of {len(instances)} {target} images'
+            ))
@@ -0,0 +1,130 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recycling_centers.cache import bump_centers_version
+from recycling_centers.importers import READERS, clean_chunk
+from recycling_centers.models import AcceptedMaterial, RecyclingCenter
+from recycling_centers.search import get_search_backend
+from recycling_centers.signals import center_signals_suspended
+
+UPDATE_FIELDS = [
+    'name', 'description', 'address', 'latitude', 'longitude', 'phone_number',
+    'email', 'website', 'opening_hours', 'capacity', 'is_active',
+]
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Import recycling centers from CSV, NDJSON or GeoJSON, upserting on external_id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=sorted(READERS), help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk upsert')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used to parse and validate rows; 1 parses in-process')
+        parser.add_argument('--replace-materials', action='store_true',
+                            help='Drop accepted materials not listed for an imported center')
+        parser.add_argument('--dry-run', action='store_true', help='Validate without writing')
+        parser.add_argument('--max-errors', type=int, default=20, help='Validation errors to print')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unknown format {file_format!r}, use --format')
+        batch_size = max(1, options['batch_size'])
+
+        material_types = frozenset(choice for choice, _ in AcceptedMaterial.MATERIAL_TYPES)
+        clean = partial(clean_chunk, material_types=material_types)
+        chunks = _chunks(READERS[file_format](path), batch_size)
+
+        started = time.perf_counter()
+        written = invalid = 0
+        try:
+            for rows, errors in self._parse(chunks, clean, options['workers']):
+                for line_number, error in errors:
+                    if invalid < options['max_errors']:
+                        self.stderr.write(f'{path.name}:{line_number}: {error}')
+                    invalid += 1
+                if rows and not options['dry_run']:
+                    self._write_batch(rows, options['replace_materials'])
+                written += len(rows)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'\r{written} rows imported ({written / elapsed:,.0f} rows/s)', ending='')
+                self.stdout.flush()
+            self.stdout.write('')
+        finally:
+            if written and not options['dry_run']:
+                # bulk_create bypasses model signals, so refresh derived
+                # indexes once, including after a failed batch
+                bump_centers_version()
+                get_search_backend().rebuild()
+
+        elapsed = time.perf_counter() - started
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {written} centers in {elapsed:.2f}s '
+            f'({written / elapsed if elapsed else 0:,.0f} rows/s), {invalid} rows rejected'
+        ))
+
+    def _parse(self, chunks, clean, workers):
+        """Validate chunks in worker processes, yielding results in input order"""
+        if workers <= 1:
+            yield from map(clean, chunks)
+            return
+        # Bound the chunks in flight so large files are never held in memory
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(clean, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _write_batch(self, rows, replace_materials):
+        # A source id may only appear once per upsert statement; the last row wins
+        rows = list({row['external_id']: row for row in rows}.values())
+        with transaction.atomic(), center_signals_suspended():
+            RecyclingCenter.objects.bulk_create(
+                [RecyclingCenter(**{key: value for key, value in row.items() if key != 'materials'}) for row in rows],
+                update_conflicts=True,
+                unique_fields=['external_id'],
+                update_fields=UPDATE_FIELDS,
+            )
+            ids = dict(RecyclingCenter.objects.filter(
+                external_id__in=[row['external_id'] for row in rows]
+            ).values_list('external_id', 'id'))
+
+            if replace_materials:
+                AcceptedMaterial.objects.filter(recycling_center_id__in=ids.values()).delete()
+            AcceptedMaterial.objects.bulk_create(
+                [
+                    AcceptedMaterial(
+                        recycling_center_id=ids[row['external_id']],
+                        material_type=material_type,
+                        description=description,
+                    )
+                    for row in rows
+                    for material_type, description in row['materials'].items()
+                ],
+                update_conflicts=True,
+                unique_fields=['recycling_center', 'material_type'],
+                update_fields=['description'],
+            )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recycling_centers.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for recycling centers'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {type(backend).__name__} index with {count} centers'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recycling_centers.capacity import reset_daily_load
+
+
+class Command(BaseCommand):
+    help = 'Reset the current load of every recycling center (run daily, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        reset = reset_daily_load()
+        self.stdout.write(self.style.SUCCESS(f'Reset the load of {reset} centers'))
@@ -0,0 +1,96 @@
+import json
+import logging
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from recycling_centers.management.commands.seed_benchmark import CENTER_PREFIX, PASSWORD, USER_PREFIX
+from recycling_centers.models import RecyclingCenter
+from recycling_tracker.benchmarks import RUNNERS, compare, default_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic datasets and benchmark the main views through the WSGI and ASGI stacks, '
+        'failing when results regress against the baseline. Run it against a development database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[100],
+                            help='Numbers of seeded centers, e.g. 100 10000 100000')
+        parser.add_argument('--users', type=int, default=1000, help='Seeded users per scale')
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per scenario')
+        parser.add_argument('--runners', nargs='+', choices=sorted(RUNNERS), default=sorted(RUNNERS))
+        parser.add_argument('--scenarios', nargs='+', help='Only run these scenarios')
+        parser.add_argument('--no-seed', action='store_true', help='Benchmark the data already seeded')
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true', help='Record these results as the baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown')
+        parser.add_argument('--output', help='Also write the results to this JSON file')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        # Errors are counted per scenario; don't log a traceback for each one
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        results = {}
+        for scale in options['scales']:
+            if not options['no_seed']:
+                self.stdout.write(f'Seeding {scale} centers...')
+                call_command('seed_benchmark', centers=scale, users=options['users'], clear=True, stdout=StringIO())
+            results[str(scale)] = self._run_scale(scale, options)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+            baseline.update(results)
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline to {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}; run with --save-baseline'))
+            return
+        baseline = json.loads(baseline_path.read_text())
+        regressions = []
+        for scale, scale_results in results.items():
+            regressions += [f'[{scale}] {line}' for line in compare(
+                scale_results, baseline.get(scale, {}), options['tolerance'],
+            )]
+        if regressions:
+            raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def _run_scale(self, scale, options):
+        center = RecyclingCenter.objects.filter(
+            external_id__startswith=CENTER_PREFIX, is_active=True,
+        ).order_by('id').first()
+        if center is None:
+            raise CommandError('No benchmark data; run manage.py seed_benchmark or drop --no-seed')
+        scenarios = default_scenarios(center.id, center.latitude, center.longitude, f'{USER_PREFIX}0', PASSWORD)
+        if options['scenarios']:
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        self.stdout.write(
+            f"\n{'scale':>7} {'runner':>6} {'scenario':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'queries':>8} {'peak KB':>9} {'errors':>6}"
+        )
+        results = {}
+        for runner_name in options['runners']:
+            runner = RUNNERS[runner_name](options['host'])
+            for scenario in scenarios:
+                metrics = runner.run(scenario, options['iterations'], options['warmup'])
+                results[f'{runner_name}:{scenario.name}'] = metrics
+                self.stdout.write(
+                    f"{scale:>7} {runner_name:>6} {scenario.name:<12} {metrics['p50_ms']:>9.2f} "
+                    f"{metrics['p95_ms']:>9.2f} {metrics['p99_ms']:>9.2f} {metrics.get('queries', '-'):>8} "
+                    f"{metrics['peak_kb']:>9.1f} {metrics['errors']:>6}"
+                )
+        return results
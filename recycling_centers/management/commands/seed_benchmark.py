@@ -0,0 +1,170 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.impact import impact_for, level_for
+from accounts.models import RecyclingActivity, UserProfile
+from accounts.leaderboards import rebuild_contributions, reset_leaderboards
+from accounts.rollups import rebuild_rollups
+from recycling_centers.cache import bump_centers_version
+from recycling_centers.models import AcceptedMaterial, RecyclingCenter
+from recycling_centers.search import get_search_backend
+
+CENTER_PREFIX = 'bench-'
+USER_PREFIX = 'bench_user_'
+PASSWORD = 'benchmark-password'
+
+# (name, latitude, longitude) of the areas centers and users cluster around
+METROS = [
+    ('New York', 40.7128, -74.0060),
+    ('London', 51.5074, -0.1278),
+    ('Mumbai', 19.0760, 72.8777),
+    ('Sao Paulo', -23.5505, -46.6333),
+    ('Tokyo', 35.6762, 139.6503),
+    ('Lagos', 6.5244, 3.3792),
+    ('Sydney', -33.8688, 151.2093),
+    ('Berlin', 52.5200, 13.4050),
+]
+NAME_WORDS = ['Green', 'Eco', 'Clean', 'Circular', 'Urban', 'River', 'Harbor', 'Community', 'Metro', 'Planet']
+KINDS = ['Recycling Center', 'Drop-off Point', 'Collection Hub', 'Material Depot', 'Reuse Yard']
+
+
+def _chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset of centers, users and activity for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centers', type=int, default=100)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--activities', type=int, default=5, help='Recycling activities per user')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded benchmark data first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            if options['clear']:
+                self._clear()
+            centers = self._seed_centers(rng, options['centers'], batch_size)
+            users = self._seed_users(rng, options['users'], options['activities'], centers, batch_size)
+
+        # bulk_create bypasses model signals, refresh derived data once
+        bump_centers_version()
+        get_search_backend().rebuild()
+        today = timezone.localdate()
+        rebuild_rollups(today - timedelta(days=366), today)
+        rebuild_contributions()
+        reset_leaderboards()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(centers)} centers and {users} users in {time.perf_counter() - started:.1f}s '
+            f'(password for {USER_PREFIX}N users: {PASSWORD!r})'
+        ))
+
+    def _clear(self):
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        RecyclingCenter.objects.filter(external_id__startswith=CENTER_PREFIX).delete()
+
+    def _seed_centers(self, rng, count, batch_size):
+        material_types = [choice for choice, _ in AcceptedMaterial.MATERIAL_TYPES]
+        offset = RecyclingCenter.objects.filter(external_id__startswith=CENTER_PREFIX).count()
+        centers = []
+        for number in range(offset, offset + count):
+            metro, lat, lon = rng.choice(METROS)
+            capacity = rng.choice([50, 100, 200, 500])
+            centers.append(RecyclingCenter(
+                external_id=f'{CENTER_PREFIX}{number}',
+                name=f'{rng.choice(NAME_WORDS)} {metro} {rng.choice(KINDS)} {number}',
+                description=f'Synthetic benchmark center accepting {rng.choice(material_types)} and more.',
+                address=f'{rng.randint(1, 999)} {rng.choice(NAME_WORDS)} Street, {metro}',
+                latitude=lat + rng.gauss(0, 0.3),
+                longitude=lon + rng.gauss(0, 0.3),
+                phone_number=f'555{rng.randint(0, 9999999):07d}',
+                email=f'center{number}@example.com',
+                opening_hours='Mon-Sat 8:00-18:00',
+                capacity=capacity,
+                current_load=rng.randint(0, capacity),
+                is_active=rng.random() > 0.05,
+            ))
+        for batch in _chunked(centers, batch_size):
+            RecyclingCenter.objects.bulk_create(batch)
+        # SQLite and PostgreSQL return primary keys from bulk_create
+        AcceptedMaterial.objects.bulk_create(
+            [
+                AcceptedMaterial(recycling_center_id=center.id, material_type=material_type)
+                for center in centers
+                for material_type in rng.sample(material_types, rng.randint(2, 5))
+            ],
+            batch_size=batch_size,
+        )
+        return centers
+
+    def _seed_users(self, rng, count, activities_per_user, centers, batch_size):
+        material_types = [choice for choice, _ in AcceptedMaterial.MATERIAL_TYPES]
+        # Hashing once keeps seeding fast; every user shares the password
+        password = make_password(PASSWORD)
+        offset = User.objects.filter(username__startswith=USER_PREFIX).count()
+        now = timezone.now()
+
+        users = [
+            User(username=f'{USER_PREFIX}{number}', email=f'user{number}@example.com', password=password)
+            for number in range(offset, offset + count)
+        ]
+        for batch in _chunked(users, batch_size):
+            User.objects.bulk_create(batch)
+
+        profiles, activities = [], []
+        for user in users:
+            metro, lat, lon = rng.choice(METROS)
+            profile = UserProfile(
+                user_id=user.id,
+                city=metro,
+                # Two in three users show up on the leaderboards
+                public_profile=user.id % 3 != 0,
+                latitude=lat + rng.gauss(0, 0.3),
+                longitude=lon + rng.gauss(0, 0.3),
+                sms_notifications=rng.random() < 0.1,
+            )
+            history = []
+            for _ in range(activities_per_user):
+                material_type = rng.choice(material_types)
+                weight = round(rng.uniform(0.5, 25), 2)
+                co2_saved, trees_saved = impact_for(material_type, weight)
+                history.append(RecyclingActivity(
+                    material_type=material_type,
+                    items=rng.randint(1, 10),
+                    weight=weight,
+                    co2_saved=co2_saved,
+                    trees_saved=trees_saved,
+                    recycling_center_id=rng.choice(centers).id if centers else None,
+                    created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                ))
+            profile.total_items_recycled = sum(activity.items for activity in history)
+            profile.total_weight_recycled = sum(activity.weight for activity in history)
+            profile.co2_saved = sum(activity.co2_saved for activity in history)
+            profile.trees_saved = sum(activity.trees_saved for activity in history)
+            profile.recycling_level, profile.recycling_level_progress = level_for(profile.total_weight_recycled)
+            profiles.append((profile, history))
+
+        for batch in _chunked(profiles, batch_size):
+            UserProfile.objects.bulk_create([profile for profile, _ in batch])
+            for profile, history in batch:
+                for activity in history:
+                    activity.profile_id = profile.id
+                    activities.append(activity)
+        for batch in _chunked(activities, batch_size):
+            RecyclingActivity.objects.bulk_create(batch)
+        return len(users)
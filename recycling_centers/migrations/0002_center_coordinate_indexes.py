@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('recycling_centers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recyclingcenter',
+            index=models.Index(fields=['latitude', 'longitude'], name='center_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recyclingcenter',
+            index=models.Index(fields=['longitude'], name='center_lon_idx'),
+        ),
+    ]
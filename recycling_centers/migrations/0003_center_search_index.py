@@ -0,0 +1,37 @@
+from django.db import OperationalError, migrations
+
+FTS_TABLE = 'recycling_centers_center_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    # Only SQLite uses a separate index table; see recycling_centers/search.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            "name, address, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    except OperationalError:
+        # SQLite built without FTS5, searches fall back to icontains
+        return
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, name, address, description) '
+        'SELECT id, name, address, description FROM recycling_centers_recyclingcenter'
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recycling_centers', '0002_center_coordinate_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recycling_centers', '0003_center_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingcenter',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Identifier in the source dataset, used by import_centers', max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recycling_centers', '0004_center_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingcenter',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies of the image, see recycling_tracker/thumbnails.py'),
+        ),
+    ]
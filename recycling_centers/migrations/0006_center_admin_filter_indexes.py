@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recycling_centers', '0005_center_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recyclingcenter',
+            index=models.Index(fields=['is_active'], name='center_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recyclingcenter',
+            index=models.Index(fields=['created_at'], name='center_created_idx'),
+        ),
+    ]
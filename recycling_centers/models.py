@@ -2,6 +2,8 @@ from django.db import models
 from accounts.models import UserProfile
 
 class RecyclingCenter(models.Model):
+    external_id = models.CharField(max_length=100, unique=True, null=True, blank=True,
+                                   help_text="Identifier in the source dataset, used by import_centers")
     name = models.CharField(max_length=200)
     description = models.TextField()
     address = models.TextField()
@@ -15,12 +17,31 @@ class RecyclingCenter(models.Model):
     current_load = models.IntegerField(default=0)
     staff_members = models.ManyToManyField(UserProfile, blank=True, limit_choices_to={'user_type': 'staff'})
     image = models.ImageField(upload_to='centers/', blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False,
+                                        help_text="Resized copies of the image, see recycling_tracker/thumbnails.py")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Bounding-box lookups for the map viewport
+            models.Index(fields=['latitude', 'longitude'], name='center_lat_lon_idx'),
+            models.Index(fields=['longitude'], name='center_lon_idx'),
+            # Admin list filters
+            models.Index(fields=['is_active'], name='center_active_idx'),
+            models.Index(fields=['created_at'], name='center_created_idx'),
+        ]
+    
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets post_save handlers tell a deactivation from any other save
+        instance._loaded_is_active = dict(zip(field_names, values)).get('is_active')
+        return instance
     
     @property
     def availability_percentage(self):
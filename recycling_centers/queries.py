@@ -0,0 +1,100 @@
+"""
+Query-optimized center summaries shared by the list, map and API views.
+
+Materials are prefetched in one extra query, only the serialized columns are
+selected, availability is computed in SQL and the material filter uses an
+EXISTS subquery so that centers are never duplicated by the join.
+"""
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Prefetch, Value, When
+from django.db.models.functions import Cast
+
+from recycling_tracker.thumbnails import rendition_url
+
+from .models import AcceptedMaterial, RecyclingCenter
+
+SUMMARY_FIELDS = ('id', 'name', 'address', 'latitude', 'longitude', 'phone_number')
+DETAIL_FIELDS = ('description', 'email', 'website', 'opening_hours', 'image', 'image_renditions')
+
+
+def availability_expression():
+    """SQL equivalent of ``RecyclingCenter.availability_percentage``"""
+    return Case(
+        When(capacity=0, then=Value(0.0)),
+        default=Cast(F('capacity') - F('current_load'), FloatField()) * 100 / F('capacity'),
+        output_field=FloatField(),
+    )
+
+
+def active_centers(material_type=None):
+    """Active centers, optionally restricted to those accepting ``material_type``"""
+    centers = RecyclingCenter.objects.filter(is_active=True)
+    if material_type:
+        centers = centers.filter(Exists(AcceptedMaterial.objects.filter(
+            recycling_center=OuterRef('pk'),
+            material_type=material_type,
+        )))
+    return centers
+
+
+def center_summaries(material_type=None, detailed=False):
+    """Queryset of active centers ready for ``serialize_center``"""
+    fields = SUMMARY_FIELDS + DETAIL_FIELDS if detailed else SUMMARY_FIELDS
+    material_fields = ('recycling_center_id', 'material_type')
+    if detailed:
+        material_fields += ('description',)
+    return (
+        active_centers(material_type)
+        .only(*fields)
+        .annotate(availability=availability_expression())
+        .prefetch_related(Prefetch(
+            'accepted_materials',
+            queryset=AcceptedMaterial.objects.only(*material_fields),
+        ))
+        .order_by('id')
+    )
+
+
+def center_availability():
+    """``(id, availability)`` rows of the active centers"""
+    return active_centers().annotate(availability=availability_expression()).values_list('id', 'availability')
+
+
+def with_availability(centers_data, availability):
+    """Serialized centers with ``availability_percentage`` read from an ``{id: availability}`` map"""
+    return [
+        {**center, 'availability_percentage': availability.get(center['id'], center['availability_percentage'])}
+        for center in centers_data
+    ]
+
+
+def serialize_center(center, detailed=False):
+    """JSON-ready dict for a center loaded through ``center_summaries``"""
+    data = {
+        'id': center.id,
+        'name': center.name,
+        'address': center.address,
+        'latitude': center.latitude,
+        'longitude': center.longitude,
+        'phone_number': center.phone_number,
+        'availability_percentage': center.availability,
+    }
+    materials = center.accepted_materials.all()
+    if detailed:
+        data.update({
+            'description': center.description,
+            'email': center.email,
+            'website': center.website,
+            'opening_hours': center.opening_hours,
+            # Card-sized renditions rather than the original upload
+            'image_url': rendition_url(center.image, center.image_renditions, 'medium', 'jpeg'),
+            'image_webp_url': rendition_url(center.image, center.image_renditions, 'medium', 'webp'),
+            'accepted_materials': [
+                {
+                    'type': material.material_type,
+                    'description': material.description
+                } for material in materials
+            ],
+        })
+    else:
+        data['accepted_materials'] = [material.material_type for material in materials]
+    return data
@@ -0,0 +1,189 @@
+"""
+Pluggable full-text search over recycling centers.
+
+``get_search_backend()`` returns the backend named by the
+``CENTERS_SEARCH_BACKEND`` setting, or picks one for the database in use:
+an FTS5 virtual table on SQLite, ``SearchVector`` ranking on PostgreSQL and
+plain ``icontains`` filtering elsewhere. Backends that keep their own index
+are updated by the signal handlers in ``signals.py`` and can be rebuilt with
+``manage.py rebuild_search_index``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import RecyclingCenter
+
+FTS_TABLE = 'recycling_centers_center_fts'
+
+
+def _terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+class BaseSearchBackend:
+    """Interface every search backend implements"""
+
+    def search(self, queryset, query):
+        """Filter ``queryset`` to centers matching ``query``, best matches first"""
+        raise NotImplementedError
+
+    def index_centers(self, centers):
+        """Add or refresh index entries for ``centers``"""
+
+    def remove_centers(self, center_ids):
+        """Drop index entries for the given center ids"""
+
+    def rebuild(self):
+        """Rebuild the whole index from the database, returning the row count"""
+        return 0
+
+
+class FTSRank(Func):
+    """``bm25()`` score of the indexed center whose id is the source expression"""
+    output_field = FloatField()
+
+    def __init__(self, expression, match, weights):
+        super().__init__(expression)
+        self.match = match
+        self.weights = weights
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # The id is compiled like any other column, so the score stays correct
+        # when the queryset is nested in another query under a table alias.
+        # bm25() recomputes corpus statistics for every FTS cursor, so the
+        # matches are scored in one pass and then looked up by id; LIMIT -1
+        # keeps SQLite from flattening that pass into a per-row MATCH.
+        sql, params = compiler.compile(self.source_expressions[0])
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return (
+            f'(SELECT score FROM (SELECT rowid AS id, bm25({FTS_TABLE}, {weights}) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT -1) WHERE id = {sql})',
+            (self.match, *params),
+        )
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Unindexed ``icontains`` matching on name, address and description"""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(address__icontains=query) |
+            Q(description__icontains=query)
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index with prefix matching and bm25 ranking. Name matches
+    weigh more than address matches, which weigh more than description ones.
+    """
+    weights = (10.0, 5.0, 1.0)  # name, address, description
+    batch_size = 500
+
+    @classmethod
+    def is_available(cls):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def match_expression(query):
+        """Every term must match, each as a prefix"""
+        return ' '.join(f'"{term}"*' for term in _terms(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+        return queryset.filter(pk__in=matches).annotate(
+            search_rank=FTSRank(F('pk'), expression, self.weights),
+        ).order_by('search_rank')
+
+    def index_centers(self, centers):
+        rows = [(center.id, center.name, center.address, center.description) for center in centers]
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                    [row[0] for row in batch],
+                )
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, name, address, description) VALUES (%s, %s, %s, %s)',
+                    batch,
+                )
+
+    def remove_centers(self, center_ids):
+        center_ids = list(center_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(center_ids), self.batch_size):
+                batch = center_ids[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', batch)
+
+    def rebuild(self):
+        table = connection.ops.quote_name(RecyclingCenter._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, address, description) '
+                f'SELECT id, name, address, description FROM {table}'
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            return cursor.fetchone()[0]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL full-text search ranked with ``SearchRank``. The vector is
+    computed by the query, so no separate index needs to be kept in sync; add
+    a GIN expression index over the same vector to make it index-backed.
+    """
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        terms = _terms(query)
+        if not terms:
+            return queryset
+        vector = (
+            SearchVector('name', weight='A') +
+            SearchVector('address', weight='B') +
+            SearchVector('description', weight='C')
+        )
+        search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw')
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(search_vector=search_query).order_by('-search_rank')
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the configured search backend, choosing one for the database if unset"""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'CENTERS_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'sqlite':
+            if not SQLiteFTSSearchBackend.is_available():
+                # Not cached, so the index is picked up once its migration runs
+                return SimpleSearchBackend()
+            _backend = SQLiteFTSSearchBackend()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
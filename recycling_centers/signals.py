@@ -0,0 +1,65 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from recycling_tracker.thumbnails import schedule_renditions
+
+from .cache import bump_centers_version
+from .models import AcceptedMaterial, RecyclingCenter
+from .search import get_search_backend
+
+_state = threading.local()
+
+
+@contextmanager
+def center_signals_suspended():
+    """
+    Skip the handlers below for bulk operations that refresh the cache
+    version and search index themselves once they are done.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _suspended():
+    return getattr(_state, 'suspended', False)
+
+
+@receiver(post_save, sender=RecyclingCenter)
+@receiver(post_delete, sender=RecyclingCenter)
+@receiver(post_save, sender=AcceptedMaterial)
+@receiver(post_delete, sender=AcceptedMaterial)
+@receiver(m2m_changed, sender=RecyclingCenter.staff_members.through)
+def centers_changed(sender, **kwargs):
+    # Orphans cached payloads and makes the spatial index rebuild lazily
+    if not _suspended() and kwargs.get('action', 'post_').startswith('post_'):
+        bump_centers_version()
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def index_center(sender, instance, raw=False, **kwargs):
+    if not raw and not _suspended():
+        get_search_backend().index_centers([instance])
+
+
+@receiver(post_delete, sender=RecyclingCenter)
+def unindex_center(sender, instance, **kwargs):
+    if not _suspended():
+        get_search_backend().remove_centers([instance.id])
+
+
+def _renditions_ready(center):
+    # Stored with a queryset update, which skips the handlers above
+    bump_centers_version()
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def render_center_image(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'image' in update_fields):
+        schedule_renditions(instance, 'image', 'image_renditions', on_ready=_renditions_ready)
@@ -0,0 +1,163 @@
+"""
+In-memory spatial index over active recycling centers.
+
+Centers are bucketed into a fixed latitude/longitude grid so that nearest and
+radius lookups only compute distances for centers in nearby cells instead of
+the whole table. The index is built lazily from the database and tagged with
+the centers version from ``cache.py``; once the signal handlers in
+``signals.py`` bump that version, the next query rebuilds it.
+"""
+import math
+import threading
+from collections import defaultdict, namedtuple
+
+from .cache import get_centers_version
+from .geo import EARTH_RADIUS_KM, KM_PER_DEGREE, batch_distances
+from .models import AcceptedMaterial, RecyclingCenter
+
+CenterPoint = namedtuple('CenterPoint', ['id', 'latitude', 'longitude', 'materials'])
+
+# Half of Earth's circumference: every point on the globe lies within this radius
+MAX_SEARCH_RADIUS_KM = math.pi * EARTH_RADIUS_KM
+
+
+class SpatialIndex:
+    """Grid index answering "k nearest" and "within radius" queries."""
+
+    def __init__(self, points, cell_size=0.5):
+        self.cell_size = cell_size
+        self.rows = int(math.ceil(180 / cell_size))
+        self.cols = int(math.ceil(360 / cell_size))
+        self.cells = defaultdict(list)
+        self.size = 0
+        for point in points:
+            self.cells[self._cell(point.latitude, point.longitude)].append(point)
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def points(self):
+        """Iterate over every indexed point"""
+        for points in self.cells.values():
+            yield from points
+
+    def _row(self, lat):
+        return min(self.rows - 1, max(0, int(math.floor((lat + 90) / self.cell_size))))
+
+    def _col(self, lon):
+        return int(math.floor((lon + 180) / self.cell_size)) % self.cols
+
+    def _cell(self, lat, lon):
+        return self._row(lat), self._col(lon)
+
+    def _candidates(self, lat, lon, radius_km):
+        """Yield every indexed point in the cells overlapping the search circle"""
+        dlat = radius_km / KM_PER_DEGREE
+        min_lat, max_lat = lat - dlat, lat + dlat
+        if min_lat <= -90 or max_lat >= 90:
+            # The circle reaches a pole, so it spans every longitude
+            dlon = 180
+        else:
+            widest = max(abs(min_lat), abs(max_lat))
+            dlon = min(180, dlat / math.cos(math.radians(widest)))
+
+        rows = range(self._row(min_lat), self._row(max_lat) + 1)
+        if dlon >= 180:
+            cols = None
+        else:
+            first = int(math.floor((lon - dlon + 180) / self.cell_size))
+            last = int(math.floor((lon + dlon + 180) / self.cell_size))
+            cols = {col % self.cols for col in range(first, last + 1)}
+
+        cell_count = len(rows) * (self.cols if cols is None else len(cols))
+        if cell_count > len(self.cells):
+            # Cheaper to walk the occupied cells than the covered ones
+            for (row, col), points in self.cells.items():
+                if row in rows and (cols is None or col in cols):
+                    yield from points
+            return
+
+        for row in rows:
+            for col in (range(self.cols) if cols is None else cols):
+                yield from self.cells.get((row, col), ())
+
+    def within_radius(self, lat, lon, radius_km, material_type=None, limit=None):
+        """Return ``(distance, point)`` pairs within ``radius_km``, nearest first"""
+        candidates = [
+            point for point in self._candidates(lat, lon, radius_km)
+            if not material_type or material_type in point.materials
+        ]
+        distances = batch_distances(
+            lat, lon,
+            [point.latitude for point in candidates],
+            [point.longitude for point in candidates],
+        )
+        results = [
+            (float(distance), point)
+            for distance, point in zip(distances, candidates)
+            if distance <= radius_km
+        ]
+        results.sort(key=lambda item: item[0])
+        if limit is not None:
+            results = results[:limit]
+        return results
+
+    def nearest(self, lat, lon, k=10, material_type=None):
+        """Return the ``k`` nearest ``(distance, point)`` pairs, nearest first"""
+        # Grow the search circle until it holds k matches; any point outside
+        # the circle is farther away than every point inside it.
+        radius_km = self.cell_size * KM_PER_DEGREE
+        while True:
+            results = self.within_radius(lat, lon, radius_km, material_type)
+            if len(results) >= k or radius_km >= MAX_SEARCH_RADIUS_KM:
+                return results[:k]
+            radius_km = min(radius_km * 4, MAX_SEARCH_RADIUS_KM)
+
+    def query(self, lat, lon, radius_km=None, limit=None, material_type=None):
+        """Dispatch to a radius or nearest query depending on what is bounded"""
+        if radius_km is not None:
+            return self.within_radius(lat, lon, radius_km, material_type, limit)
+        if limit is not None:
+            return self.nearest(lat, lon, limit, material_type)
+        return self.within_radius(lat, lon, MAX_SEARCH_RADIUS_KM, material_type)
+
+
+_index = None  # (centers version, SpatialIndex)
+_index_lock = threading.Lock()
+
+
+def build_spatial_index():
+    """Build a fresh index from the active centers in the database"""
+    materials = defaultdict(set)
+    accepted = AcceptedMaterial.objects.filter(
+        recycling_center__is_active=True
+    ).values_list('recycling_center_id', 'material_type')
+    for center_id, material_type in accepted:
+        materials[center_id].add(material_type)
+
+    centers = RecyclingCenter.objects.filter(is_active=True).values_list('id', 'latitude', 'longitude')
+    return SpatialIndex(
+        CenterPoint(center_id, lat, lon, frozenset(materials[center_id]))
+        for center_id, lat, lon in centers
+    )
+
+
+def get_spatial_index():
+    """Return the shared index, rebuilding it when the centers version moved"""
+    global _index
+    version = get_centers_version()
+    entry = _index
+    if entry is None or entry[0] != version:
+        with _index_lock:
+            if _index is None or _index[0] != version:
+                _index = (version, build_spatial_index())
+            entry = _index
+    return entry[1]
+
+
+def invalidate_spatial_index():
+    """Drop the shared index so the next query rebuilds it"""
+    global _index
+    with _index_lock:
+        _index = None
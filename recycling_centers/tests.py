@@ -0,0 +1,156 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache import get_centers_version
+from .capacity import CapacityExceeded, release_capacity, reserve_capacity
+from .models import AcceptedMaterial, RecyclingCenter
+from .spatial_index import get_spatial_index
+
+# The tree has no base.html or centers list template yet, so minimal ones
+# stand in for them; the map page renders its real template.
+TEST_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': [settings.BASE_DIR / 'templates'],
+    'OPTIONS': {
+        'context_processors': settings.TEMPLATES[0]['OPTIONS']['context_processors'],
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'base.html': '{% block content %}{% endblock %}{% block extra_js %}{% endblock %}',
+                'recycling_centers/list.html': (
+                    '{% for center in centers %}{{ center.name }} {{ center.availability_percentage }}'
+                    '{% for material in center.accepted_materials %}{{ material.type }}{% endfor %}'
+                    '{% endfor %}'
+                ),
+            }),
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    },
+}]
+
+
+@override_settings(TEMPLATES=TEST_TEMPLATES)
+class CenterListingQueryCountTests(TestCase):
+    """The listing views run a fixed number of queries however many centers exist"""
+    views = ('recycling_centers_list', 'recycling_centers_map', 'centers_api')
+    materials = ('plastic', 'glass', 'paper')
+
+    def seed(self, count):
+        start = RecyclingCenter.objects.count()
+        centers = RecyclingCenter.objects.bulk_create([
+            RecyclingCenter(
+                name=f'Center {start + i}',
+                address=f'{start + i} Main Street',
+                latitude=40 + i / 1000,
+                longitude=-74 + i / 1000,
+                phone_number='555-0100',
+                email=f'center{start + i}@example.com',
+                opening_hours='Mon-Fri 9-5',
+                capacity=1000,
+                current_load=i % 1000,
+            )
+            for i in range(count)
+        ])
+        AcceptedMaterial.objects.bulk_create([
+            AcceptedMaterial(recycling_center=center, material_type=material)
+            for center in centers
+            for material in self.materials
+        ])
+
+    def get(self, name, params):
+        # Cached payloads would hide the queries that build them
+        for cache in caches.all():
+            cache.clear()
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def count_queries(self, name, params):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(name, params)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_centers(self):
+        cases = [(name, params) for name in self.views for params in ({}, {'material_type': 'glass'})]
+        self.seed(5)
+        counts = {(name, tuple(params.items())): self.count_queries(name, params) for name, params in cases}
+        self.seed(45)
+        for name, params in cases:
+            with self.subTest(view=name, params=params):
+                with self.assertNumQueries(counts[name, tuple(params.items())]):
+                    self.get(name, params)
+
+
+class LoadVersionTests(TestCase):
+    """Load changes refresh availability without rebuilding the geometry indexes"""
+
+    def test_reservations_keep_the_centers_version(self):
+        center = RecyclingCenter.objects.create(
+            name='Depot', address='1 Main Street', latitude=1, longitude=2,
+            phone_number='555-0100', email='depot@example.com', opening_hours='Mon-Fri 9-5', capacity=100,
+        )
+        version = get_centers_version()
+        spatial_index = get_spatial_index()
+        self.assertEqual(self.client.get(reverse('centers_api')).json()['centers'][0]['availability_percentage'], 100)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_capacity(center, 25)
+        self.assertEqual(get_centers_version(), version)
+        self.assertIs(get_spatial_index(), spatial_index)
+        self.assertEqual(self.client.get(reverse('centers_api')).json()['centers'][0]['availability_percentage'], 75)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release_capacity(center, 25)
+        self.assertEqual(self.client.get(reverse('centers_api')).json()['centers'][0]['availability_percentage'], 100)
+
+
+class CapacityReservationTests(TransactionTestCase):
+    """Concurrent reservations never overbook a center or lose an increment"""
+    threads = 16
+    attempts = 25
+    capacity = 200
+
+    def test_concurrent_reservations_fill_capacity_exactly(self):
+        center = RecyclingCenter.objects.create(
+            name='Busy center', address='1 Main Street', latitude=0, longitude=0,
+            phone_number='555-0100', email='busy@example.com', opening_hours='Mon-Fri 9-5',
+            capacity=self.capacity,
+        )
+        granted = []
+        errors = []
+        barrier = threading.Barrier(self.threads)
+
+        def worker():
+            ok = 0
+            try:
+                barrier.wait()
+                for _ in range(self.attempts):
+                    try:
+                        reserve_capacity(center.pk, retries=20)
+                        ok += 1
+                    except CapacityExceeded:
+                        pass
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                granted.append(ok)
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        center.refresh_from_db()
+        self.assertEqual(center.current_load, sum(granted))
+        self.assertLessEqual(center.current_load, center.capacity)
+        # More attempts than capacity, so every unit is booked
+        self.assertEqual(center.current_load, self.capacity)
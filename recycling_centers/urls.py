@@ -1,9 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# The ASGI profile serves these pages from native async views
+if settings.ASYNC_VIEWS:
+    center_detail, centers_map, centers_api = (
+        views.arecycling_center_detail, views.arecycling_centers_map, views.acenters_api,
+    )
+else:
+    center_detail, centers_map, centers_api = (
+        views.recycling_center_detail, views.recycling_centers_map, views.centers_api,
+    )
+
 urlpatterns = [
     path('', views.recycling_centers_list, name='recycling_centers_list'),
-    path('<int:center_id>/', views.recycling_center_detail, name='recycling_center_detail'),
-    path('map/', views.recycling_centers_map, name='recycling_centers_map'),
-    path('api/centers/', views.centers_api, name='centers_api'),
-]
\ No newline at end of file
+    path('<int:center_id>/', center_detail, name='recycling_center_detail'),
+    path('map/', centers_map, name='recycling_centers_map'),
+    path('api/centers/', centers_api, name='centers_api'),
+    path('api/v2/centers/', views.centers_api_v2, name='centers_api_v2'),
+    path('api/centers/export/', views.centers_export, name='centers_export'),
+    path('api/centers/viewport/', views.centers_viewport_api, name='centers_viewport_api'),
+]
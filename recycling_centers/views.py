@@ -1,85 +1,81 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.shortcuts import render, get_object_or_404, aget_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.views.decorators.http import condition
 from .models import RecyclingCenter, AcceptedMaterial
-import math
+from .clustering import viewport_clusters
+from .geo import calculate_distance
+from .cache import acached_payload, cached_payload, centers_etag, centers_last_modified_date
+from .queries import center_availability, center_summaries, serialize_center, with_availability
+from .search import get_search_backend
+from .spatial_index import get_spatial_index
+from recycling_tracker.executors import run_cpu_bound
+from recycling_tracker.thumbnails import rendition_urls
 import json
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two coordinates using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
-    
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    
-    return distance
+def _parse_number(value, cast):
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return None
+
+def nearby_center_distances(request, material_type=None, use_limit=True):
+    """
+    Look up centers around the ``lat``/``lon`` query parameters in the spatial
+    index, bounded by the optional ``radius`` (km) and ``limit`` parameters.
+
+    Returns an ordered ``{center_id: distance}`` mapping, nearest first, or
+    None when no valid location was given.
+    """
+    user_lat = _parse_number(request.GET.get('lat'), float)
+    user_lon = _parse_number(request.GET.get('lon'), float)
+    if user_lat is None or user_lon is None:
+        return None
+
+    radius = _parse_number(request.GET.get('radius'), float)
+    limit = _parse_number(request.GET.get('limit'), int) if use_limit else None
+    results = get_spatial_index().query(
+        user_lat, user_lon,
+        radius_km=radius if radius and radius > 0 else None,
+        limit=limit if limit and limit > 0 else None,
+        material_type=material_type,
+    )
+    return {point.id: round(distance, 2) for distance, point in results}
+
+def _is_bounded(distances):
+    """Whether the lookup excluded some centers, so the queryset needs filtering"""
+    return distances is not None and len(distances) < len(get_spatial_index())
 
 def recycling_centers_list(request):
-    centers = RecyclingCenter.objects.filter(is_active=True)
-    
     # Filter by material type
     material_type = request.GET.get('material_type')
-    if material_type:
-        centers = centers.filter(accepted_materials__material_type=material_type)
+    centers = center_summaries(material_type, detailed=True)
     
     # Search by name or address
     search = request.GET.get('search')
     if search:
-        centers = centers.filter(
-            Q(name__icontains=search) | 
-            Q(address__icontains=search) |
-            Q(description__icontains=search)
-        )
+        centers = get_search_backend().search(centers, search)
     
-    # Sort by distance if user location is provided
-    user_lat = request.GET.get('lat')
-    user_lon = request.GET.get('lon')
+    # Sort by distance if user location is provided. The limit is applied
+    # after the text search so that it counts matching centers only.
+    distances = nearby_center_distances(request, material_type, use_limit=not search)
+    if _is_bounded(distances):
+        centers = centers.filter(id__in=list(distances))
     
     centers_list = []
     for center in centers:
-        center_data = {
-            'id': center.id,
-            'name': center.name,
-            'description': center.description,
-            'address': center.address,
-            'latitude': center.latitude,
-            'longitude': center.longitude,
-            'phone_number': center.phone_number,
-            'email': center.email,
-            'website': center.website,
-            'opening_hours': center.opening_hours,
-            'availability_percentage': center.availability_percentage,
-            'image_url': center.image.url if center.image else None,
-            'accepted_materials': [
-                {
-                    'type': material.material_type,
-                    'description': material.description
-                } for material in center.accepted_materials.all()
-            ]
-        }
-        
-        # Calculate distance if user location is provided
-        if user_lat and user_lon:
-            try:
-                distance = calculate_distance(
-                    float(user_lat), float(user_lon),
-                    center.latitude, center.longitude
-                )
-                center_data['distance'] = round(distance, 2)
-            except (ValueError, TypeError):
-                center_data['distance'] = None
-        
+        center_data = serialize_center(center, detailed=True)
+        if distances is not None:
+            center_data['distance'] = distances.get(center.id)
         centers_list.append(center_data)
     
     # Sort by distance if available
-    if user_lat and user_lon:
+    if distances is not None:
         centers_list.sort(key=lambda x: x['distance'] if x['distance'] is not None else float('inf'))
+        limit = _parse_number(request.GET.get('limit'), int)
+        if limit and limit > 0:
+            centers_list = centers_list[:limit]
     
     return render(request, 'recycling_centers/list.html', {
         'centers': centers_list,
@@ -93,57 +89,206 @@ def recycling_center_detail(request, center_id):
     
     context = {
         'center': center,
+        'image': rendition_urls(center.image, center.image_renditions, 'large'),
         'accepted_materials': center.accepted_materials.all(),
+        'staff_count': center.staff_members.count(),
     }
     
     return render(request, 'recycling_centers/detail.html', context)
 
+def _center_summaries_payload(material_type):
+    """
+    Serialized summaries of active centers, served from the versioned cache.
+    Load changes only refresh the cached availability, not the summaries.
+    """
+    centers_data, hit = cached_payload(
+        'summaries', material_type,
+        lambda: [serialize_center(center) for center in center_summaries(material_type)],
+    )
+    availability, _ = cached_payload('availability', None, lambda: dict(center_availability()), load=True)
+    return with_availability(centers_data, availability), hit
+
 def recycling_centers_map(request):
-    centers = RecyclingCenter.objects.filter(is_active=True)
+    # Markers are fetched per viewport from centers_viewport_api
+    return render(request, 'recycling_centers/map.html', {
+        'material_types': AcceptedMaterial.MATERIAL_TYPES,
+        'selected_material': request.GET.get('material_type'),
+    })
+
+def _nearby_centers(request, material_type, centers_data):
+    """``centers_data`` around the requested location with distances, nearest first"""
+    distances = nearby_center_distances(request, material_type)
+    if distances is None:
+        return centers_data
+    centers_data = [
+        {**center, 'distance': distances[center['id']]}
+        for center in centers_data if center['id'] in distances
+    ]
+    centers_data.sort(key=lambda x: x['distance'])
+    return centers_data
+
+@condition(etag_func=centers_etag, last_modified_func=centers_last_modified_date)
+def centers_api(request):
+    """API endpoint for map markers"""
+    material_type = request.GET.get('material_type')
+    centers_data, hit = _center_summaries_payload(material_type)
+    centers_data = _nearby_centers(request, material_type, centers_data)
     
-    # Filter by material type
+    response = JsonResponse({'centers': centers_data})
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+
+def _decode_cursor(cursor):
+    try:
+        return int(urlsafe_base64_decode(cursor))
+    except (ValueError, TypeError):
+        return None
+
+@condition(etag_func=centers_etag, last_modified_func=centers_last_modified_date)
+def centers_api_v2(request):
+    """
+    Keyset-paginated API endpoint. Pages are ordered by id and the opaque
+    ``next_cursor`` of one page is passed as ``cursor`` to fetch the next.
+    """
     material_type = request.GET.get('material_type')
-    if material_type:
-        centers = centers.filter(accepted_materials__material_type=material_type)
+    page_size = _parse_number(request.GET.get('page_size'), int) or API_PAGE_SIZE
+    page_size = max(1, min(page_size, API_MAX_PAGE_SIZE))
     
-    centers_data = []
-    for center in centers:
-        centers_data.append({
-            'id': center.id,
-            'name': center.name,
-            'address': center.address,
-            'latitude': center.latitude,
-            'longitude': center.longitude,
-            'phone_number': center.phone_number,
-            'availability_percentage': center.availability_percentage,
-            'accepted_materials': [material.material_type for material in center.accepted_materials.all()]
-        })
+    centers = center_summaries(material_type)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        last_id = _decode_cursor(cursor)
+        if last_id is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        centers = centers.filter(id__gt=last_id)
     
-    return render(request, 'recycling_centers/map.html', {
-        'centers_json': json.dumps(centers_data),
+    # Fetch one extra row to know whether another page exists
+    page = list(centers[:page_size + 1])
+    has_next = len(page) > page_size
+    page = page[:page_size]
+    
+    return JsonResponse({
+        'centers': [serialize_center(center) for center in page],
+        'next_cursor': urlsafe_base64_encode(str(page[-1].id).encode()) if has_next else None,
+    })
+
+def centers_export(request):
+    """Stream every active center as newline-delimited JSON"""
+    material_type = request.GET.get('material_type')
+    centers = center_summaries(material_type)
+    
+    def rows():
+        # iterator() keeps memory flat; materials are prefetched per chunk
+        for center in centers.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield json.dumps(serialize_center(center)) + '\n'
+    
+    response = StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="centers.ndjson"'
+    return response
+
+
+def _parse_bbox(value):
+    """Parse ``west,south,east,north`` into a ``(south, west, north, east)`` tuple"""
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return None
+    return south, west, north, east
+
+@condition(etag_func=centers_etag, last_modified_func=centers_last_modified_date)
+def centers_viewport_api(request):
+    """
+    Clustered map markers for a viewport given as ``bbox=west,south,east,north``
+    and ``zoom``. Clusters holding a single center embed its summary.
+    """
+    bbox = _parse_bbox(request.GET.get('bbox'))
+    zoom = _parse_number(request.GET.get('zoom'), int)
+    if bbox is None or zoom is None:
+        return JsonResponse({'error': 'bbox and zoom are required'}, status=400)
+    
+    material_type = request.GET.get('material_type')
+    clusters = viewport_clusters(bbox, zoom, material_type)
+    
+    single_ids = [cluster.center_id for cluster in clusters if cluster.center_id is not None]
+    summaries = {
+        center.id: serialize_center(center)
+        for center in center_summaries(material_type).filter(id__in=single_ids)
+    } if single_ids else {}
+    
+    return JsonResponse({
+        'zoom': zoom,
+        'clusters': [
+            {
+                'latitude': cluster.latitude,
+                'longitude': cluster.longitude,
+                'count': cluster.count,
+                'materials': dict(cluster.materials),
+                'center': summaries.get(cluster.center_id),
+            } for cluster in clusters
+        ],
+    })
+
+
+# Native async versions of the map, detail and markers API views, routed by
+# recycling_centers/urls.py when settings.ASYNC_VIEWS is on (the ASGI profile).
+# Queries go through the async ORM and distance lookups run in the bounded
+# thread pool of recycling_tracker/executors.py, so neither blocks the loop.
+
+ASYNC_CHUNK_SIZE = 2000
+
+async def _arender(request, template_name, context):
+    """``render`` for async views"""
+    # Context processors read request.user synchronously, which would query
+    # the database from the event loop
+    request.user = await request.auser()
+    return render(request, template_name, context)
+
+async def arecycling_center_detail(request, center_id):
+    center = await aget_object_or_404(RecyclingCenter, id=center_id, is_active=True)
+    
+    context = {
+        'center': center,
+        'image': rendition_urls(center.image, center.image_renditions, 'large'),
+        'accepted_materials': [material async for material in center.accepted_materials.all()],
+        'staff_count': await center.staff_members.acount(),
+    }
+    
+    return await _arender(request, 'recycling_centers/detail.html', context)
+
+async def arecycling_centers_map(request):
+    return await _arender(request, 'recycling_centers/map.html', {
         'material_types': AcceptedMaterial.MATERIAL_TYPES,
-        'selected_material': material_type,
+        'selected_material': request.GET.get('material_type'),
     })
 
-def centers_api(request):
+async def _acenter_availability():
+    return {center_id: availability async for center_id, availability in center_availability()}
+
+async def _acenter_summaries(material_type):
+    # aiterator() prefetches the materials of each chunk
+    return [
+        serialize_center(center)
+        async for center in center_summaries(material_type).aiterator(chunk_size=ASYNC_CHUNK_SIZE)
+    ]
+
+@condition(etag_func=centers_etag, last_modified_func=centers_last_modified_date)
+async def acenters_api(request):
     """API endpoint for map markers"""
-    centers = RecyclingCenter.objects.filter(is_active=True)
-    
     material_type = request.GET.get('material_type')
-    if material_type:
-        centers = centers.filter(accepted_materials__material_type=material_type)
+    centers_data, hit = await acached_payload(
+        'summaries', material_type, lambda: _acenter_summaries(material_type),
+    )
+    availability, _ = await acached_payload('availability', None, _acenter_availability, load=True)
+    centers_data = with_availability(centers_data, availability)
+    if 'lat' in request.GET and 'lon' in request.GET:
+        centers_data = await run_cpu_bound(_nearby_centers, request, material_type, centers_data)
     
-    centers_data = []
-    for center in centers:
-        centers_data.append({
-            'id': center.id,
-            'name': center.name,
-            'address': center.address,
-            'latitude': center.latitude,
-            'longitude': center.longitude,
-            'phone_number': center.phone_number,
-            'availability_percentage': center.availability_percentage,
-            'accepted_materials': [material.material_type for material in center.accepted_materials.all()]
-        })
-    
-    return JsonResponse({'centers': centers_data})
\ No newline at end of file
+    response = JsonResponse({'centers': centers_data})
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
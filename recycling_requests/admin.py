@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import RecyclingRequest
+
+@admin.register(RecyclingRequest)
+class RecyclingRequestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'center', 'material_type', 'estimated_weight', 'status', 'created_at')
+    list_filter = ('status', 'material_type', 'created_at')
+    search_fields = ('user__user__username', 'center__name')
+    list_select_related = ('user__user', 'center')
+    raw_id_fields = ('user', 'center', 'reviewed_by')
+    readonly_fields = ('reviewed_at', 'completed_at', 'created_at', 'updated_at')
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class RecyclingRequestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'recycling_requests'
\ No newline at end of file
+    name = 'recycling_requests'
+
+    def ready(self):
+        from . import signals  # noqa: F401
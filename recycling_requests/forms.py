@@ -0,0 +1,64 @@
+from django import forms
+from recycling_centers.assignment import assign_center
+from recycling_centers.capacity import load_for_weight
+from recycling_centers.models import RecyclingCenter
+from .models import RecyclingRequest
+
+class RecyclingRequestForm(forms.ModelForm):
+    # Filled in by the browser's geolocation when no center is chosen
+    latitude = forms.FloatField(required=False, widget=forms.HiddenInput)
+    longitude = forms.FloatField(required=False, widget=forms.HiddenInput)
+
+    class Meta:
+        model = RecyclingRequest
+        fields = ['center', 'material_type', 'quantity', 'estimated_weight', 'preferred_date', 'notes']
+        widgets = {
+            'preferred_date': forms.DateInput(attrs={'type': 'date'}),
+            'notes': forms.Textarea(attrs={'rows': 3}),
+        }
+
+    def __init__(self, *args, profile=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = profile
+        self.fields['center'].queryset = self.fields['center'].queryset.filter(is_active=True).order_by('name')
+        self.fields['center'].required = False
+        self.fields['center'].empty_label = "Pick the best center for me"
+        for field in self.visible_fields():
+            field.field.widget.attrs.setdefault('class', 'form-select' if isinstance(field.field.widget, forms.Select) else 'form-control')
+
+    def clean_estimated_weight(self):
+        weight = self.cleaned_data['estimated_weight']
+        if weight <= 0:
+            raise forms.ValidationError("Weight must be greater than zero.")
+        return weight
+
+    def _location(self):
+        latitude, longitude = self.cleaned_data.get('latitude'), self.cleaned_data.get('longitude')
+        if latitude is None or longitude is None:
+            latitude = getattr(self.profile, 'latitude', None)
+            longitude = getattr(self.profile, 'longitude', None)
+        if latitude is None or longitude is None:
+            return None
+        return latitude, longitude
+
+    def clean(self):
+        cleaned_data = super().clean()
+        center = cleaned_data.get('center')
+        material_type = cleaned_data.get('material_type')
+        if not material_type:
+            return cleaned_data
+        
+        if center is None:
+            location = self._location()
+            if location is None:
+                self.add_error('center', "Choose a center, or share or save your location to have one picked for you.")
+                return cleaned_data
+            weight = cleaned_data.get('estimated_weight')
+            best = assign_center(*location, material_type, load_for_weight(weight) if weight else 1)
+            if best is None:
+                self.add_error('center', "No center with free capacity accepts this material right now.")
+                return cleaned_data
+            cleaned_data['center'] = self.instance.center = RecyclingCenter.objects.get(pk=best[0])
+        elif not center.accepted_materials.filter(material_type=material_type).exists():
+            self.add_error('material_type', f"{center.name} does not accept this material.")
+        return cleaned_data
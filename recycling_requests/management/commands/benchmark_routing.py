@@ -0,0 +1,47 @@
+import os
+import random
+
+from django.core.management.base import BaseCommand
+
+from recycling_requests.routing import Stop, plan_routes
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the pickup route planner on synthetic stop sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000], help='Numbers of stops')
+        parser.add_argument('--capacity', type=float, default=500.0,
+                            help='Vehicle capacity in kg; 0 plans a single unlimited route')
+        parser.add_argument('--budget', type=float, default=2.0, help='Planning time budget in seconds')
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                            help='Process pool sizes to compare')
+        parser.add_argument('--radius', type=float, default=0.25, help='Spread of stops around the depot, in degrees')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        capacity = options['capacity'] or None
+        depot = (40.7128, -74.0060)
+
+        self.stdout.write(
+            f"{'stops':>6}  {'workers':>7}  {'routes':>6}  {'nearest nb.':>11}  "
+            f"{'optimized':>10}  {'saved':>6}  {'time':>8}"
+        )
+        for size in options['sizes']:
+            rng = random.Random(options['seed'])
+            stops = [
+                Stop(
+                    index,
+                    depot[0] + rng.uniform(-options['radius'], options['radius']),
+                    depot[1] + rng.uniform(-options['radius'], options['radius']),
+                    rng.uniform(1, 40),
+                )
+                for index in range(size)
+            ]
+            for workers in options['workers']:
+                plan = plan_routes(depot, stops, capacity=capacity, time_budget=options['budget'], workers=workers)
+                saved = 1 - plan.distance_km / plan.initial_distance_km if plan.initial_distance_km else 0
+                self.stdout.write(
+                    f'{size:>6}  {workers:>7}  {len(plan.routes):>6}  {plan.initial_distance_km:>8.1f} km  '
+                    f'{plan.distance_km:>7.1f} km  {saved:>6.1%}  {plan.elapsed:>6.2f} s'
+                )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recycling_requests.models import RecyclingRequest
+from recycling_requests.services import reassign_requests
+
+
+class Command(BaseCommand):
+    help = 'Move open requests of inactive (or the given) centers to the best active center'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--center', type=int, action='append', help='Center id to empty (repeatable)')
+
+    def handle(self, *args, **options):
+        requests = RecyclingRequest.objects.all()
+        if options['center']:
+            requests = requests.filter(center_id__in=options['center'])
+        else:
+            requests = requests.filter(center__is_active=False)
+
+        started = time.perf_counter()
+        moved, unassigned = reassign_requests(requests)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} requests in {elapsed:.2f}s; {unassigned} have no center that can take them'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0002_recycling_activity'),
+        ('recycling_centers', '0004_center_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecyclingRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('material_type', models.CharField(choices=[('plastic', 'Plastic'), ('glass', 'Glass'), ('paper', 'Paper'), ('metal', 'Metal'), ('electronic', 'Electronic'), ('organic', 'Organic'), ('textile', 'Textile'), ('battery', 'Battery'), ('other', 'Other')], max_length=20)),
+                ('quantity', models.PositiveIntegerField(default=1, help_text='Number of items')),
+                ('estimated_weight', models.FloatField(help_text='Estimated weight in kg')),
+                ('actual_weight', models.FloatField(blank=True, help_text='Weight recorded at drop-off in kg', null=True)),
+                ('preferred_date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('completed', 'Completed')], default='pending', max_length=10)),
+                ('staff_notes', models.TextField(blank=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recycling_requests', to='recycling_centers.recyclingcenter')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_requests', to='accounts.userprofile')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recycling_requests', to='accounts.userprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['center', 'status', 'created_at'], name='request_center_queue_idx'), models.Index(fields=['user', 'created_at'], name='request_user_recent_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+from accounts.models import UserProfile
+from recycling_centers.models import AcceptedMaterial, RecyclingCenter
+
+class RecyclingRequest(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('completed', 'Completed'),
+    )
+    # Statuses each status may move to
+    TRANSITIONS = {
+        'pending': ('approved', 'rejected'),
+        'approved': ('completed', 'rejected'),
+        'rejected': (),
+        'completed': (),
+    }
+
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='recycling_requests')
+    center = models.ForeignKey(RecyclingCenter, on_delete=models.CASCADE, related_name='recycling_requests')
+    material_type = models.CharField(max_length=20, choices=AcceptedMaterial.MATERIAL_TYPES)
+    quantity = models.PositiveIntegerField(default=1, help_text="Number of items")
+    estimated_weight = models.FloatField(help_text="Estimated weight in kg")
+    actual_weight = models.FloatField(null=True, blank=True, help_text="Weight recorded at drop-off in kg")
+    preferred_date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    staff_notes = models.TextField(blank=True)
+    reviewed_by = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='reviewed_requests')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Staff queues: one center's requests in a status, oldest first
+            models.Index(fields=['center', 'status', 'created_at'], name='request_center_queue_idx'),
+            models.Index(fields=['user', 'created_at'], name='request_user_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.user.username} - {self.get_material_type_display()} at {self.center.name} ({self.status})"
+    
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS[self.status]
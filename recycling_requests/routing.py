@@ -0,0 +1,267 @@
+"""
+Pickup route planning for center staff.
+
+Approved requests are stops with a demand (their estimated weight) that a
+vehicle of limited capacity collects, starting and ending at the center.
+``plan_routes`` solves this capacity-constrained vehicle routing problem
+heuristically:
+
+1. the Haversine distance matrix of the center and every stop is computed
+   in one batch with ``recycling_centers.geo.distance_matrix``;
+2. routes are built with capacity-aware nearest neighbour, opening a new
+   route whenever no remaining stop fits the vehicle;
+3. each route is improved independently with 2-opt and or-opt moves until
+   neither helps or the time budget runs out. Routes are spread over a
+   process pool for large days.
+
+Work done before the deadline is kept, so a plan always comes back within
+roughly ``time_budget`` seconds. The solver itself needs no database and no
+app registry (models are imported lazily) so that worker processes stay
+cheap to start.
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from recycling_centers.geo import distance_matrix
+
+Stop = namedtuple('Stop', 'id latitude longitude demand')
+Route = namedtuple('Route', 'stops load distance_km')
+RoutePlan = namedtuple('RoutePlan', 'routes unassigned initial_distance_km distance_km elapsed')
+
+DEFAULT_TIME_BUDGET = 2.0
+# Below this many stops, starting worker processes costs more than it saves
+PARALLEL_MIN_STOPS = 200
+EPSILON = 1e-9
+
+
+def tour_length(tour, matrix):
+    """Length of a closed tour given as node indexes, depot included at both ends"""
+    return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+
+def nearest_neighbour_routes(matrix, demands, capacity, nodes):
+    """
+    Split ``nodes`` into routes greedily: always drive to the nearest
+    unvisited node that still fits, returning to the depot (node 0) when
+    none does.
+    """
+    unvisited = set(nodes)
+    routes = []
+    while unvisited:
+        route, load, current = [], 0, 0
+        while True:
+            row = matrix[current]
+            candidates = (
+                node for node in unvisited
+                if capacity is None or load + demands[node] <= capacity
+            )
+            nearest = min(candidates, key=row.__getitem__, default=None)
+            if nearest is None:
+                break
+            route.append(nearest)
+            load += demands[nearest]
+            unvisited.discard(nearest)
+            current = nearest
+        routes.append(route)
+    return routes
+
+
+def two_opt(tour, matrix, deadline):
+    """Reverse tour sections while that shortens the tour (first improvement)"""
+    improved = False
+    changed = True
+    while changed and time.monotonic() < deadline:
+        changed = False
+        for i in range(len(tour) - 3):
+            a, b = tour[i], tour[i + 1]
+            row_a = matrix[a]
+            for j in range(i + 2, len(tour) - 1):
+                c, d = tour[j], tour[j + 1]
+                if row_a[c] + matrix[b][d] - row_a[b] - matrix[c][d] < -EPSILON:
+                    tour[i + 1:j + 1] = tour[j:i:-1]
+                    b = tour[i + 1]
+                    changed = improved = True
+            if time.monotonic() >= deadline:
+                break
+    return improved
+
+
+def or_opt(tour, matrix, deadline, max_segment=3):
+    """Move segments of up to ``max_segment`` stops, possibly reversed, to a cheaper spot"""
+    improved = False
+    changed = True
+    while changed and time.monotonic() < deadline:
+        changed = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length < len(tour) and time.monotonic() < deadline:
+                first, last = tour[i], tour[i + length - 1]
+                before, after = tour[i - 1], tour[i + length]
+                removal = matrix[before][first] + matrix[last][after] - matrix[before][after]
+                rest = tour[:i] + tour[i + length:]
+
+                best, position, reverse = -EPSILON, None, False
+                for k in range(len(rest) - 1):
+                    if k == i - 1:
+                        continue
+                    p, q = rest[k], rest[k + 1]
+                    forward = matrix[p][first] + matrix[last][q] - matrix[p][q] - removal
+                    backward = matrix[p][last] + matrix[first][q] - matrix[p][q] - removal
+                    if forward < best:
+                        best, position, reverse = forward, k, False
+                    if backward < best:
+                        best, position, reverse = backward, k, True
+
+                if position is None:
+                    i += 1
+                    continue
+                segment = tour[i:i + length]
+                if reverse:
+                    segment.reverse()
+                tour[:] = rest[:position + 1] + segment + rest[position + 1:]
+                changed = improved = True
+    return improved
+
+
+def improve_tour(tour, matrix, deadline):
+    """Alternate 2-opt and or-opt until neither shortens the tour"""
+    while time.monotonic() < deadline:
+        changed = two_opt(tour, matrix, deadline)
+        changed = or_opt(tour, matrix, deadline) or changed
+        if not changed:
+            break
+    return tour
+
+
+def improve_tours(tasks, budget):
+    """
+    Improve ``(tour, matrix)`` pairs within ``budget`` seconds, giving each
+    tour a share of the remaining time proportional to its size squared.
+    Runs in worker processes.
+    """
+    deadline = time.monotonic() + budget
+    weights = [len(tour) ** 2 for tour, _ in tasks]
+    remaining_weight = sum(weights)
+    tours = []
+    for (tour, matrix), weight in zip(tasks, weights):
+        now = time.monotonic()
+        share = (deadline - now) * weight / remaining_weight if remaining_weight else 0
+        tours.append(improve_tour(list(tour), matrix, min(deadline, now + share)))
+        remaining_weight -= weight
+    return tours
+
+
+def _local_task(route, matrix):
+    """A route renumbered 0..n with its own small distance matrix, cheap to pickle"""
+    nodes = [0] + route
+    local_matrix = [[matrix[a][b] for b in nodes] for a in nodes]
+    return nodes, list(range(len(nodes))) + [0], local_matrix
+
+
+def _balanced_groups(tasks, groups):
+    """Deal tasks to ``groups`` buckets of similar total work, largest first"""
+    buckets = [[] for _ in range(groups)]
+    loads = [0] * groups
+    for index in sorted(range(len(tasks)), key=lambda index: -len(tasks[index][0])):
+        target = loads.index(min(loads))
+        buckets[target].append(index)
+        loads[target] += len(tasks[index][0]) ** 2
+    return [bucket for bucket in buckets if bucket]
+
+
+def _improve_routes(routes, matrix, budget, workers):
+    local = [_local_task(route, matrix) for route in routes]
+    tasks = [(tour, local_matrix) for _, tour, local_matrix in local]
+    stop_count = sum(len(route) for route in routes)
+
+    if workers <= 1 or len(routes) == 1 or stop_count < PARALLEL_MIN_STOPS:
+        tours = improve_tours(tasks, budget)
+    else:
+        groups = _balanced_groups(tasks, min(workers, len(tasks)))
+        tours = [None] * len(tasks)
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+            # Leave some of the budget for starting the pool and collecting results
+            remaining = max(0.0, budget - (time.monotonic() - started)) * 0.9
+            futures = [
+                (group, executor.submit(improve_tours, [tasks[index] for index in group], remaining))
+                for group in groups
+            ]
+            for group, future in futures:
+                for index, tour in zip(group, future.result()):
+                    tours[index] = tour
+
+    # Map local node numbers back to the global matrix, dropping the depot
+    return [[nodes[node] for node in tour[1:-1]] for (nodes, _, _), tour in zip(local, tours)]
+
+
+def plan_routes(depot, stops, capacity=None, time_budget=DEFAULT_TIME_BUDGET, workers=None):
+    """
+    Plan pickup routes starting and ending at ``depot`` (``(lat, lon)``).
+
+    ``stops`` are ``Stop`` tuples and ``capacity`` bounds the summed demand
+    of a route (``None`` for unlimited). Stops whose demand alone exceeds the
+    capacity are returned in ``unassigned``. Returns a ``RoutePlan``.
+    """
+    started = time.monotonic()
+    workers = workers or os.cpu_count() or 1
+    stops = list(stops)
+
+    latitudes = [depot[0]] + [stop.latitude for stop in stops]
+    longitudes = [depot[1]] + [stop.longitude for stop in stops]
+    matrix = distance_matrix(latitudes, longitudes, latitudes, longitudes)
+    # Scalar indexing of nested lists is much faster than of an ndarray
+    matrix = matrix.tolist() if hasattr(matrix, 'tolist') else matrix
+
+    demands = [0] + [stop.demand for stop in stops]
+    nodes, unassigned = [], []
+    for node in range(1, len(latitudes)):
+        if capacity is None or demands[node] <= capacity:
+            nodes.append(node)
+        else:
+            unassigned.append(stops[node - 1].id)
+
+    routes = nearest_neighbour_routes(matrix, demands, capacity, nodes)
+    initial_distance = sum(tour_length([0] + route + [0], matrix) for route in routes)
+
+    remaining = time_budget - (time.monotonic() - started)
+    if routes and remaining > 0:
+        routes = _improve_routes(routes, matrix, remaining, workers)
+
+    planned = [
+        Route(
+            stops=[stops[node - 1].id for node in route],
+            load=sum(demands[node] for node in route),
+            distance_km=tour_length([0] + route + [0], matrix),
+        )
+        for route in routes
+    ]
+    return RoutePlan(
+        routes=planned,
+        unassigned=unassigned,
+        initial_distance_km=initial_distance,
+        distance_km=sum(route.distance_km for route in planned),
+        elapsed=time.monotonic() - started,
+    )
+
+
+def center_pickup_stops(center):
+    """
+    Approved requests of ``center`` as stops at their owners' locations.
+    Returns ``(stops, missing)`` where ``missing`` are ids of requests whose
+    owner has no saved location.
+    """
+    from .models import RecyclingRequest
+
+    rows = RecyclingRequest.objects.filter(center=center, status='approved').values_list(
+        'id', 'user__latitude', 'user__longitude', 'estimated_weight',
+    ).order_by('id')
+    stops, missing = [], []
+    for request_id, latitude, longitude, weight in rows:
+        if latitude is None or longitude is None:
+            missing.append(request_id)
+        else:
+            stops.append(Stop(request_id, latitude, longitude, weight))
+    return stops, missing
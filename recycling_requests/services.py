@@ -0,0 +1,192 @@
+"""
+Lifecycle transitions for recycling requests.
+
+Staff review requests in bulk: ``review_requests`` moves up to
+``MAX_BULK_REVIEW`` requests of one center in a single transaction and
+notifies their owners with one broadcast. An approved request books its
+estimated weight on the center's load (``recycling_centers.capacity``) until
+it is completed, rejected or moved. Completing a request records the drop-off
+in the owner's recycling history (``accounts.impact``).
+"""
+import math
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.impact import record_activity
+from notifications.outbox import broadcast, send_notification
+from recycling_centers.assignment import assign_many
+from recycling_centers.cache import bump_load_version
+from recycling_centers.capacity import CapacityExceeded, load_for_weight, release_capacity, reserve_capacity
+
+from .models import RecyclingRequest
+
+MAX_BULK_REVIEW = 500
+# Requests that still wait for a drop-off and can move to another center
+OPEN_STATUSES = ('pending', 'approved')
+
+REVIEW_MESSAGES = {
+    'approved': ('Recycling request approved', 'Your request at {center} was approved. You can drop off your materials.'),
+    'rejected': ('Recycling request rejected', 'Your request at {center} was rejected.'),
+}
+
+
+class InvalidTransition(Exception):
+    """The request cannot move to the requested status from its current one"""
+
+
+def can_manage_center(user, center):
+    """Whether ``user`` may review requests made to ``center``"""
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    profile = getattr(user, 'userprofile', None)
+    if profile is None:
+        return False
+    return profile.user_type == 'admin' or center.staff_members.filter(pk=profile.pk).exists()
+
+
+def _sources(status):
+    return [source for source, targets in RecyclingRequest.TRANSITIONS.items() if status in targets]
+
+
+def _reserve(center_id, weight):
+    # No retries: inside a transaction a failed statement aborts it anyway
+    try:
+        reserve_capacity(center_id, load_for_weight(weight), retries=0)
+    except CapacityExceeded:
+        return False
+    return True
+
+
+def review_requests(reviewer, center, request_ids, status, staff_notes=''):
+    """
+    Approve or reject many requests of ``center`` in one transaction.
+    Requests that are not in a status allowing the move are skipped, and so
+    are approvals once the center has no capacity left for their weight,
+    oldest requests first. Returns the number of requests reviewed.
+    """
+    if status not in REVIEW_MESSAGES:
+        raise ValueError(f'Cannot review requests as {status!r}')
+    request_ids = {int(request_id) for request_id in request_ids}
+    if len(request_ids) > MAX_BULK_REVIEW:
+        raise ValueError(f'At most {MAX_BULK_REVIEW} requests can be reviewed at once')
+
+    now = timezone.now()
+    with transaction.atomic():
+        reviewable = RecyclingRequest.objects.filter(
+            center=center, id__in=request_ids, status__in=_sources(status),
+        ).order_by('created_at', 'id')
+        rows = list(reviewable.select_for_update().values_list('id', 'user_id', 'status', 'estimated_weight'))
+        if status == 'approved':
+            rows = [row for row in rows if _reserve(center.pk, row[3])]
+        else:
+            released = sum(load_for_weight(weight) for _, _, previous, weight in rows if previous == 'approved')
+            if released:
+                release_capacity(center.pk, released, retries=0)
+        if not rows:
+            return 0
+        RecyclingRequest.objects.filter(
+            id__in=[row[0] for row in rows], status__in=_sources(status),
+        ).update(status=status, reviewed_by=reviewer, reviewed_at=now, staff_notes=staff_notes, updated_at=now)
+        # Assignment counts pending requests as load
+        transaction.on_commit(bump_load_version)
+
+        title, message = REVIEW_MESSAGES[status]
+        broadcast(
+            User.objects.filter(userprofile__in={row[1] for row in rows}),
+            title, message.format(center=center.name), notification_type='request', link=reverse('request_list'),
+        )
+    return len(rows)
+
+
+def complete_request(reviewer, recycling_request, actual_weight):
+    """
+    Mark an approved request as dropped off, free the capacity it booked and
+    credit its owner's impact
+    """
+    if actual_weight is None or not math.isfinite(actual_weight) or actual_weight < 0:
+        raise ValueError('actual_weight must be a finite, non-negative number')
+    now = timezone.now()
+    with transaction.atomic():
+        updated = RecyclingRequest.objects.filter(
+            pk=recycling_request.pk, status__in=_sources('completed'),
+        ).update(
+            status='completed', actual_weight=actual_weight, completed_at=now,
+            reviewed_by=reviewer, reviewed_at=now, updated_at=now,
+        )
+        if not updated:
+            raise InvalidTransition(f'Request {recycling_request.pk} is not approved')
+        release_capacity(recycling_request.center_id, load_for_weight(recycling_request.estimated_weight), retries=0)
+        record_activity(
+            recycling_request.user_id, recycling_request.material_type, actual_weight,
+            items=recycling_request.quantity, recycling_center=recycling_request.center,
+        )
+        send_notification(
+            recycling_request.user.user, 'Recycling request completed',
+            f'Thanks for recycling {actual_weight:g} kg at {recycling_request.center.name}!',
+            notification_type='achievement', link=reverse('request_list'),
+        )
+    recycling_request.refresh_from_db()
+    return recycling_request
+
+
+def reassign_requests(requests):
+    """
+    Move the open requests of ``requests`` (a queryset) to the best other
+    active center, e.g. after their center was deactivated. Requests are assigned
+    in one load-balanced pass from their owner's location, or from their old
+    center's when the owner saved none, and go back to pending for the new
+    center's staff; approved ones give the capacity they booked back to their
+    old center. Returns ``(moved, unassigned)`` counts.
+    """
+    rows = list(requests.filter(status__in=OPEN_STATUSES).values_list(
+        'id', 'user_id', 'center_id', 'material_type',
+        'user__latitude', 'user__longitude', 'center__latitude', 'center__longitude',
+        'status', 'estimated_weight',
+    ))
+    if not rows:
+        return 0, 0
+    origins = [row[4:6] if None not in row[4:6] else row[6:8] for row in rows]
+    targets = assign_many(
+        [origin[0] for origin in origins],
+        [origin[1] for origin in origins],
+        [row[3] for row in rows],
+        [load_for_weight(row[9]) for row in rows],
+        exclude={row[2] for row in rows},
+    )
+
+    moved = defaultdict(list)
+    released = defaultdict(int)
+    for row, center_id in zip(rows, targets):
+        if center_id is not None:
+            moved[center_id].append(row[0])
+            if row[8] == 'approved':
+                released[row[2]] += load_for_weight(row[9])
+    moved_ids = {request_id for request_ids in moved.values() for request_id in request_ids}
+
+    now = timezone.now()
+    with transaction.atomic():
+        # One UPDATE per target center: far cheaper than a bulk_update CASE
+        # with a branch per request, as requests spread over few centers
+        for center_id, request_ids in moved.items():
+            RecyclingRequest.objects.filter(id__in=request_ids).update(
+                center_id=center_id, status='pending', reviewed_by=None, reviewed_at=None, updated_at=now,
+            )
+        for center_id, amount in released.items():
+            release_capacity(center_id, amount, retries=0)
+        if moved_ids:
+            transaction.on_commit(bump_load_version)
+        if moved_ids:
+            broadcast(
+                User.objects.filter(userprofile__in={row[1] for row in rows if row[0] in moved_ids}),
+                'Recycling request moved',
+                'Your center is no longer available, so your request was moved to the best nearby center '
+                'and is waiting for its staff to review it.',
+                notification_type='request', link=reverse('request_list'),
+            )
+    return len(moved_ids), len(rows) - len(moved_ids)
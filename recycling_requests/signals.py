@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recycling_centers.cache import bump_load_version
+from recycling_centers.models import RecyclingCenter
+
+from .models import RecyclingRequest
+from .services import reassign_requests
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def reassign_deactivated_center(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Queryset updates skip this handler; run manage.py reassign_requests after them
+    was_active = getattr(instance, '_loaded_is_active', None)
+    instance._loaded_is_active = instance.is_active
+    if raw or created or instance.is_active or was_active is False:
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    reassign_requests(RecyclingRequest.objects.filter(center=instance))
+
+
+@receiver(post_save, sender=RecyclingRequest)
+@receiver(post_delete, sender=RecyclingRequest)
+def requests_changed(sender, **kwargs):
+    # Pending requests count towards the load that assignment sees; the
+    # services bump the version themselves after their queryset updates
+    transaction.on_commit(bump_load_version)
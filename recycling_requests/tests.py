@@ -0,0 +1,104 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from accounts.models import UserProfile
+from recycling_centers.models import AcceptedMaterial, RecyclingCenter
+
+from .forms import RecyclingRequestForm
+from .models import RecyclingRequest
+from .services import complete_request, review_requests
+
+
+class CapacityBookingTests(TestCase):
+    """Approved requests hold their weight on the center's load until dropped off"""
+
+    def setUp(self):
+        self.center = RecyclingCenter.objects.create(
+            name='Depot', address='1 Main Street', latitude=1, longitude=2,
+            phone_number='555-0100', email='depot@example.com', opening_hours='Mon-Fri 9-5', capacity=20,
+        )
+        AcceptedMaterial.objects.create(recycling_center=self.center, material_type='glass')
+        self.staff = UserProfile.objects.create(user=User.objects.create_user('staff'), user_type='staff')
+        self.owner = UserProfile.objects.create(user=User.objects.create_user('owner'))
+
+    def request(self, weight):
+        return RecyclingRequest.objects.create(
+            user=self.owner, center=self.center, material_type='glass', estimated_weight=weight,
+        )
+
+    def current_load(self):
+        self.center.refresh_from_db()
+        return self.center.current_load
+
+    def test_approval_books_and_completion_frees_the_weight(self):
+        recycling_request = self.request(12.5)
+        self.assertEqual(review_requests(self.staff, self.center, [recycling_request.pk], 'approved'), 1)
+        self.assertEqual(self.current_load(), 13)
+
+        complete_request(self.staff, recycling_request, 11.0)
+        self.assertEqual(recycling_request.status, 'completed')
+        self.assertEqual(self.current_load(), 0)
+
+    def test_approvals_stop_at_capacity(self):
+        first, second = self.request(15), self.request(10)
+        self.assertEqual(review_requests(self.staff, self.center, [first.pk, second.pk], 'approved'), 1)
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'pending')
+        self.assertEqual(self.current_load(), 15)
+
+        review_requests(self.staff, self.center, [first.pk], 'rejected')
+        self.assertEqual(self.current_load(), 0)
+
+
+class AssignmentSpillOverTests(TestCase):
+    """Requests assigned one after another move on once the best center is booked up"""
+
+    def setUp(self):
+        self.near, self.far = [
+            RecyclingCenter.objects.create(
+                name=name, address='1 Main Street', latitude=latitude, longitude=0,
+                phone_number='555-0100', email='depot@example.com', opening_hours='Mon-Fri 9-5', capacity=capacity,
+            )
+            for name, latitude, capacity in (('Near', 0.01, 20), ('Far', 0.1, 100))
+        ]
+        for center in (self.near, self.far):
+            AcceptedMaterial.objects.create(recycling_center=center, material_type='glass')
+        self.owner = UserProfile.objects.create(user=User.objects.create_user('owner'), latitude=0, longitude=0)
+
+    def submit(self, weight):
+        form = RecyclingRequestForm(
+            {'material_type': 'glass', 'quantity': 1, 'estimated_weight': weight}, profile=self.owner,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        recycling_request = form.save(commit=False)
+        recycling_request.user = self.owner
+        with self.captureOnCommitCallbacks(execute=True):
+            recycling_request.save()
+        return recycling_request.center
+
+    def test_requests_past_free_capacity_go_to_the_next_center(self):
+        self.assertEqual([self.submit(8) for _ in range(2)], [self.near, self.near])
+        # 4 units are left at the near center
+        self.assertEqual(self.submit(5), self.far)
+        self.assertEqual(self.submit(4), self.near)
+        self.assertEqual(self.submit(1), self.far)
+
+    def test_only_deactivation_reassigns_requests(self):
+        recycling_request = RecyclingRequest.objects.create(
+            user=self.owner, center=self.near, material_type='glass', estimated_weight=5,
+        )
+        near = RecyclingCenter.objects.get(pk=self.near.pk)
+        near.is_active = False
+        near.save()
+        recycling_request.refresh_from_db()
+        self.assertEqual(recycling_request.center, self.far)
+
+        # Saving a center that already was inactive leaves its requests alone
+        stranded = RecyclingRequest.objects.create(
+            user=self.owner, center=self.near, material_type='glass', estimated_weight=5,
+        )
+        for center in (near, RecyclingCenter.objects.get(pk=self.near.pk)):
+            center.name = 'Near (closed)'
+            center.save()
+        stranded.refresh_from_db()
+        self.assertEqual(stranded.center, self.near)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.request_list, name='request_list'),
+    path('create/', views.create_request, name='create_request'),
+    path('<int:request_id>/complete/', views.complete_recycling_request, name='complete_request'),
+    path('centers/<int:center_id>/', views.center_request_queue, name='center_request_queue'),
+    path('centers/<int:center_id>/review/', views.bulk_review_requests, name='bulk_review_requests'),
+    path('centers/<int:center_id>/routes/', views.center_pickup_routes, name='center_pickup_routes'),
+]
@@ -0,0 +1,206 @@
+import math
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlencode, urlsafe_base64_decode, urlsafe_base64_encode
+from django.views.decorators.http import require_POST
+from accounts.middleware import get_profile
+from accounts.models import UserProfile
+from recycling_centers.models import RecyclingCenter
+from .forms import RecyclingRequestForm
+from .models import RecyclingRequest
+from .routing import DEFAULT_TIME_BUDGET, center_pickup_stops, plan_routes
+from .services import MAX_BULK_REVIEW, InvalidTransition, can_manage_center, complete_request, review_requests
+
+REQUESTS_PER_PAGE = 20
+QUEUE_PAGE_SIZE = 50
+# Longest planning time staff may ask the route planner for, in seconds
+MAX_ROUTE_TIME_BUDGET = 10.0
+
+
+def _profile(request):
+    profile = get_profile(request)
+    if profile is None:
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    return profile
+
+@login_required
+def create_request(request):
+    if request.method == "POST":
+        form = RecyclingRequestForm(request.POST, profile=_profile(request))
+        if form.is_valid():
+            recycling_request = form.save(commit=False)
+            recycling_request.user = form.profile
+            recycling_request.save()
+            messages.success(request, f"Your request at {recycling_request.center.name} was submitted.")
+            return redirect("request_list")
+    else:
+        form = RecyclingRequestForm(initial={"center": request.GET.get("center")})
+    return render(request, "recycling_requests/create.html", {"form": form})
+
+@login_required
+def request_list(request):
+    """The current user's requests, newest first"""
+    requests = RecyclingRequest.objects.filter(user__user=request.user).select_related('center')
+    status = request.GET.get('status')
+    if status:
+        requests = requests.filter(status=status)
+    page = Paginator(requests, REQUESTS_PER_PAGE).get_page(request.GET.get('page'))
+    
+    context = {
+        'page_obj': page,
+        'requests': page.object_list,
+        'status_choices': RecyclingRequest.STATUS_CHOICES,
+        'selected_status': status,
+    }
+    
+    return render(request, 'recycling_requests/list.html', context)
+
+def _encode_queue_cursor(recycling_request_id, created_at):
+    return urlsafe_base64_encode(f'{created_at.isoformat()}|{recycling_request_id}'.encode())
+
+def _decode_queue_cursor(cursor):
+    try:
+        created_at, recycling_request_id = urlsafe_base64_decode(cursor).decode().split('|')
+        return parse_datetime(created_at), int(recycling_request_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+def _managed_center(request, center_id):
+    center = get_object_or_404(RecyclingCenter, id=center_id)
+    if not can_manage_center(request.user, center):
+        raise PermissionDenied
+    return center
+
+@login_required
+def center_request_queue(request, center_id):
+    """
+    Staff queue of one center's requests in a status, oldest first. Pages
+    are keyset-paginated on (created_at, id): the page of ids is read from
+    the (center, status, created_at) index alone, then only those rows are
+    loaded.
+    """
+    center = _managed_center(request, center_id)
+    status = request.GET.get('status', 'pending')
+    if status not in RecyclingRequest.TRANSITIONS:
+        raise Http404("Unknown status")
+    
+    queue = RecyclingRequest.objects.filter(center=center, status=status).order_by('created_at', 'id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = _decode_queue_cursor(cursor)
+        if position is None or position[0] is None:
+            raise Http404("Invalid cursor")
+        created_at, last_id = position
+        queue = queue.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=last_id))
+    
+    # Fetch one extra key to know whether another page exists
+    keys = list(queue.values_list('id', 'created_at')[:QUEUE_PAGE_SIZE + 1])
+    has_next = len(keys) > QUEUE_PAGE_SIZE
+    keys = keys[:QUEUE_PAGE_SIZE]
+    rows = RecyclingRequest.objects.select_related('user__user').in_bulk([key[0] for key in keys])
+    
+    context = {
+        'center': center,
+        'requests': [rows[key[0]] for key in keys],
+        'status': status,
+        'status_choices': RecyclingRequest.STATUS_CHOICES,
+        'next_cursor': _encode_queue_cursor(*keys[-1]) if has_next else None,
+        'max_bulk_review': MAX_BULK_REVIEW,
+    }
+    
+    return render(request, 'recycling_requests/queue.html', context)
+
+@login_required
+@require_POST
+def bulk_review_requests(request, center_id):
+    """Approve or reject every selected request of a center in one transaction"""
+    center = _managed_center(request, center_id)
+    action = request.POST.get('action')
+    status = {'approve': 'approved', 'reject': 'rejected'}.get(action)
+    request_ids = request.POST.getlist('request_ids')
+    
+    if status is None:
+        messages.error(request, "Unknown action.")
+    elif not request_ids:
+        messages.warning(request, "No requests were selected.")
+    else:
+        try:
+            reviewed = review_requests(
+                _profile(request), center, request_ids, status, request.POST.get('staff_notes', ''),
+            )
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"{reviewed} request(s) {status}.")
+    
+    query = urlencode({'status': request.POST.get('status', 'pending')})
+    return redirect(f"{reverse('center_request_queue', args=[center.id])}?{query}")
+
+@login_required
+@require_POST
+def complete_recycling_request(request, request_id):
+    recycling_request = get_object_or_404(RecyclingRequest.objects.select_related('center', 'user__user'), id=request_id)
+    if not can_manage_center(request.user, recycling_request.center):
+        raise PermissionDenied
+    
+    try:
+        actual_weight = float(request.POST.get('actual_weight', ''))
+        if not math.isfinite(actual_weight):
+            raise ValueError('actual_weight must be finite')
+        complete_request(_profile(request), recycling_request, actual_weight)
+    except ValueError:
+        messages.error(request, "Enter the weight recorded at drop-off.")
+    except InvalidTransition:
+        messages.error(request, "Only approved requests can be completed.")
+    else:
+        messages.success(request, f"Request #{recycling_request.id} completed.")
+    
+    return redirect(f"{reverse('center_request_queue', args=[recycling_request.center_id])}?status=approved")
+
+def _parse_positive(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+@login_required
+def center_pickup_routes(request, center_id):
+    """
+    Pickup routes collecting the center's approved requests. ``capacity`` is
+    the vehicle capacity in kg (unlimited if omitted) and ``budget`` the
+    planning time in seconds.
+    """
+    center = _managed_center(request, center_id)
+    capacity = _parse_positive(request.GET.get('capacity'), None)
+    budget = min(_parse_positive(request.GET.get('budget'), DEFAULT_TIME_BUDGET), MAX_ROUTE_TIME_BUDGET)
+    
+    stops, missing_location = center_pickup_stops(center)
+    plan = plan_routes((center.latitude, center.longitude), stops, capacity=capacity, time_budget=budget)
+    locations = {stop.id: (stop.latitude, stop.longitude) for stop in stops}
+    
+    return JsonResponse({
+        'center': {'id': center.id, 'name': center.name, 'latitude': center.latitude, 'longitude': center.longitude},
+        'routes': [
+            {
+                'requests': [
+                    {'id': request_id, 'latitude': locations[request_id][0], 'longitude': locations[request_id][1]}
+                    for request_id in route.stops
+                ],
+                'load': route.load,
+                'distance_km': round(route.distance_km, 2),
+            }
+            for route in plan.routes
+        ],
+        'total_distance_km': round(plan.distance_km, 2),
+        'over_capacity': plan.unassigned,
+        'missing_location': missing_location,
+    })
@@ -2,6 +2,19 @@
 ASGI config for recycling_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn recycling_tracker.asgi:application``)
+to enable the notification badge stream at /notifications/stream/; under WSGI
+the badge falls back to polling.
+
+Importing this module selects the 'asgi' SERVER_PROFILE (see settings.py):
+the centers map, detail and markers API switch to native async views and
+database connections are closed after each request. A production deployment
+pairs it with the pooled PostgreSQL profile and one worker per core, e.g.
+
+    DATABASE_PROFILE=postgres gunicorn recycling_tracker.asgi:application \
+        -k uvicorn.workers.UvicornWorker --workers 4
+
+Compare it with the WSGI app using ``manage.py benchmark_asgi``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +25,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recycling_tracker.settings')
+os.environ.setdefault('SERVER_PROFILE', 'asgi')
 
 application = get_asgi_application()
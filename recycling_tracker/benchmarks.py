@@ -0,0 +1,185 @@
+"""
+Latency benchmarks for the main views, used by ``manage.py run_benchmarks``.
+
+Scenarios are driven in-process through the Django test client (the WSGI
+stack) and ``AsyncClient`` (the ASGI handler), against data generated by
+``manage.py seed_benchmark``. Each scenario reports p50/p95/p99 latency,
+SQL queries per request, the peak memory allocated while serving one request
+(measured on a separate pass, as tracemalloc slows requests down) and how
+many responses were errors. ``compare`` checks results against a saved
+baseline so that slowdowns and new queries fail the run.
+"""
+import asyncio
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from .middleware import QueryTracker
+
+Scenario = namedtuple('Scenario', 'name method path data fresh_client')
+Scenario.__new__.__defaults__ = ({}, False)
+
+QUANTILES = {'p50_ms': 0.50, 'p95_ms': 0.95, 'p99_ms': 0.99}
+# Latency percentiles gated by ``compare``; p99 over a few dozen runs is noise
+GATED_LATENCIES = ('p50_ms', 'p95_ms')
+
+
+def default_scenarios(center_id, latitude, longitude, username, password):
+    """The list, map, detail, API and login views around one seeded center"""
+    bbox = f'{longitude - 0.5},{latitude - 0.5},{longitude + 0.5},{latitude + 0.5}'
+    nearby = {'lat': latitude, 'lon': longitude}
+    return [
+        Scenario('list', 'get', reverse('recycling_centers_list')),
+        Scenario('list_search', 'get', reverse('recycling_centers_list'), {'search': 'green'}),
+        Scenario('list_nearby', 'get', reverse('recycling_centers_list'), {**nearby, 'radius': 10}),
+        Scenario('map', 'get', reverse('recycling_centers_map')),
+        Scenario('detail', 'get', reverse('recycling_center_detail', args=[center_id])),
+        Scenario('api', 'get', reverse('centers_api')),
+        Scenario('api_nearby', 'get', reverse('centers_api'), {**nearby, 'limit': 20}),
+        Scenario('api_v2', 'get', reverse('centers_api_v2'), {'page_size': 100}),
+        Scenario('viewport', 'get', reverse('centers_viewport_api'), {'bbox': bbox, 'zoom': 9}),
+        # A new client per request, since the view redirects signed-in users
+        Scenario('login', 'post', reverse('login'), {'username': username, 'password': password}, True),
+    ]
+
+
+def _percentiles(latencies):
+    ordered = sorted(latencies)
+    return {
+        name: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+        for name, q in QUANTILES.items()
+    }
+
+
+def _is_error(response):
+    return response.status_code >= 400
+
+
+def _consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+async def _aconsume(response):
+    if response.streaming:
+        async for _ in response.streaming_content:
+            pass
+
+
+class WSGIRunner:
+    name = 'wsgi'
+
+    def __init__(self, host='localhost'):
+        self.host = host
+        self.client = self._client()
+
+    def _client(self):
+        return Client(raise_request_exception=False, HTTP_HOST=self.host)
+
+    def request(self, scenario):
+        client = self._client() if scenario.fresh_client else self.client
+        response = getattr(client, scenario.method)(scenario.path, scenario.data)
+        _consume(response)
+        return response
+
+    def run(self, scenario, iterations, warmup):
+        latencies, queries, errors = [], [], 0
+        for iteration in range(warmup + iterations):
+            tracker = QueryTracker()
+            started = time.perf_counter()
+            with tracker.track():
+                response = self.request(scenario)
+            elapsed = time.perf_counter() - started
+            if iteration >= warmup:
+                latencies.append(elapsed)
+                queries.append(tracker.count)
+                errors += _is_error(response)
+
+        tracemalloc.start()
+        try:
+            self.request(scenario)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            **_percentiles(latencies),
+            'queries': round(sum(queries) / len(queries), 2),
+            'peak_kb': round(peak / 1024, 1),
+            'errors': errors,
+        }
+
+
+class ASGIRunner:
+    """
+    Serves requests through Django's ASGI handler in-process. Queries run in
+    sync_to_async threads where they cannot be counted, so ``queries`` is
+    left out of the ASGI results.
+    """
+    name = 'asgi'
+
+    def __init__(self, host='localhost'):
+        self.host = host
+
+    def _client(self):
+        return AsyncClient(raise_request_exception=False, headers={'host': self.host})
+
+    async def _request(self, client, scenario):
+        client = self._client() if scenario.fresh_client else client
+        response = await getattr(client, scenario.method)(scenario.path, scenario.data)
+        await _aconsume(response)
+        return response
+
+    async def _run(self, scenario, iterations, warmup):
+        client = self._client()
+        latencies, errors = [], 0
+        for iteration in range(warmup + iterations):
+            started = time.perf_counter()
+            response = await self._request(client, scenario)
+            elapsed = time.perf_counter() - started
+            if iteration >= warmup:
+                latencies.append(elapsed)
+                errors += _is_error(response)
+
+        tracemalloc.start()
+        try:
+            await self._request(client, scenario)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {**_percentiles(latencies), 'peak_kb': round(peak / 1024, 1), 'errors': errors}
+
+    def run(self, scenario, iterations, warmup):
+        return asyncio.run(self._run(scenario, iterations, warmup))
+
+
+RUNNERS = {runner.name: runner for runner in (WSGIRunner, ASGIRunner)}
+
+
+def compare(results, baseline, tolerance=0.25, slack_ms=2.0, slack_kb=64):
+    """
+    Regressions of ``results`` against ``baseline`` (both ``{key: metrics}``)
+    as readable strings. Latency and memory may grow by ``tolerance`` plus a
+    small absolute slack; query and error counts may not grow at all.
+    """
+    regressions = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in GATED_LATENCIES:
+            limit = previous[metric] * (1 + tolerance) + slack_ms
+            if current[metric] > limit:
+                regressions.append(f'{key} {metric}: {current[metric]:.2f} > {limit:.2f} (baseline {previous[metric]:.2f})')
+        if 'queries' in current and 'queries' in previous and current['queries'] > previous['queries']:
+            regressions.append(f"{key} queries: {current['queries']} > {previous['queries']}")
+        limit = previous['peak_kb'] * (1 + tolerance) + slack_kb
+        if current['peak_kb'] > limit:
+            regressions.append(f"{key} peak_kb: {current['peak_kb']} > {limit:.1f} (baseline {previous['peak_kb']})")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{key} errors: {current['errors']} > {previous['errors']}")
+    return regressions
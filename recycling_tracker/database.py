@@ -0,0 +1,83 @@
+"""
+Database profiles for ``settings.DATABASES``.
+
+The ``sqlite`` profile keeps connections open between requests and tunes
+every new SQLite connection through the ``connection_created`` signal: WAL
+lets readers carry on while a writer commits, ``synchronous=NORMAL`` only
+syncs at checkpoints, a larger page cache and memory-mapped I/O cut reads,
+and ``busy_timeout`` makes a blocked writer wait instead of failing at once.
+Transactions begin ``IMMEDIATE`` so a transaction that reads and then writes
+takes the write lock up front rather than failing to upgrade its read lock.
+
+The ``postgres`` profile uses psycopg's connection pool (``pip install
+"psycopg[binary,pool]"``), configured from ``POSTGRES_*`` environment
+variables. ``manage.py benchmark_database`` compares the profiles.
+
+Django runs ASGI requests on a new thread each time, so persistent
+connections are not reused there; pooling on PostgreSQL is.
+"""
+import os
+
+from django.db.backends.signals import connection_created
+
+PROFILES = ('sqlite', 'postgres')
+
+# Applied in order to each new connection; journal_mode persists in the file
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -64000,  # negative values are KiB, so 64 MB
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def database_settings(profile, base_dir, conn_max_age=600, pool_size=(2, 10), environ=os.environ):
+    """The ``default`` entry of ``settings.DATABASES`` for ``profile``"""
+    if profile == 'sqlite':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': base_dir / 'db.sqlite3',
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    if profile == 'postgres':
+        min_size, max_size = pool_size
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': environ.get('POSTGRES_DB', 'recycling_tracker'),
+            'USER': environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': environ.get('POSTGRES_PORT', '5432'),
+            # Pooled connections are returned after each request, which
+            # requires CONN_MAX_AGE to stay at 0
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {'min_size': min_size, 'max_size': max_size, 'timeout': 10},
+            },
+        }
+    raise ValueError(f'Unknown database profile {profile!r}, use one of {", ".join(PROFILES)}')
+
+
+def sqlite_pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply ``settings.SQLITE_PRAGMAS`` to a newly opened SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    from django.conf import settings
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+    with connection.cursor() as cursor:
+        for statement in sqlite_pragma_statements(pragmas):
+            cursor.execute(statement)
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='recycling_tracker.configure_sqlite')
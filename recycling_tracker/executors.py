@@ -0,0 +1,45 @@
+"""
+Bounded thread pool for CPU-heavy work of async views.
+
+A coroutine that computes for long blocks the event loop and every other
+request it serves. ``run_cpu_bound`` moves such work (distance lookups and
+sorting, for instance) to a pool of ``ASYNC_CPU_WORKERS`` threads, so at most
+that many run at once while the loop keeps serving I/O. NumPy releases the GIL
+in its array maths, so the threads also run in parallel there.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_CPU_WORKERS', 4),
+                thread_name_prefix='cpu-bound',
+            )
+        return _executor
+
+
+def _call(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Work that touched the database (e.g. rebuilding the spatial index)
+        # must not leave the pool thread's connection open
+        close_old_connections()
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Await ``func(*args, **kwargs)`` run in the bounded pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(_call, func, args, kwargs))
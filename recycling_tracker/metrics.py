@@ -0,0 +1,168 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+``RequestMetricsMiddleware`` (``middleware.py``) reports every request here
+with its view name, latency, SQL query count and time, and response size.
+Per view this keeps cumulative histograms plus a rolling window of recent
+latencies for percentiles. Metrics live in process memory, so with several
+worker processes each one is scraped (or averaged) separately.
+"""
+import bisect
+import secrets
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Recent requests per view used for the rolling percentiles
+WINDOW_SIZE = 1024
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """``(upper bound, cumulative count)`` pairs ending with ``+Inf``"""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.responses = defaultdict(int)  # (method, status) -> count
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.db_time = 0.0
+        self.recent = deque(maxlen=WINDOW_SIZE)
+
+    def percentiles(self):
+        latencies = sorted(self.recent)
+        if not latencies:
+            return []
+        return [(q, latencies[min(len(latencies) - 1, int(q * len(latencies)))]) for q in QUANTILES]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(ViewMetrics)
+
+    def observe(self, view, method, status, duration, queries, db_time, size=None):
+        with self._lock:
+            metrics = self._views[view]
+            metrics.responses[(method, status)] += 1
+            metrics.latency.observe(duration)
+            metrics.recent.append(duration)
+            metrics.queries.observe(queries)
+            metrics.db_time += db_time
+            if size is not None:
+                metrics.size.observe(size)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        """Percentiles and totals per view, for dashboards and benchmarks"""
+        with self._lock:
+            return {
+                view: {
+                    'requests': metrics.latency.count,
+                    'percentiles': dict(metrics.percentiles()),
+                    'mean_queries': metrics.queries.sum / metrics.queries.count if metrics.queries.count else 0,
+                    'db_seconds': metrics.db_time,
+                }
+                for view, metrics in self._views.items()
+            }
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            views = sorted(self._views.items())
+
+            lines += ['# HELP http_requests_total Responses by view, method and status.',
+                      '# TYPE http_requests_total counter']
+            for view, metrics in views:
+                for (method, status), count in sorted(metrics.responses.items()):
+                    lines.append(f'http_requests_total{_labels(view=view, method=method, status=status)} {count}')
+
+            _histogram(lines, 'http_request_duration_seconds', 'Request latency.',
+                       [(view, metrics.latency) for view, metrics in views])
+
+            lines += ['# HELP http_request_duration_recent_seconds '
+                      f'Latency percentiles over the last {WINDOW_SIZE} requests.',
+                      '# TYPE http_request_duration_recent_seconds summary']
+            for view, metrics in views:
+                for quantile, value in metrics.percentiles():
+                    lines.append(f'http_request_duration_recent_seconds{_labels(view=view, quantile=quantile)} {value:.6f}')
+                lines.append(f'http_request_duration_recent_seconds_sum{_labels(view=view)} {sum(metrics.recent):.6f}')
+                lines.append(f'http_request_duration_recent_seconds_count{_labels(view=view)} {len(metrics.recent)}')
+
+            _histogram(lines, 'http_request_db_queries', 'SQL queries per request.',
+                       [(view, metrics.queries) for view, metrics in views])
+
+            lines += ['# HELP http_request_db_seconds_total Time spent in SQL queries.',
+                      '# TYPE http_request_db_seconds_total counter']
+            for view, metrics in views:
+                lines.append(f'http_request_db_seconds_total{_labels(view=view)} {metrics.db_time:.6f}')
+
+            _histogram(lines, 'http_response_size_bytes', 'Response body size (streaming responses excluded).',
+                       [(view, metrics.size) for view, metrics in views if metrics.size.count])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else f'{bound:g}'
+
+
+def _histogram(lines, name, help_text, series):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for view, histogram in series:
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{_labels(view=view, le=_format_bound(bound))} {count}')
+        lines.append(f'{name}_sum{_labels(view=view)} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{_labels(view=view)} {histogram.count}')
+
+
+registry = MetricsRegistry()
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Open to staff sessions, and to scrapers
+    sending ``Authorization: Bearer <METRICS_BEARER_TOKEN>`` when that
+    setting is configured.
+    """
+    token = getattr(settings, 'METRICS_BEARER_TOKEN', None)
+    authorized = request.user.is_authenticated and request.user.is_staff
+    if not authorized and token:
+        authorized = secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized:
+        return HttpResponseForbidden('Staff only')
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,263 @@
+"""
+Request instrumentation.
+
+``RequestMetricsMiddleware`` times every request, counts its SQL queries and
+their time through ``connection.execute_wrapper`` and reports them to
+``metrics.registry``. Put it first in ``MIDDLEWARE`` so the other
+middleware is measured too.
+
+With ``METRICS_PROFILE_SAMPLE_RATE`` above zero a random sample of requests
+runs under cProfile, one at a time, and the profiles of the ``METRICS_PROFILE_KEEP``
+slowest sampled requests are kept as ``.prof`` files in
+``METRICS_PROFILE_DIR`` (open them with ``python -m pstats`` or snakeviz).
+
+``StaticFilesMiddleware`` serves ``collectstatic`` output from the process
+itself when ``SERVE_STATIC_FILES`` is on, for deployments without a CDN or
+web server in front.
+"""
+import cProfile
+import heapq
+import mimetypes
+import os
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .metrics import registry
+from .staticfiles import ENCODINGS
+
+
+class QueryTracker:
+    """``execute_wrapper`` hook counting queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+    def track(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+class SlowestProfiles:
+    """Keeps the profile files of the slowest sampled requests on disk"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []  # (duration, path), fastest first
+
+    def offer(self, profiler, duration, view):
+        directory = Path(getattr(settings, 'METRICS_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+        keep = getattr(settings, 'METRICS_PROFILE_KEEP', 20)
+        with self._lock:
+            if len(self._heap) >= keep and duration <= self._heap[0][0]:
+                return None
+            directory.mkdir(parents=True, exist_ok=True)
+            name = re.sub(r'[^\w.-]+', '_', view)
+            path = directory / f'{duration * 1000:09.1f}ms-{name}-{time.time_ns()}.prof'
+            profiler.dump_stats(path)
+            heapq.heappush(self._heap, (duration, str(path)))
+            if len(self._heap) > keep:
+                _, evicted = heapq.heappop(self._heap)
+                Path(evicted).unlink(missing_ok=True)
+            return path
+
+
+slowest_profiles = SlowestProfiles()
+
+# Only one profiler can be active per process (Python 3.12+ raises otherwise),
+# so a sampled request is not profiled while another one is
+_profiler_lock = threading.Lock()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        rate = getattr(settings, 'METRICS_PROFILE_SAMPLE_RATE', 0)
+        sampled = rate and random.random() < rate and _profiler_lock.acquire(blocking=False)
+        profiler = cProfile.Profile() if sampled else None
+
+        tracker = QueryTracker()
+        started = time.perf_counter()
+        with tracker.track():
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                try:
+                    profiler.enable()
+                    try:
+                        response = self.get_response(request)
+                    finally:
+                        profiler.disable()
+                finally:
+                    _profiler_lock.release()
+        duration = time.perf_counter() - started
+
+        view = _view_name(request)
+        self._record(request, response, view, duration, tracker)
+        if profiler is not None:
+            slowest_profiles.offer(profiler, duration, view)
+        return response
+
+    async def __acall__(self, request):
+        # Queries of async views run in sync_to_async threads, outside this
+        # connection wrapper, so only the latency is recorded
+        tracker = QueryTracker()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, _view_name(request), time.perf_counter() - started, tracker)
+        return response
+
+    @staticmethod
+    def _record(request, response, view, duration, tracker):
+        registry.observe(
+            view, request.method, response.status_code, duration,
+            tracker.count, tracker.duration, _response_size(response),
+        )
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, db;dur={tracker.duration * 1000:.1f};desc="{tracker.count} queries"'
+            )
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Serve files from ``STATIC_ROOT`` under ``STATIC_URL``, picking the
+    precompressed ``.br`` or ``.gz`` sibling the client accepts. Names listed
+    in the staticfiles manifest contain their content hash and are cached for
+    a year as immutable; anything else gets ``STATIC_FILES_MAX_AGE``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_STATIC_FILES', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self.max_age = getattr(settings, 'STATIC_FILES_MAX_AGE', 60)
+        self.immutable = frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        # Collected files only change on deploy, so their stat results are
+        # kept for the life of the process
+        self._files = {}
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def _find(self, name):
+        if name in self._files:
+            return self._files[name]
+        try:
+            path = safe_join(self.root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        variants = {}
+        for encoding, suffix in ENCODINGS.items():
+            if os.path.isfile(path + suffix):
+                variants[encoding] = path + suffix
+        self._files[name] = found = (path, stat.st_mtime, variants)
+        return found
+
+    def serve(self, request):
+        # STATIC_URL includes the script prefix, which path_info lacks
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        found = self._find(name)
+        if found is None:
+            return None
+        path, mtime, variants = found
+
+        cache_control = IMMUTABLE_CACHE_CONTROL if name in self.immutable else f'public, max-age={self.max_age}'
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), int(mtime)):
+            response = HttpResponseNotModified()
+        else:
+            accepted = _accepted_encodings(request)
+            encoding = next((encoding for encoding in ENCODINGS if encoding in variants and encoding in accepted), None)
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(
+                open(variants[encoding] if encoding else path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+                # Named after the requested file, not its .br/.gz sibling
+                filename=os.path.basename(path),
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+            response['Last-Modified'] = http_date(mtime)
+        if variants:
+            response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = cache_control
+        return response
@@ -0,0 +1,52 @@
+"""
+Paginator for admin changelists over tables too large to ``COUNT(*)``.
+
+Counting every row of a big table is a full scan on both SQLite and
+PostgreSQL. ``EstimatedCountPaginator`` instead answers unfiltered counts
+from the planner statistics (``pg_class.reltuples``, or ``sqlite_stat1`` as
+written by ``ANALYZE``) once a table holds more than ``ESTIMATE_THRESHOLD``
+rows, and counts exactly otherwise. Pair it with
+``show_full_result_count = False`` so filtered pages skip the second count.
+"""
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 100_000
+
+
+def estimated_row_count(model, using='default'):
+    """The planner's row estimate for ``model``'s table, or None when there is none"""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'sqlite':
+        # The first number of every stat row is the table's row count
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # No sqlite_stat1 until ANALYZE has run
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # reltuples is -1 for tables that were never analyzed
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from accounts.hashers import HASHER_PROFILES
+from .database import DEFAULT_SQLITE_PRAGMAS, database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,12 +51,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'recycling_tracker.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'recycling_tracker.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,18 +82,38 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'recycling_tracker.wsgi.application'
+ASGI_APPLICATION = 'recycling_tracker.asgi.application'
+
+# SERVER_PROFILE is 'wsgi' or 'asgi', which recycling_tracker/asgi.py selects.
+# Under ASGI the centers map, detail and markers API are served by native async
+# views, and database connections are not kept between requests, as Django
+# advises for async code (use the pooled 'postgres' database profile instead).
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'wsgi')
+ASYNC_VIEWS = SERVER_PROFILE == 'asgi'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# DATABASE_PROFILE picks 'sqlite' (WAL, persistent connections) or 'postgres'
+# (pooled, configured by POSTGRES_* variables); see recycling_tracker/database.py.
+
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_settings(DATABASE_PROFILE, BASE_DIR, conn_max_age=0 if ASYNC_VIEWS else 600),
 }
 
+# Pragmas run on every new SQLite connection
+SQLITE_PRAGMAS = DEFAULT_SQLITE_PRAGMAS
+
+
+# Password hashing (see accounts/hashers.py). PASSWORD_HASHER picks 'argon2'
+# (tuned argon2id) or 'pbkdf2'; hashes made by the other are upgraded on login.
+
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+
+PASSWORD_HASHERS = HASHER_PROFILES[PASSWORD_HASHER]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,6 +153,23 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic minifies JS/CSS, fingerprints every file through a manifest and
+# writes .gz/.br siblings (see recycling_tracker/staticfiles.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'recycling_tracker.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Serve STATIC_ROOT from the app itself when no CDN or web server does it
+SERVE_STATIC_FILES = not DEBUG
+# Cache lifetime of static files without a content hash in their name
+STATIC_FILES_MAX_AGE = 60
 
 # Media files
 MEDIA_URL = '/media/'
@@ -156,3 +200,71 @@ CORS_ALLOW_ALL_ORIGINS = True  # Only for development
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/accounts/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use 'django.core.cache.backends.filebased.FileBasedCache' with a LOCATION
+# such as BASE_DIR / 'cache' to share cached payloads between processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recycling-tracker',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recycling-tracker-sessions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Sessions are read from the cache and written through to the database, so a
+# process whose local cache misses falls back to the session table.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Versioned cache for center map/API payloads (see recycling_centers/cache.py)
+CENTERS_CACHE_ALIAS = 'default'
+CENTERS_CACHE_TIMEOUT = 60 * 15
+
+# Dotted path of the center search backend (see recycling_centers/search.py).
+# Leave unset to use SQLite FTS5 or PostgreSQL full-text search automatically.
+CENTERS_SEARCH_BACKEND = None
+
+# Cache holding the per-user unread notification counters
+# (see notifications/counters.py)
+NOTIFICATIONS_CACHE_ALIAS = 'default'
+
+# Notification delivery (see notifications/outbox.py). Swap in the SMTP
+# email backend and a real SMS gateway in production.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'EcoTracker <no-reply@ecotracker.local>'
+SMS_BACKEND = 'notifications.sms.ConsoleSMSBackend'
+
+# Maximum messages per second sent by each process_outbox worker
+NOTIFICATIONS_RATE_LIMITS = {
+    'email': 10,
+    'sms': 1,
+}
+
+# Request metrics (see recycling_tracker/middleware.py), scraped from
+# /metrics/ by staff or with "Authorization: Bearer <METRICS_BEARER_TOKEN>".
+METRICS_BEARER_TOKEN = None
+# Fraction of requests run under cProfile; 0 disables profiling
+METRICS_PROFILE_SAMPLE_RATE = 0
+METRICS_PROFILE_DIR = BASE_DIR / 'profiles'
+METRICS_PROFILE_KEEP = 20
+
+# Threads resizing uploaded images into renditions (see
+# recycling_tracker/thumbnails.py); 0 resizes inline after the commit
+THUMBNAIL_WORKERS = 2
+
+# Threads running CPU-heavy work of async views, such as distance sorting
+# (see recycling_tracker/executors.py)
+ASYNC_CPU_WORKERS = 4
+
+# Leaderboards (see accounts/leaderboards.py): seconds between catching up on
+# score changes made by other processes, and the snapshot of the scores that
+# restarted processes load instead of reading every profile. Refresh it
+# periodically, e.g. every 5 minutes, with manage.py rebuild_leaderboards --snapshot-only
+LEADERBOARD_SYNC_INTERVAL = 30
+LEADERBOARD_SNAPSHOT_PATH = BASE_DIR / 'leaderboards.json'
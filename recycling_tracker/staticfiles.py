@@ -0,0 +1,263 @@
+"""
+Fingerprinted, minified and precompressed static files.
+
+``CompressedManifestStaticFilesStorage`` is a ``collectstatic`` storage. It
+minifies the collected JavaScript and CSS before Django's manifest storage
+hashes them into content-addressed names, then writes ``.gz`` (and ``.br``,
+if the optional ``brotli`` package is installed) siblings of every hashed
+text asset. The minifiers are deliberately conservative: they drop comments
+and redundant whitespace but keep JavaScript line breaks, so automatic
+semicolon insertion behaves exactly as in the source.
+
+``StaticFilesMiddleware`` in ``middleware.py`` serves the result.
+"""
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, only gzip files are written
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html')
+# Compressing tiny files saves less than the extra request headers cost
+MIN_COMPRESS_SIZE = 256
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+_WORD = re.compile(r'[\w$\\]')
+# Keywords after which a slash starts a regular expression, not a division
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new', 'void',
+    'delete', 'throw', 'yield', 'await',
+}
+
+
+def _is_word(char):
+    return bool(char) and (ord(char) > 127 or bool(_WORD.match(char)))
+
+
+def _skip_string(source, start):
+    """Index just past the quoted string starting at ``start``"""
+    quote = source[start]
+    index = start + 1
+    while index < len(source) and source[index] != quote:
+        if source[index] == '\\':
+            index += 1
+        elif source[index] == '\n' and quote != '`':
+            break
+        index += 1
+    return index + 1
+
+
+def _skip_template(source, start):
+    """Index just past the template literal starting at ``start``, with nested ``${}``"""
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '`':
+            return index + 1
+        if source.startswith('${', index):
+            depth = 1
+            index += 2
+            while index < len(source) and depth:
+                char = source[index]
+                if char in '"\'':
+                    index = _skip_string(source, index)
+                    continue
+                if char == '`':
+                    index = _skip_template(source, index)
+                    continue
+                depth += {'{': 1, '}': -1}.get(char, 0)
+                index += 1
+            continue
+        index += 1
+    return index
+
+
+def _skip_regex(source, start):
+    """Index just past the regular expression literal (and flags) starting at ``start``"""
+    index = start + 1
+    in_class = False
+    while index < len(source) and source[index] != '\n':
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            index += 1
+            break
+        index += 1
+    while index < len(source) and _is_word(source[index]):
+        index += 1
+    return index
+
+
+def minify_js(source):
+    """Strip comments, indentation and blank lines from JavaScript, keeping line breaks"""
+    out = []
+    index = 0
+    last = ''  # last character written
+    word = ''  # last identifier or keyword written
+    pending = None  # whitespace seen since ``last``: None, ' ' or '\n'
+
+    def write(text):
+        nonlocal last, pending
+        if pending == '\n' and out:
+            out.append('\n')
+        elif pending == ' ' and out and (
+            (_is_word(last) and _is_word(text[0])) or (last in '+-' and text[0] == last)
+        ):
+            out.append(' ')
+        out.append(text)
+        last = text[-1]
+        pending = None
+
+    while index < len(source):
+        char = source[index]
+        following = source[index + 1:index + 2]
+        if char in '"\'':
+            end = _skip_string(source, index)
+        elif char == '`':
+            end = _skip_template(source, index)
+        elif char == '/' and following == '/':
+            index = source.find('\n', index)
+            if index == -1:
+                break
+            continue
+        elif char == '/' and following == '*':
+            end = source.find('*/', index + 2)
+            comment = source[index:end]
+            index = len(source) if end == -1 else end + 2
+            if pending != '\n':
+                pending = '\n' if '\n' in comment else ' '
+            continue
+        elif char == '/' and (not last or last in '(,=:[!&|?{};+-*%<>~^' or word in _REGEX_KEYWORDS):
+            end = _skip_regex(source, index)
+        elif char in ' \t\r\f\v':
+            pending = pending or ' '
+            index += 1
+            continue
+        elif char == '\n':
+            pending = '\n'
+            index += 1
+            continue
+        else:
+            end = index + 1
+            if _is_word(char):
+                while end < len(source) and _is_word(source[end]):
+                    end += 1
+                word = source[index:end]
+            else:
+                word = ''
+            write(source[index:end])
+            index = end
+            continue
+        word = ''
+        write(source[index:end])
+        index = end
+    return ''.join(out) + '\n'
+
+
+# Whitespace around these characters never matters in CSS
+_CSS_TIGHT_AFTER = '{};,>:'
+_CSS_TIGHT_BEFORE = '{};,>)!'
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    out = []
+    index = 0
+    pending = False
+
+    def write(text):
+        nonlocal pending
+        if pending and out and out[-1][-1] not in _CSS_TIGHT_AFTER and text[0] not in _CSS_TIGHT_BEFORE:
+            out.append(' ')
+        if text == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(text)
+        pending = False
+
+    while index < len(source):
+        char = source[index]
+        if char in '"\'':
+            end = _skip_string(source, index)
+            write(source[index:end])
+            index = end
+        elif source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            index = len(source) if end == -1 else end + 2
+            pending = True
+        elif char.isspace():
+            pending = True
+            index += 1
+        elif source.startswith('url(', index):
+            end = source.find(')', index) + 1 or len(source)
+            write(source[index:end])
+            index = end
+        else:
+            write(char)
+            index += 1
+    return ''.join(out) + '\n'
+
+
+MINIFIERS = {
+    '.js': minify_js,
+    '.css': minify_css,
+}
+
+
+def compress(content):
+    """``{encoding: bytes}`` for each encoding that makes ``content`` smaller"""
+    results = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        results['br'] = brotli.compress(content, quality=11)
+    return {encoding: data for encoding, data in results.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that minifies JS/CSS before hashing and precompresses the results"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in paths:
+                minifier = next((m for suffix, m in MINIFIERS.items() if name.endswith(suffix)), None)
+                if minifier is None or name.endswith(('.min.js', '.min.css')):
+                    continue
+                with self.open(name) as handle:
+                    original = handle.read().decode('utf-8')
+                minified = minifier(original)
+                if minified != original:
+                    self.delete(name)
+                    self._save(name, ContentFile(minified.encode('utf-8')))
+                # Hash the minified copy in STATIC_ROOT instead of the source file
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if not dry_run:
+            for name in sorted(set(self.hashed_files.values())):
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self._write_compressed(name)
+
+    def _write_compressed(self, name):
+        with self.open(name) as handle:
+            content = handle.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for encoding, data in compress(content).items():
+            compressed_name = name + ENCODINGS[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(data))
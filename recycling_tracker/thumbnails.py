@@ -0,0 +1,205 @@
+"""
+Precomputed WebP and JPEG renditions of uploaded images.
+
+When a model's image changes, ``schedule_renditions`` resizes it to each of
+``SIZES`` on a background thread pool once the transaction commits, saves the
+results under ``thumbnails/`` with the content hash in their names and stores
+their paths in a JSON field next to the image. Pages and APIs then link a
+rendition instead of the full upload. A changed image always gets new names,
+so renditions can be cached forever; ``serve_rendition`` does that in
+development, and in production the web server should send
+``Cache-Control: public, max-age=31536000, immutable`` for ``MEDIA_URL
+thumbnails/``.
+
+Set ``THUMBNAIL_WORKERS = 0`` to generate renditions inline, for example in
+management commands and tests.
+"""
+import hashlib
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of each rendition, in pixels
+SIZES = {
+    'small': 160,
+    'medium': 480,
+    'large': 1200,
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+RENDITIONS_DIR = 'thumbnails'
+CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def _encode(image, image_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_renditions(field_file, sizes=SIZES):
+    """
+    Resize an image field's file to each size and save every format to its
+    storage, returning the renditions mapping kept on the model. Files that
+    already exist under their content-hashed name are not written again.
+    """
+    from PIL import Image, ImageOps
+
+    storage = field_file.storage
+    with field_file.open('rb') as handle, Image.open(handle) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'L'):
+            # JPEG has no alpha channel; flatten transparency onto white
+            background = Image.new('RGB', original.size, 'white')
+            background.paste(original, mask=original.convert('RGBA').getchannel('A'))
+            original = background
+        original = original.convert('RGB')
+
+        directory, filename = posixpath.split(field_file.name)
+        stem = posixpath.splitext(filename)[0]
+        renditions = {}
+        for size_name, edge in sizes.items():
+            image = original.copy()
+            # Never upscale: small uploads are re-encoded at their own size
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            rendition = {'width': image.width, 'height': image.height}
+            for extension, (image_format, options) in FORMATS.items():
+                content = _encode(image, image_format, options)
+                digest = hashlib.sha256(content).hexdigest()[:12]
+                name = posixpath.join(RENDITIONS_DIR, directory, f'{stem}-{size_name}.{digest}.{extension}')
+                if not storage.exists(name):
+                    name = storage.save(name, ContentFile(content))
+                rendition[extension] = name
+            renditions[size_name] = rendition
+    return {'source': field_file.name, 'sizes': renditions}
+
+
+def rendition_names(renditions):
+    return {
+        name
+        for rendition in (renditions or {}).get('sizes', {}).values()
+        for extension, name in rendition.items() if extension in FORMATS
+    }
+
+
+def renditions_outdated(field_file, renditions):
+    """Whether the stored renditions were made from another file than the current one"""
+    return (renditions or {}).get('source') != (field_file.name or None)
+
+
+def _build(model, pk, field_name, renditions_field, source, on_ready):
+    close_old_connections()
+    try:
+        instance = model._default_manager.filter(pk=pk).only(field_name, renditions_field).first()
+        if instance is None or getattr(instance, field_name).name != source:
+            return
+        field_file = getattr(instance, field_name)
+        previous = getattr(instance, renditions_field)
+        renditions = generate_renditions(field_file)
+        # Only store them if the image was not replaced in the meantime
+        updated = model._default_manager.filter(pk=pk, **{field_name: source}).update(
+            **{renditions_field: renditions}
+        )
+        stale = rendition_names(previous) - rendition_names(renditions)
+        if not updated:
+            stale = rendition_names(renditions) - rendition_names(previous)
+        for name in stale:
+            field_file.storage.delete(name)
+        if updated and on_ready is not None:
+            on_ready(instance)
+    except Exception:
+        logger.exception('Could not generate renditions for %s %s', model._meta.label, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(instance, field_name, renditions_field, on_ready=None):
+    """
+    Regenerate renditions for ``instance`` after the current transaction
+    commits if its image changed since they were made. A removed image clears
+    them at once. ``on_ready(instance)`` runs after new renditions are stored.
+    """
+    if {field_name, renditions_field} & instance.get_deferred_fields():
+        return
+    field_file = getattr(instance, field_name)
+    renditions = getattr(instance, renditions_field)
+    if not renditions_outdated(field_file, renditions):
+        return
+    model = type(instance)
+    if not field_file:
+        model._default_manager.filter(pk=instance.pk).update(**{renditions_field: {}})
+        setattr(instance, renditions_field, {})
+        stale = rendition_names(renditions)
+        transaction.on_commit(lambda: [field_file.storage.delete(name) for name in stale])
+        if on_ready is not None:
+            on_ready(instance)
+        return
+
+    args = (model, instance.pk, field_name, renditions_field, field_file.name, on_ready)
+    if getattr(settings, 'THUMBNAIL_WORKERS', 2) > 0:
+        transaction.on_commit(lambda: _get_executor().submit(_build, *args))
+    else:
+        transaction.on_commit(lambda: _build(*args))
+
+
+def rendition_url(field_file, renditions, size='medium', extension='jpeg'):
+    """
+    URL of one rendition of an image field. While renditions are missing or
+    stale a JPEG falls back to the original upload and a WebP is None, so no
+    WebP ``<source>`` points at it. None without an image.
+    """
+    if not field_file:
+        return None
+    if not renditions_outdated(field_file, renditions):
+        rendition = renditions['sizes'].get(size)
+        if rendition:
+            return field_file.storage.url(rendition[extension])
+    return field_file.url if extension == 'jpeg' else None
+
+
+def rendition_urls(field_file, renditions, size='medium'):
+    """``{'webp': url, 'jpeg': url, 'width': px, 'height': px}`` for a ``<picture>`` element"""
+    if not field_file:
+        return None
+    if renditions_outdated(field_file, renditions) or size not in renditions['sizes']:
+        return {'webp': None, 'jpeg': field_file.url, 'width': None, 'height': None}
+    rendition = renditions['sizes'][size]
+    return {
+        'webp': field_file.storage.url(rendition['webp']),
+        'jpeg': field_file.storage.url(rendition['jpeg']),
+        'width': rendition['width'],
+        'height': rendition['height'],
+    }
+
+
+def serve_rendition(request, path):
+    """Serve renditions with far-future caching; for development, like ``static()``"""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT / RENDITIONS_DIR)
+    patch_cache_control(response, public=True, max_age=CACHE_MAX_AGE, immutable=True)
+    return response
@@ -14,11 +14,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import render
+from .metrics import metrics_view
+from .thumbnails import RENDITIONS_DIR, serve_rendition
 
 def home(request):
     return render(request, 'home.html')
@@ -30,9 +34,14 @@ urlpatterns = [
     path('centers/', include('recycling_centers.urls')),
     path('requests/', include('recycling_requests.urls')),
     path('notifications/', include('notifications.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 # Serve media files during development
 if settings.DEBUG:
+    # Renditions first, so they are served with far-future cache headers
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}{RENDITIONS_DIR}/(?P<path>.*)$', serve_rendition),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else None)
@@ -479,6 +479,116 @@ function initMap(mapId, centers = []) {
     return map;
 }
 
+// Viewport map (Leaflet): markers are fetched per visible area as server-side clusters
+function initViewportMap(mapId, options = {}) {
+    if (typeof L === 'undefined') {
+        console.error('Leaflet not loaded');
+        return;
+    }
+    
+    const mapElement = document.getElementById(mapId);
+    if (!mapElement) return;
+    
+    const apiUrl = options.apiUrl || '/centers/api/centers/viewport/';
+    const map = L.map(mapId).setView(options.center || [40.7128, -74.0060], options.zoom || 12); // Default to NYC
+    L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        attribution: '© OpenStreetMap contributors'
+    }).addTo(map);
+    
+    const markerLayer = L.layerGroup().addTo(map);
+    let controller = null;
+    let refreshTimeout;
+    
+    function clusterIcon(count) {
+        const size = Math.min(56, 28 + Math.round(Math.log10(count) * 10));
+        return L.divIcon({
+            html: `<div class="map-cluster" style="width: ${size}px; height: ${size}px; line-height: ${size}px;">${count}</div>`,
+            className: '',
+            iconSize: [size, size]
+        });
+    }
+    
+    function centerPopup(center) {
+        return `
+            <div style="max-width: 300px;">
+                <h6>${center.name}</h6>
+                <p><strong>Address:</strong> ${center.address}</p>
+                <p><strong>Phone:</strong> ${center.phone_number}</p>
+                <p><strong>Availability:</strong> ${Math.round(center.availability_percentage)}%</p>
+                <div class="mt-2">
+                    <a href="/centers/${center.id}/" class="btn btn-sm btn-success text-white">View Details</a>
+                </div>
+            </div>
+        `;
+    }
+    
+    function renderClusters(clusters) {
+        markerLayer.clearLayers();
+        clusters.forEach(cluster => {
+            const position = [cluster.latitude, cluster.longitude];
+            if (cluster.center) {
+                L.marker(position, { title: cluster.center.name })
+                    .bindPopup(centerPopup(cluster.center))
+                    .addTo(markerLayer);
+                return;
+            }
+            const materials = Object.entries(cluster.materials)
+                .map(([type, count]) => `${type}: ${count}`)
+                .join(', ');
+            L.marker(position, { icon: clusterIcon(cluster.count), title: materials })
+                .on('click', () => map.setView(position, map.getZoom() + 2))
+                .addTo(markerLayer);
+        });
+    }
+    
+    function refresh() {
+        const bounds = map.getBounds();
+        const params = new URLSearchParams({
+            bbox: [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()]
+                .map(v => Math.max(-180, Math.min(180, v)).toFixed(5)).join(','),
+            zoom: map.getZoom()
+        });
+        if (options.materialType) {
+            params.append('material_type', options.materialType);
+        }
+        
+        // Drop responses for viewports the user already left
+        if (controller) controller.abort();
+        controller = new AbortController();
+        
+        fetch(`${apiUrl}?${params.toString()}`, { credentials: 'same-origin', signal: controller.signal })
+            .then(response => response.json())
+            .then(data => renderClusters(data.clusters || []))
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    console.log('Error loading centers:', error);
+                }
+            });
+    }
+    
+    map.on('moveend', () => {
+        clearTimeout(refreshTimeout);
+        refreshTimeout = setTimeout(refresh, 150);
+    });
+    refresh();
+    
+    // Try to get user location and center map
+    getUserLocation().then(location => {
+        L.circleMarker([location.lat, location.lng], {
+            radius: 8,
+            color: '#fff',
+            weight: 2,
+            fillColor: '#007bff',
+            fillOpacity: 1
+        }).bindTooltip('Your Location').addTo(map);
+        map.setView([location.lat, location.lng]);
+    }).catch(error => {
+        console.log('Could not get user location:', error);
+    });
+    
+    return map;
+}
+
 // Initialize page-specific functionality
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize image preview for file inputs
@@ -573,8 +683,14 @@ function showToast(message, type = 'info', title = '', duration = 5000) {
 
 // Enhanced notification functionality
 function setupNotifications() {
-    // Update notification badge periodically
-    setInterval(updateNotificationBadge, 30000); // Every 30 seconds
+    // Badge counts are pushed over Server-Sent Events where the server
+    // supports it; polling every 30 seconds is the fallback
+    connectNotificationStream();
+    setInterval(() => {
+        if (!notificationStream || notificationStream.readyState !== EventSource.OPEN) {
+            updateNotificationBadge();
+        }
+    }, 30000); // Every 30 seconds
     
     // Setup notification click handlers
     document.addEventListener('click', function(e) {
@@ -587,23 +703,45 @@ function setupNotifications() {
             e.preventDefault();
             deleteNotification(e.target.dataset.notificationId);
         }
+        
+        if (e.target.matches('.notification-mark-all-read')) {
+            e.preventDefault();
+            markAllNotificationsAsRead();
+        }
     });
 }
 
+let notificationStream = null;
+
+function connectNotificationStream() {
+    if (!window.EventSource || !document.querySelector('.notification-badge')) return;
+    
+    // The server answers 204 when streaming is unavailable, which closes the
+    // EventSource for good and leaves the badge to polling
+    notificationStream = new EventSource('/notifications/stream/');
+    notificationStream.addEventListener('unread', event => {
+        setNotificationBadge(JSON.parse(event.data).count);
+    });
+}
+
+function setNotificationBadge(count) {
+    const badge = document.querySelector('.notification-badge');
+    if (badge) {
+        if (count > 0) {
+            badge.textContent = count > 99 ? '99+' : count;
+            badge.style.display = 'block';
+        } else {
+            badge.style.display = 'none';
+        }
+    }
+}
+
 function updateNotificationBadge() {
-    fetch('/notifications/unread-count/')
+    // 'no-cache' revalidates with If-None-Match, so an unchanged count
+    // comes back as an empty 304 Not Modified
+    fetch('/notifications/unread-count/', { cache: 'no-cache', credentials: 'same-origin' })
         .then(response => response.json())
-        .then(data => {
-            const badge = document.querySelector('.notification-badge');
-            if (badge) {
-                if (data.count > 0) {
-                    badge.textContent = data.count > 99 ? '99+' : data.count;
-                    badge.style.display = 'block';
-                } else {
-                    badge.style.display = 'none';
-                }
-            }
-        })
+        .then(data => setNotificationBadge(data.count))
         .catch(error => console.log('Error updating notification badge:', error));
 }
 
@@ -725,6 +863,7 @@ window.EcoTracker = {
     showToast,
     makeRequest,
     initMap,
+    initViewportMap,
     showLoading,
     hideLoading,
     markNotificationAsRead,